@@ -0,0 +1,75 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+
+
+class AccountClosingBalance(Document):
+	pass
+
+
+def make_closing_balances(period_closing_voucher):
+	"""Stores the balance of every account and party of the company as on the posting date of
+	the Period Closing Voucher, including its own closing entries"""
+	gle = frappe.qb.DocType("GL Entry")
+	balances = (
+		frappe.qb.from_(gle)
+		.select(
+			gle.account,
+			gle.party_type,
+			gle.party,
+			gle.account_currency,
+			Sum(gle.debit).as_("debit"),
+			Sum(gle.credit).as_("credit"),
+			Sum(gle.debit_in_account_currency).as_("debit_in_account_currency"),
+			Sum(gle.credit_in_account_currency).as_("credit_in_account_currency"),
+		)
+		.where(
+			(gle.company == period_closing_voucher.company)
+			& (gle.posting_date <= period_closing_voucher.posting_date)
+			& (gle.is_cancelled == 0)
+		)
+		.groupby(gle.account, gle.party_type, gle.party, gle.account_currency)
+	).run(as_dict=True)
+
+	for balance in balances:
+		frappe.get_doc(
+			dict(
+				balance,
+				doctype="Account Closing Balance",
+				period_closing_voucher=period_closing_voucher.name,
+				company=period_closing_voucher.company,
+				closing_date=period_closing_voucher.posting_date,
+			)
+		).db_insert()
+
+
+def delete_closing_balances(period_closing_voucher):
+	frappe.db.delete("Account Closing Balance", {"period_closing_voucher": period_closing_voucher})
+
+
+def invalidate_closing_balances(company, posting_date):
+	"""Drops the closing balances made on or after `posting_date`, as a back-dated ledger posting
+	makes them stale. Balance lookups then start from an earlier closing or the first entry."""
+	filters = {"company": company, "closing_date": (">=", posting_date)}
+	if company and posting_date and frappe.db.exists("Account Closing Balance", filters):
+		frappe.db.delete("Account Closing Balance", filters)
+
+
+def get_closing_date(company, date):
+	"""Returns the date of the latest closing balances of the company on or before `date`"""
+	if not company:
+		return None
+
+	return frappe.db.get_value(
+		"Account Closing Balance",
+		{"company": company, "closing_date": ("<=", date)},
+		"closing_date",
+		order_by="closing_date desc",
+	)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Account Closing Balance", ["company", "closing_date"])
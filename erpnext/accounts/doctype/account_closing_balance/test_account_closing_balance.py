@@ -0,0 +1,81 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, today
+
+from erpnext.accounts.doctype.journal_entry.test_journal_entry import make_journal_entry
+from erpnext.accounts.doctype.period_closing_voucher.test_period_closing_voucher import (
+	create_account,
+	create_company,
+	create_cost_center,
+)
+from erpnext.accounts.utils import get_balance_on, get_balances_on, get_fiscal_year
+
+ACCOUNTS = ["Cash - TPC", "Sales - TPC", "Current Assets - TPC", "Income - TPC"]
+
+
+class TestAccountClosingBalance(FrappeTestCase):
+	def setUp(self):
+		frappe.db.sql("delete from `tabGL Entry` where company='Test PCV Company'")
+		frappe.db.delete("Account Closing Balance", {"company": "Test PCV Company"})
+		self.company = create_company()
+		self.cost_center = create_cost_center("Test Cost Center 1")
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_balances_from_closing_balances(self):
+		self.make_journal_entry("Cash - TPC", "Sales - TPC", 400)
+		self.make_journal_entry("Cost of Goods Sold - TPC", "Cash - TPC", 150)
+		pcv = self.make_period_closing_voucher()
+
+		self.assertTrue(
+			frappe.db.exists("Account Closing Balance", {"period_closing_voucher": pcv.name})
+		)
+		self.assert_balances_match(cash_balance=250)
+
+		# back-dated entries make the closing balances stale
+		self.make_journal_entry("Cash - TPC", "Sales - TPC", 100, posting_date=add_days(today(), -1))
+		self.assertFalse(
+			frappe.db.exists("Account Closing Balance", {"period_closing_voucher": pcv.name})
+		)
+		self.assert_balances_match(cash_balance=350)
+
+	def assert_balances_match(self, cash_balance):
+		balances = get_balances_on(ACCOUNTS, company=self.company)
+		for account in ACCOUNTS:
+			self.assertEqual(balances[account], get_balance_on(account, company=self.company))
+
+		self.assertEqual(balances["Cash - TPC"], cash_balance)
+
+	def make_journal_entry(self, account1, account2, amount, posting_date=None):
+		jv = make_journal_entry(
+			account1,
+			account2,
+			amount,
+			cost_center=self.cost_center,
+			posting_date=posting_date or today(),
+			save=False,
+		)
+		jv.company = self.company
+		jv.save()
+		jv.submit()
+		return jv
+
+	def make_period_closing_voucher(self):
+		pcv = frappe.get_doc(
+			{
+				"doctype": "Period Closing Voucher",
+				"transaction_date": today(),
+				"posting_date": today(),
+				"company": self.company,
+				"fiscal_year": get_fiscal_year(today(), company=self.company)[0],
+				"cost_center": self.cost_center,
+				"closing_account_head": create_account(),
+				"remarks": "test",
+			}
+		)
+		pcv.submit()
+		return pcv
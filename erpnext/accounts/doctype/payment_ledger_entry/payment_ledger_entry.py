@@ -20,3 +20,8 @@ class PaymentLedgerEntry(Document):
 
 	def validate(self):
 		self.validate_account()
+
+
+def on_doctype_update():
+	frappe.db.add_index("Payment Ledger Entry", ["party_type", "party", "account"])
+	frappe.db.add_index("Payment Ledger Entry", ["against_voucher_no", "against_voucher_type"])
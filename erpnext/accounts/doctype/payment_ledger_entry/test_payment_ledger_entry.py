@@ -4,7 +4,7 @@
 import frappe
 from frappe import qb
 from frappe.tests.utils import FrappeTestCase
-from frappe.utils import nowdate
+from frappe.utils import add_days, nowdate
 
 from erpnext.accounts.doctype.payment_entry.payment_entry import get_payment_entry
 from erpnext.accounts.doctype.payment_entry.test_payment_entry import create_payment_entry
@@ -406,3 +406,48 @@ class TestPaymentLedgerEntry(FrappeTestCase):
 		]
 		self.assertEqual(pl_entries_for_crnote[0], expected_values[0])
 		self.assertEqual(pl_entries_for_crnote[1], expected_values[1])
+
+	def test_unallocated_advances(self):
+		transaction_date = nowdate()
+
+		# an older unreferenced receipt that is not marked as an advance is not paginated over
+		je = self.create_journal_entry(
+			self.bank, self.debit_to, 100, posting_date=add_days(transaction_date, -3)
+		)
+		je.get("accounts")[1].party_type = "Customer"
+		je.get("accounts")[1].party = self.customer
+		je.get("accounts")[1].is_advance = "No"
+		je.save().submit()
+
+		advances = []
+		for days in (-2, -1):
+			pe = self.create_payment_entry(amount=100, posting_date=add_days(transaction_date, days))
+			advances.append(pe.save().submit().name)
+
+		si = self.create_sales_invoice(
+			qty=1, rate=150, posting_date=transaction_date, do_not_save=True, do_not_submit=True
+		)
+		entries = si.get_advance_entries()
+		self.assertEqual([d.reference_name for d in entries], advances)
+
+		# oldest first, paginated
+		entries = si.get_advance_entries(limit=1)
+		self.assertEqual([d.reference_name for d in entries], advances[:1])
+		entries = si.get_advance_entries(limit=1, start=1)
+		self.assertEqual([d.reference_name for d in entries], advances[1:])
+
+		# the first advance is fully allocated to the invoice
+		si.append(
+			"advances",
+			{
+				"doctype": "Sales Invoice Advance",
+				"reference_type": "Payment Entry",
+				"reference_name": advances[0],
+				"advance_amount": 100,
+				"allocated_amount": 100,
+			},
+		)
+		si.save().submit()
+
+		entries = si.get_advance_entries()
+		self.assertEqual([d.reference_name for d in entries], advances[1:])
@@ -6,6 +6,10 @@ import frappe
 from frappe import _
 from frappe.utils import flt
 
+from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+	delete_closing_balances,
+	make_closing_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 	get_dimensions,
@@ -21,12 +25,14 @@ class PeriodClosingVoucher(AccountsController):
 
 	def on_submit(self):
 		self.make_gl_entries()
+		make_closing_balances(self)
 
 	def on_cancel(self):
-		self.ignore_linked_doctypes = ("GL Entry", "Stock Ledger Entry")
+		self.ignore_linked_doctypes = ("GL Entry", "Stock Ledger Entry", "Account Closing Balance")
 		from erpnext.accounts.general_ledger import make_reverse_gl_entries
 
 		make_reverse_gl_entries(voucher_type="Period Closing Voucher", voucher_no=self.name)
+		delete_closing_balances(self.name)
 
 	def validate_account_head(self):
 		closing_account_type = frappe.db.get_value("Account", self.closing_account_head, "root_type")
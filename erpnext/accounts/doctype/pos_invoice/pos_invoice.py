@@ -21,12 +21,14 @@ from erpnext.stock.doctype.serial_no.serial_no import (
 	get_pos_reserved_serial_nos,
 	get_serial_nos,
 )
+from erpnext.utilities.instrumentation import instrument
 
 
 class POSInvoice(SalesInvoice):
 	def __init__(self, *args, **kwargs):
 		super(POSInvoice, self).__init__(*args, **kwargs)
 
+	@instrument
 	def validate(self):
 		if not cint(self.is_pos):
 			frappe.throw(
@@ -58,6 +60,7 @@ class POSInvoice(SalesInvoice):
 
 			validate_coupon_code(self.coupon_code)
 
+	@instrument
 	def on_submit(self):
 		# create the loyalty point ledger entry if the customer is enrolled in any loyalty program
 		if not self.is_return and self.loyalty_program:
@@ -95,6 +98,7 @@ class POSInvoice(SalesInvoice):
 				title=_("Not Allowed"),
 			)
 
+	@instrument
 	def on_cancel(self):
 		self.ignore_linked_doctypes = "Payment Ledger Entry"
 		# run on cancel method of selling controller
@@ -39,6 +39,7 @@ from erpnext.stock.doctype.purchase_receipt.purchase_receipt import (
 	get_item_account_wise_additional_cost,
 	update_billed_amount_based_on_po,
 )
+from erpnext.utilities.instrumentation import instrument
 
 
 class WarehouseMissingError(frappe.ValidationError):
@@ -78,6 +79,7 @@ class PurchaseInvoice(BuyingController):
 	def invoice_is_blocked(self):
 		return self.on_hold and (not self.release_date or self.release_date > getdate(nowdate()))
 
+	@instrument
 	def validate(self):
 		if not self.is_opening:
 			self.is_opening = "No"
@@ -491,6 +493,7 @@ class PurchaseInvoice(BuyingController):
 						_("Stock cannot be updated against Purchase Receipt {0}").format(item.purchase_receipt)
 					)
 
+	@instrument
 	def on_submit(self):
 		super(PurchaseInvoice, self).on_submit()
 
@@ -530,6 +533,7 @@ class PurchaseInvoice(BuyingController):
 
 		self.process_common_party_accounting()
 
+	@instrument
 	def make_gl_entries(self, gl_entries=None, from_repost=False):
 		if not gl_entries:
 			gl_entries = self.get_gl_entries()
@@ -1395,6 +1399,7 @@ class PurchaseInvoice(BuyingController):
 				)
 			)
 
+	@instrument
 	def on_cancel(self):
 		check_if_return_invoice_linked_with_payment_entry(self)
 
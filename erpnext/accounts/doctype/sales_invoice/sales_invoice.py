@@ -40,7 +40,10 @@ from erpnext.assets.doctype.asset.depreciation import (
 from erpnext.controllers.accounts_controller import validate_account_head
 from erpnext.controllers.selling_controller import SellingController
 from erpnext.projects.doctype.timesheet.timesheet import get_projectwise_timesheet_data
-from erpnext.setup.doctype.company.company import update_company_current_month_sales
+from erpnext.setup.doctype.company.company import (
+	update_company_current_month_sales,
+	update_company_sales_history,
+)
 from erpnext.stock.doctype.batch.batch import set_batch_nos
 from erpnext.stock.doctype.delivery_note.delivery_note import update_billed_amount_based_on_so
 from erpnext.stock.doctype.serial_no.serial_no import (
@@ -48,6 +51,7 @@ from erpnext.stock.doctype.serial_no.serial_no import (
 	get_serial_nos,
 	update_serial_nos_after_submit,
 )
+from erpnext.utilities.instrumentation import instrument
 
 form_grid_templates = {"items": "templates/form_grid/item_grid.html"}
 
@@ -90,6 +94,7 @@ class SalesInvoice(SellingController):
 			self.indicator_color = "green"
 			self.indicator_title = _("Paid")
 
+	@instrument
 	def validate(self):
 		super(SalesInvoice, self).validate()
 		self.validate_auto_set_posting_time()
@@ -241,6 +246,7 @@ class SalesInvoice(SellingController):
 	def before_save(self):
 		set_account_for_mode_of_payment(self)
 
+	@instrument
 	def on_submit(self):
 		self.validate_pos_paid_amount()
 
@@ -284,6 +290,7 @@ class SalesInvoice(SellingController):
 			self.update_against_document_in_jv()
 
 		self.update_time_sheet(self.name)
+		update_company_sales_history(self.company, self.posting_date, self.base_grand_total)
 
 		if (
 			frappe.db.get_single_value("Selling Settings", "sales_update_frequency") == "Each Transaction"
@@ -345,6 +352,7 @@ class SalesInvoice(SellingController):
 		super(SalesInvoice, self).before_cancel()
 		self.update_time_sheet(None)
 
+	@instrument
 	def on_cancel(self):
 		check_if_return_invoice_linked_with_payment_entry(self)
 
@@ -378,6 +386,7 @@ class SalesInvoice(SellingController):
 			self.repost_future_sle_and_gle()
 
 		frappe.db.set(self, "status", "Cancelled")
+		update_company_sales_history(self.company, self.posting_date, -flt(self.base_grand_total))
 
 		if (
 			frappe.db.get_single_value("Selling Settings", "sales_update_frequency") == "Each Transaction"
@@ -951,6 +960,7 @@ class SalesInvoice(SellingController):
 			if d.delivery_note and frappe.db.get_value("Delivery Note", d.delivery_note, "docstatus") != 1:
 				throw(_("Delivery Note {0} is not submitted").format(d.delivery_note))
 
+	@instrument
 	def make_gl_entries(self, gl_entries=None, from_repost=False):
 		from erpnext.accounts.general_ledger import make_gl_entries, make_reverse_gl_entries
 
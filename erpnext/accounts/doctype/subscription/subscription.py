@@ -1,10 +1,13 @@
 # Copyright (c) 2018, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import hashlib
 
 import frappe
 from frappe import _
+from frappe.core.page.background_jobs.background_jobs import get_info
 from frappe.model.document import Document
+from frappe.utils import create_batch
 from frappe.utils.data import (
 	add_days,
 	add_to_date,
@@ -25,6 +28,8 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 from erpnext.accounts.doctype.subscription_plan.subscription_plan import get_plan_rate
 from erpnext.accounts.party import get_party_account_currency
 
+SUBSCRIPTION_BATCH_SIZE = 100
+
 
 class Subscription(Document):
 	def before_insert(self):
@@ -280,6 +285,52 @@ class Subscription(Document):
 		self.validate_end_date()
 		self.validate_to_follow_calendar_months()
 		self.cost_center = erpnext.get_default_cost_center(self.get("company"))
+		self.set_next_action_date()
+
+	def set_next_action_date(self):
+		"""
+		Sets the date from which `process` can next change the `Subscription`, so that the
+		scheduler only loads subscriptions that are due. An empty date means always due.
+
+		Active subscriptions are due when an invoice is to be generated, when the current
+		invoice becomes overdue or when the billing period or the subscription ends. Trialling
+		subscriptions are due when the trial ends. Past due subscriptions are checked daily.
+		"""
+		if self.status == "Trialling":
+			self.next_action_date = add_days(self.trial_period_end, 1)
+			return
+
+		if self.status != "Active" or not (self.current_invoice_start and self.current_invoice_end):
+			self.next_action_date = None
+			return
+
+		current_invoice = None
+		if self.invoices:
+			doctype = "Sales Invoice" if self.party_type == "Customer" else "Purchase Invoice"
+			current_invoice = frappe.db.get_value(
+				doctype, self.invoices[-1].invoice, ["status", "due_date", "posting_date"], as_dict=True
+			)
+
+		# postpaid invoices are generated after the period ends, or on the last day of one day periods
+		candidates = [add_days(self.current_invoice_end, 1)]
+		if getdate(self.current_invoice_end) == getdate(self.current_invoice_start):
+			candidates.append(self.current_invoice_end)
+
+		if self.generate_invoice_at_period_start and not (
+			current_invoice
+			and getdate(self.current_invoice_start)
+			<= getdate(current_invoice.posting_date)
+			<= getdate(self.current_invoice_end)
+		):
+			candidates.append(self.current_invoice_start)
+
+		if current_invoice and current_invoice.status != "Paid" and current_invoice.due_date:
+			candidates.append(add_days(current_invoice.due_date, 1))
+
+		if self.end_date:
+			candidates.append(add_days(self.end_date, 1))
+
+		self.next_action_date = min(getdate(date) for date in candidates)
 
 	def validate_trial_period(self):
 		"""
@@ -447,7 +498,7 @@ class Subscription(Document):
 		items = []
 		party = self.party
 		for plan in plans:
-			plan_doc = frappe.get_doc("Subscription Plan", plan.plan)
+			plan_doc = frappe.get_cached_doc("Subscription Plan", plan.plan)
 
 			item_code = plan_doc.item
 
@@ -456,7 +507,7 @@ class Subscription(Document):
 			else:
 				deferred_field = "enable_deferred_expense"
 
-			deferred = frappe.db.get_value("Item", item_code, deferred_field)
+			deferred = frappe.get_cached_value("Item", item_code, deferred_field)
 
 			if not prorate:
 				item = {
@@ -697,11 +748,30 @@ def get_prorata_factor(period_end, period_start, is_prepaid):
 
 def process_all():
 	"""
-	Task to updates the status of all `Subscription` apart from those that are cancelled
+	Task to updates the status of all `Subscription` apart from those that are cancelled.
+
+	Only subscriptions that are due as per their `next_action_date` are processed, in chunks
+	fanned out to background workers. A chunk that is still queued or running from an earlier
+	run is not enqueued again.
 	"""
-	subscriptions = get_all_subscriptions()
-	for subscription in subscriptions:
-		process(subscription)
+	subscriptions = get_due_subscriptions()
+	enqueued_jobs = {d.get("job_name") for d in get_info()}
+	for chunk in create_batch(subscriptions, SUBSCRIPTION_BATCH_SIZE):
+		job_name = get_subscription_job_name(chunk)
+		if job_name in enqueued_jobs:
+			continue
+
+		frappe.enqueue(
+			process_subscriptions,
+			queue="long",
+			job_name=job_name,
+			subscriptions=chunk,
+			now=frappe.flags.in_test,
+		)
+
+
+def get_subscription_job_name(subscriptions):
+	return "process_subscriptions::" + hashlib.sha1("\n".join(subscriptions).encode()).hexdigest()
 
 
 def get_all_subscriptions():
@@ -711,12 +781,44 @@ def get_all_subscriptions():
 	return frappe.db.get_all("Subscription", {"status": ("!=", "Cancelled")})
 
 
+def get_due_subscriptions(date=None):
+	"""
+	Returns names of `Subscription` that are not cancelled and are due to be processed on `date`
+	"""
+	return frappe.db.get_all(
+		"Subscription",
+		filters={"status": ("!=", "Cancelled")},
+		or_filters=[
+			["next_action_date", "is", "not set"],
+			["next_action_date", "<=", getdate(date or nowdate())],
+		],
+		pluck="name",
+	)
+
+
+def process_subscriptions(subscriptions):
+	"""
+	Processes a chunk of `Subscription`. Plan prices are resolved once per plan for the chunk.
+	"""
+	frappe.local.subscription_plan_prices = {}
+	try:
+		for name in subscriptions:
+			process({"name": name})
+	finally:
+		del frappe.local.subscription_plan_prices
+
+
 def process(data):
 	"""
 	Checks a `Subscription` and updates it status as necessary
 	"""
 	if data:
 		try:
+			# lock the subscription so that overlapping runs cannot invoice it twice, and skip it
+			# if another run has processed it since it was picked
+			if not is_subscription_due(data["name"]):
+				return
+
 			subscription = frappe.get_doc("Subscription", data["name"])
 			subscription.process()
 			frappe.db.commit()
@@ -725,6 +827,18 @@ def process(data):
 			subscription.log_error("Subscription failed")
 
 
+def is_subscription_due(name, date=None):
+	subscription = frappe.db.get_value(
+		"Subscription", name, ["status", "next_action_date"], as_dict=True, for_update=True
+	)
+	if not subscription or subscription.status == "Cancelled":
+		return False
+
+	return not subscription.next_action_date or getdate(subscription.next_action_date) <= getdate(
+		date or nowdate()
+	)
+
+
 @frappe.whitelist()
 def cancel_subscription(name):
 	"""
@@ -14,7 +14,11 @@ from frappe.utils.data import (
 	nowdate,
 )
 
-from erpnext.accounts.doctype.subscription.subscription import get_prorata_factor
+from erpnext.accounts.doctype.subscription.subscription import (
+	get_due_subscriptions,
+	get_prorata_factor,
+	is_subscription_due,
+)
 
 test_dependencies = ("UOM", "Item Group", "Item")
 
@@ -321,6 +325,23 @@ class TestSubscription(unittest.TestCase):
 
 		subscription.delete()
 
+	def test_subscription_not_due_during_invoice_period(self):
+		subscription = frappe.new_doc("Subscription")
+		subscription.party_type = "Customer"
+		subscription.party = "_Test Customer"
+		subscription.append("plans", {"plan": "_Test Plan Name", "qty": 1})
+		subscription.save()
+		subscription.process()
+
+		next_action_date = add_days(subscription.current_invoice_end, 1)
+		self.assertEqual(get_date_str(subscription.next_action_date), get_date_str(next_action_date))
+		self.assertNotIn(subscription.name, get_due_subscriptions())
+		self.assertIn(subscription.name, get_due_subscriptions(next_action_date))
+		self.assertFalse(is_subscription_due(subscription.name))
+		self.assertTrue(is_subscription_due(subscription.name, next_action_date))
+
+		subscription.delete()
+
 	def test_subscription_cancelation(self):
 		subscription = frappe.new_doc("Subscription")
 		subscription.party_type = "Customer"
@@ -23,27 +23,18 @@ class SubscriptionPlan(Document):
 def get_plan_rate(
 	plan, quantity=1, customer=None, start_date=None, end_date=None, prorate_factor=1
 ):
-	plan = frappe.get_doc("Subscription Plan", plan)
+	plan = frappe.get_cached_doc("Subscription Plan", plan)
 	if plan.price_determination == "Fixed Rate":
 		return plan.cost * prorate_factor
 
 	elif plan.price_determination == "Based On Price List":
 		if customer:
-			customer_group = frappe.db.get_value("Customer", customer, "customer_group")
+			customer_group = frappe.get_cached_value("Customer", customer, "customer_group")
 		else:
 			customer_group = None
 
-		price = get_price(
-			item_code=plan.item,
-			price_list=plan.price_list,
-			customer_group=customer_group,
-			company=None,
-			qty=quantity,
-		)
-		if not price:
-			return 0
-		else:
-			return price.price_list_rate * prorate_factor
+		price_list_rate = get_plan_price_list_rate(plan, quantity, customer_group)
+		return price_list_rate * prorate_factor
 
 	elif plan.price_determination == "Monthly Rate":
 		start_date = getdate(start_date)
@@ -71,3 +62,26 @@ def get_plan_rate(
 			cost -= plan.cost * prorate_factor
 
 		return cost
+
+
+def get_plan_price_list_rate(plan, quantity, customer_group):
+	"""Returns the price list rate of the plan's item. When subscriptions are processed in bulk,
+	the rate is resolved once per plan, quantity and customer group for the whole chunk."""
+	cache = getattr(frappe.local, "subscription_plan_prices", None)
+	key = (plan.name, flt(quantity), customer_group)
+	if cache is not None and key in cache:
+		return cache[key]
+
+	price = get_price(
+		item_code=plan.item,
+		price_list=plan.price_list,
+		customer_group=customer_group,
+		company=None,
+		qty=quantity,
+	)
+	price_list_rate = price.price_list_rate if price else 0
+
+	if cache is not None:
+		cache[key] = price_list_rate
+
+	return price_list_rate
@@ -10,6 +10,9 @@ from frappe.model.meta import get_field_precision
 from frappe.utils import cint, cstr, flt, formatdate, getdate, now
 
 import erpnext
+from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+	invalidate_closing_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_accounting_dimensions,
 )
@@ -284,6 +287,11 @@ def save_entries(gl_map, adv_adj, update_outstanding, from_repost=False):
 	for entry in gl_map:
 		make_entry(entry, adv_adj, update_outstanding, from_repost)
 
+	if gl_map:
+		invalidate_closing_balances(
+			gl_map[0].get("company"), min(getdate(d["posting_date"]) for d in gl_map)
+		)
+
 
 def make_entry(args, adv_adj, update_outstanding, from_repost=False):
 	gle = frappe.new_doc("GL Entry")
@@ -485,6 +493,9 @@ def make_reverse_gl_entries(
 		validate_accounting_period(gl_entries)
 		check_freezing_date(gl_entries[0]["posting_date"], adv_adj)
 		set_as_cancel(gl_entries[0]["voucher_type"], gl_entries[0]["voucher_no"])
+		invalidate_closing_balances(
+			gl_entries[0].get("company"), min(getdate(d["posting_date"]) for d in gl_entries)
+		)
 
 		for entry in gl_entries:
 			new_gle = copy.deepcopy(entry)
@@ -32,6 +32,9 @@ from erpnext import get_company_currency
 from erpnext.accounts.utils import get_fiscal_year
 from erpnext.exceptions import InvalidAccountCurrency, PartyDisabled, PartyFrozen
 
+PARTY_CONTEXT_TYPES = ("Customer", "Supplier")
+PARTY_CONTEXT_CACHE_TTL = 24 * 60 * 60
+
 
 class DuplicatePartyAccountError(frappe.ValidationError):
 	pass
@@ -107,7 +110,8 @@ def _get_party_details(
 	):
 		frappe.throw(_("Not permitted for {0}").format(party), frappe.PermissionError)
 
-	party = frappe.get_doc(party_type, party)
+	context = get_party_context(party_type, party, company)
+	party = context.party if context else frappe.get_doc(party_type, party)
 	currency = party.get("default_currency") or currency or get_company_currency(company)
 
 	party_address, shipping_address = set_address_details(
@@ -119,8 +123,9 @@ def _get_party_details(
 		party_address,
 		company_address,
 		shipping_address,
+		context=context,
 	)
-	set_contact_details(party_details, party, party_type)
+	set_contact_details(party_details, party, party_type, context=context)
 	set_other_values(party_details, party, party_type)
 	set_price_list(party_details, party, party_type, price_list, pos_profile)
 
@@ -130,24 +135,42 @@ def _get_party_details(
 		shipping_address if party_type != "Supplier" else party_address,
 	)
 
-	tax_template = set_taxes(
-		party.name,
-		party_type,
-		posting_date,
-		company,
-		customer_group=party_details.customer_group,
-		supplier_group=party_details.supplier_group,
-		tax_category=party_details.tax_category,
-		billing_address=party_address,
-		shipping_address=shipping_address,
-	)
+	def get_tax_template():
+		return set_taxes(
+			party.name,
+			party_type,
+			posting_date,
+			company,
+			customer_group=party_details.customer_group,
+			supplier_group=party_details.supplier_group,
+			tax_category=party_details.tax_category,
+			billing_address=party_address,
+			shipping_address=shipping_address,
+		)
+
+	if context:
+		tax_template = get_party_context_value(
+			context,
+			(
+				"taxes_and_charges",
+				posting_date,
+				party_details.tax_category,
+				party_address,
+				shipping_address,
+			),
+			get_tax_template,
+		)
+	else:
+		tax_template = get_tax_template()
 
 	if tax_template:
 		party_details["taxes_and_charges"] = tax_template
 
 	if cint(fetch_payment_terms_template):
-		party_details["payment_terms_template"] = get_payment_terms_template(
-			party.name, party_type, company
+		party_details["payment_terms_template"] = (
+			context.payment_terms_template
+			if context and company
+			else get_payment_terms_template(party.name, party_type, company)
 		)
 
 	if not party_details.get("currency"):
@@ -166,13 +189,128 @@ def _get_party_details(
 
 	# supplier tax withholding category
 	if party_type == "Supplier" and party:
-		party_details["supplier_tds"] = frappe.get_value(
-			party_type, party.name, "tax_withholding_category"
-		)
+		party_details["supplier_tds"] = party.get("tax_withholding_category")
 
 	return party_details
 
 
+def get_party_context(party_type, party, company=None):
+	"""
+	Returns the details of a Customer or Supplier that every transaction and party validation
+	looks up: the party record, its default addresses and contact, and its account,
+	account currency and payment terms in the company.
+
+	The context is cached, keyed by the `modified` timestamp of the party and by versions that
+	are bumped when a linked Address or Contact changes, or when a Tax Rule, party group or
+	Company changes. Returns None for other party types.
+	"""
+	if party_type not in PARTY_CONTEXT_TYPES or not party:
+		return
+
+	key = get_party_context_key(party_type, party, company)
+	if not key:
+		return
+
+	context = frappe.cache().get_value(key)
+	if context is None or (
+		company
+		and context.gle_currency is None
+		and get_party_gle_currency(party_type, party, company)
+	):
+		# not cached yet, or the first GL Entry of the party was posted since it was cached
+		context = make_party_context(party_type, party, company)
+		context.cache_key = key
+		frappe.cache().set_value(key, context, expires_in_sec=PARTY_CONTEXT_CACHE_TTL)
+
+	return context
+
+
+def get_party_context_key(party_type, party, company=None):
+	modified = frappe.db.get_value(party_type, party, "modified")
+	if not modified:
+		return
+
+	cache = frappe.cache()
+	return "party_context:{}:{}:{}:{}:{}:{}".format(
+		cache.get_value("party_context_version"),
+		cache.get_value(get_party_context_version_key(party_type, party)),
+		party_type,
+		party,
+		company,
+		modified,
+	)
+
+
+def get_party_context_version_key(party_type, party):
+	return "party_context_version:{}:{}".format(party_type, party)
+
+
+def make_party_context(party_type, party, company=None):
+	context = frappe._dict(
+		{
+			"party": frappe.get_doc(party_type, party).as_dict(),
+			"billing_address": get_default_address(party_type, party),
+			"shipping_address": (
+				get_party_shipping_address(party_type, party) if party_type == "Customer" else None
+			),
+			"contact_person": get_default_contact(party_type, party),
+		}
+	)
+
+	context.address_display = {
+		address: get_address_display(address)
+		for address in (context.billing_address, context.shipping_address)
+		if address
+	}
+	context.contact_details = (
+		get_contact_details(context.contact_person) if context.contact_person else None
+	)
+
+	if company:
+		context.party_account = _get_party_account(party_type, party, company)
+		context.party_account_currency = frappe.db.get_value(
+			"Account", context.party_account, "account_currency", cache=True
+		)
+		context.gle_currency = get_party_gle_currency(party_type, party, company)
+		context.payment_terms_template = get_payment_terms_template(party, party_type, company)
+
+	return context
+
+
+def get_party_context_value(context, key, generator):
+	"""Returns the value computed by `generator` for `key`, cached along with the party context"""
+	cache_key = "{}:{}".format(context.cache_key, ":".join(cstr(k) for k in key))
+	value = frappe.cache().get_value(cache_key)
+	if value is None:
+		value = generator() or ""
+		frappe.cache().set_value(cache_key, value, expires_in_sec=PARTY_CONTEXT_CACHE_TTL)
+
+	return value or None
+
+
+def clear_party_context(party_type, party):
+	frappe.cache().set_value(
+		get_party_context_version_key(party_type, party), frappe.generate_hash(length=10)
+	)
+
+
+def clear_linked_party_contexts(doc, method=None):
+	"""Clears the contexts of the parties linked to the Address or Contact, before and after
+	the change"""
+	links = list(doc.get("links"))
+	if doc_before_save := doc.get_doc_before_save():
+		links += doc_before_save.get("links")
+
+	for link in links:
+		if link.link_doctype in PARTY_CONTEXT_TYPES:
+			clear_party_context(link.link_doctype, link.link_name)
+
+
+def clear_all_party_contexts(doc=None, method=None):
+	"""Clears the contexts of all the parties, on changes to Tax Rules, party groups or Companies"""
+	frappe.cache().set_value("party_context_version", frappe.generate_hash(length=10))
+
+
 def set_address_details(
 	party_details,
 	party,
@@ -182,25 +320,31 @@ def set_address_details(
 	party_address=None,
 	company_address=None,
 	shipping_address=None,
+	context=None,
 ):
+	def get_display(address):
+		if context and address in context.address_display:
+			return context.address_display[address]
+		return get_address_display(address)
+
 	billing_address_field = (
 		"customer_address" if party_type == "Lead" else party_type.lower() + "_address"
 	)
-	party_details[billing_address_field] = party_address or get_default_address(
-		party_type, party.name
+	party_details[billing_address_field] = party_address or (
+		context.billing_address if context else get_default_address(party_type, party.name)
 	)
 	if doctype:
 		party_details.update(
 			get_fetch_values(doctype, billing_address_field, party_details[billing_address_field])
 		)
 	# address display
-	party_details.address_display = get_address_display(party_details[billing_address_field])
+	party_details.address_display = get_display(party_details[billing_address_field])
 	# shipping address
 	if party_type in ["Customer", "Lead"]:
-		party_details.shipping_address_name = shipping_address or get_party_shipping_address(
-			party_type, party.name
+		party_details.shipping_address_name = shipping_address or (
+			context.shipping_address if context else get_party_shipping_address(party_type, party.name)
 		)
-		party_details.shipping_address = get_address_display(party_details["shipping_address_name"])
+		party_details.shipping_address = get_display(party_details["shipping_address_name"])
 		if doctype:
 			party_details.update(
 				get_fetch_values(doctype, "shipping_address_name", party_details.shipping_address_name)
@@ -235,8 +379,10 @@ def get_regional_address_details(party_details, doctype, company):
 	pass
 
 
-def set_contact_details(party_details, party, party_type):
-	party_details.contact_person = get_default_contact(party_type, party.name)
+def set_contact_details(party_details, party, party_type, context=None):
+	party_details.contact_person = (
+		context.contact_person if context else get_default_contact(party_type, party.name)
+	)
 
 	if not party_details.contact_person:
 		party_details.update(
@@ -250,6 +396,8 @@ def set_contact_details(party_details, party, party_type):
 				"contact_department": None,
 			}
 		)
+	elif context:
+		party_details.update(context.contact_details)
 	else:
 		party_details.update(get_contact_details(party_details.contact_person))
 
@@ -344,6 +492,14 @@ def get_party_account(party_type, party=None, company=None):
 
 		return frappe.get_cached_value("Company", company, default_account_name)
 
+	context = get_party_context(party_type, party, company)
+	if context:
+		return context.party_account
+
+	return _get_party_account(party_type, party, company)
+
+
+def _get_party_account(party_type, party, company):
 	account = frappe.db.get_value(
 		"Party Account", {"parenttype": party_type, "parent": party, "company": company}, "account"
 	)
@@ -425,7 +581,10 @@ def validate_party_gle_currency(party_type, party, company, party_account_curren
 	if not party_account_currency:
 		party_account_currency = get_party_account_currency(party_type, party, company)
 
-	existing_gle_currency = get_party_gle_currency(party_type, party, company)
+	context = get_party_context(party_type, party, company)
+	existing_gle_currency = (
+		context.gle_currency if context else get_party_gle_currency(party_type, party, company)
+	)
 
 	if existing_gle_currency and party_account_currency != existing_gle_currency:
 		frappe.throw(
@@ -1,7 +1,7 @@
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
-from erpnext.accounts.party import get_default_price_list
+from erpnext.accounts.party import _get_party_account, get_default_price_list, get_party_context
 
 
 class PartyTestCase(FrappeTestCase):
@@ -16,3 +16,30 @@ class PartyTestCase(FrappeTestCase):
 		customer.save()
 		price_list = get_default_price_list(customer)
 		assert price_list is None
+
+	def test_party_context_is_cleared_on_address_change(self):
+		context = get_party_context("Customer", "_Test Customer", "_Test Company")
+		self.assertEqual(context.party.name, "_Test Customer")
+		self.assertEqual(
+			context.party_account, _get_party_account("Customer", "_Test Customer", "_Test Company")
+		)
+
+		address = frappe.get_doc(
+			{
+				"doctype": "Address",
+				"address_title": "_Test Party Context Address",
+				"address_type": "Billing",
+				"is_primary_address": 1,
+				"address_line1": "Station Road",
+				"city": "_Test City",
+				"country": "India",
+				"links": [{"link_doctype": "Customer", "link_name": "_Test Customer"}],
+			}
+		).insert()
+
+		context = get_party_context("Customer", "_Test Customer", "_Test Company")
+		self.assertEqual(context.billing_address, address.name)
+
+		address.delete()
+		context = get_party_context("Customer", "_Test Customer", "_Test Company")
+		self.assertNotEqual(context.billing_address, address.name)
@@ -9,12 +9,17 @@ import frappe
 import frappe.defaults
 from frappe import _, qb, throw
 from frappe.model.meta import get_field_precision
+from frappe.query_builder import Criterion
 from frappe.utils import cint, cstr, flt, formatdate, get_number_format_info, getdate, now, nowdate
 
 import erpnext
 
 # imported to enable erpnext.accounts.utils.get_account_currency
 from erpnext.accounts.doctype.account.account import get_account_currency  # noqa
+from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+	get_closing_date,
+	invalidate_closing_balances,
+)
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_dimensions
 from erpnext.stock import get_warehouse_account_map
 from erpnext.stock.utils import get_stock_value_on
@@ -254,6 +259,174 @@ def get_balance_on(
 		return flt(bal)
 
 
+def get_balances_on(
+	accounts=None,
+	date=None,
+	party_type=None,
+	parties=None,
+	company=None,
+	in_account_currency=True,
+	cost_center=None,
+	ignore_account_permission=False,
+):
+	"""
+	Returns the balances of many accounts, or of many parties of `party_type` if no accounts are
+	given, as {account or party: balance}. Each balance is the same as `get_balance_on` returns.
+
+	Balances are summed in one grouped query per report type and company, and group accounts are
+	rolled up from their descendants using the nested set. Balance sheet balances start from the
+	closing balances of the latest Period Closing Voucher instead of the first GL Entry.
+	"""
+	accounts = list(accounts or [])
+	parties = list(parties or []) if party_type else []
+	if not (accounts or parties):
+		return {}
+
+	balances = dict.fromkeys(accounts or parties, 0.0)
+
+	try:
+		year_start_date = get_fiscal_year(date or nowdate(), company=company, verbose=0)[1]
+	except FiscalYearError:
+		if getdate(date or nowdate()) > getdate(nowdate()):
+			year_start_date = get_fiscal_year(nowdate(), verbose=1)[1]
+		else:
+			# date older than any existing fiscal year, hence balances are 0.0
+			return balances
+
+	filters = []
+	if parties:
+		filters += [["party_type", "=", party_type], ["party", "in", parties]]
+	if company:
+		filters.append(["company", "=", company])
+
+	if not accounts:
+		closing_date = get_closing_date(company, date or nowdate())
+		for party, balance in get_ledger_balances("party", filters, date, closing_date).items():
+			balances[party] = flt(
+				balance.balance_in_account_currency if in_account_currency else balance.balance
+			)
+
+		return balances
+
+	account_groups = {}
+	for account in get_accounts_for_balance(accounts, ignore_account_permission):
+		# if group and currency same as company, balance is based on company currency
+		account.in_account_currency = in_account_currency and not (
+			account.is_group
+			and account.account_currency
+			== frappe.get_cached_value("Company", account.company, "default_currency")
+		)
+		account_groups.setdefault((account.report_type, account.company), []).append(account)
+
+	for (report_type, account_company), account_list in account_groups.items():
+		descendants = get_account_descendants(account_list)
+		account_filters = filters + [["account", "in", list(descendants)]]
+
+		closing_date = None
+		if report_type == "Profit and Loss":
+			# for pl accounts, get balance within a fiscal year
+			account_filters += [
+				["posting_date", ">=", year_start_date],
+				["voucher_type", "!=", "Period Closing Voucher"],
+			]
+			if cost_center:
+				account_filters.append(get_cost_center_filter(cost_center))
+		else:
+			closing_date = get_closing_date(account_company, date or nowdate())
+
+		ledger_balances = get_ledger_balances("account", account_filters, date, closing_date)
+		for ledger, balance in ledger_balances.items():
+			for account in descendants.get(ledger, []):
+				balances[account.name] += flt(
+					balance.balance_in_account_currency if account.in_account_currency else balance.balance
+				)
+
+	return balances
+
+
+def get_accounts_for_balance(accounts, ignore_account_permission=False):
+	fields = ["name", "lft", "rgt", "is_group", "report_type", "account_currency", "company"]
+	if frappe.flags.ignore_account_permission or ignore_account_permission:
+		return frappe.get_all("Account", filters={"name": ("in", accounts)}, fields=fields)
+
+	account_details = frappe.get_list("Account", filters={"name": ("in", accounts)}, fields=fields)
+	permitted = {d.name for d in account_details}
+	for account in set(accounts) - permitted:
+		frappe.get_doc("Account", account).check_permission("read")
+
+	return account_details
+
+
+def get_account_descendants(accounts):
+	"""Returns {account: [requested accounts whose balance includes it]} for the requested
+	accounts and all the accounts under the requested groups"""
+	descendants = {}
+	groups = [d for d in accounts if d.is_group]
+	for account in accounts:
+		if not account.is_group:
+			descendants.setdefault(account.name, []).append(account)
+
+	if groups:
+		Account = frappe.qb.DocType("Account")
+		children = (
+			frappe.qb.from_(Account)
+			.select(Account.name, Account.lft, Account.rgt)
+			.where(Criterion.any([(Account.lft >= d.lft) & (Account.rgt <= d.rgt) for d in groups]))
+		).run(as_dict=True)
+
+		for child in children:
+			for group in groups:
+				if child.lft >= group.lft and child.rgt <= group.rgt:
+					descendants.setdefault(child.name, []).append(group)
+
+	return descendants
+
+
+def get_cost_center_filter(cost_center):
+	cc = frappe.get_cached_value("Cost Center", cost_center, ["lft", "rgt", "is_group"], as_dict=True)
+	if cc and cc.is_group:
+		return [
+			"cost_center",
+			"in",
+			frappe.get_all(
+				"Cost Center", filters={"lft": (">=", cc.lft), "rgt": ("<=", cc.rgt)}, pluck="name"
+			),
+		]
+
+	return ["cost_center", "=", cost_center]
+
+
+def get_ledger_balances(group_by, filters, date=None, closing_date=None):
+	"""Returns {value of `group_by`: balances} of the GL Entries matching `filters` till `date`.
+	If `closing_date` is given, the stored closing balances on that date are used in place of
+	the GL Entries till then."""
+	fields = [
+		group_by,
+		"sum(debit) - sum(credit) as balance",
+		"sum(debit_in_account_currency) - sum(credit_in_account_currency) as balance_in_account_currency",
+	]
+
+	gl_filters = filters + [["is_cancelled", "=", 0]]
+	if date:
+		gl_filters.append(["posting_date", "<=", getdate(date)])
+
+	sources = [("GL Entry", gl_filters)]
+	if closing_date:
+		gl_filters.append(["posting_date", ">", closing_date])
+		sources.append(("Account Closing Balance", filters + [["closing_date", "=", closing_date]]))
+
+	balances = {}
+	for doctype, doctype_filters in sources:
+		for d in frappe.get_all(doctype, filters=doctype_filters, fields=fields, group_by=group_by):
+			balance = balances.setdefault(
+				d[group_by], frappe._dict(balance=0.0, balance_in_account_currency=0.0)
+			)
+			balance.balance += flt(d.balance)
+			balance.balance_in_account_currency += flt(d.balance_in_account_currency)
+
+	return balances
+
+
 def get_count_on(account, fieldname, date):
 	cond = ["is_cancelled=0"]
 	if date:
@@ -969,14 +1142,23 @@ def get_account_balances(accounts, company):
 		return []
 
 	company_currency = frappe.get_cached_value("Company", company, "default_currency")
+	account_names = [account["value"] for account in accounts]
+
+	balances = get_balances_on(account_names, in_account_currency=False, company=company)
+	balances_in_account_currency = get_balances_on(
+		[
+			account["value"]
+			for account in accounts
+			if account["account_currency"] and account["account_currency"] != company_currency
+		],
+		company=company,
+	)
 
 	for account in accounts:
 		account["company_currency"] = company_currency
-		account["balance"] = flt(
-			get_balance_on(account["value"], in_account_currency=False, company=company)
-		)
-		if account["account_currency"] and account["account_currency"] != company_currency:
-			account["balance_in_account_currency"] = flt(get_balance_on(account["value"], company=company))
+		account["balance"] = flt(balances.get(account["value"]))
+		if account["value"] in balances_in_account_currency:
+			account["balance_in_account_currency"] = flt(balances_in_account_currency[account["value"]])
 
 	return accounts
 
@@ -1154,6 +1336,7 @@ def repost_gle_for_stock_vouchers(
 				voucher_obj.make_gl_entries(gl_entries=expected_gle, from_repost=True)
 		else:
 			_delete_gl_entries(voucher_type, voucher_no)
+			invalidate_closing_balances(voucher_obj.company, voucher_obj.posting_date)
 
 
 def sort_stock_vouchers_by_posting_date(
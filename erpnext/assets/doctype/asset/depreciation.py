@@ -4,14 +4,24 @@
 
 import frappe
 from frappe import _
-from frappe.utils import cint, flt, getdate, today
+from frappe.utils import cint, create_batch, flt, getdate, today
 
+import erpnext
 from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 	get_checks_for_pl_and_bs_accounts,
 )
 
+# maximum number of schedule rows posted in one consolidated depreciation entry
+DEPRECIATION_ENTRY_BATCH_SIZE = 500
+
 
 def post_depreciation_entries(date=None):
+	"""Posts the depreciation due till `date` for all assets.
+
+	Due schedule rows are fetched in one query and grouped by company, finance book, accounts,
+	cost center, accounting dimensions and schedule date. Each group is posted as one Journal Entry
+	with a credit and debit line per asset, and committed on its own, so an interrupted run resumes
+	from the rows that are still not linked to a Journal Entry."""
 	# Return if automatic booking of asset depreciation is disabled
 	if not cint(
 		frappe.db.get_value("Accounts Settings", None, "book_asset_depreciation_entry_automatically")
@@ -20,9 +30,19 @@ def post_depreciation_entries(date=None):
 
 	if not date:
 		date = today()
-	for asset in get_depreciable_assets(date):
-		make_depreciation_entry(asset, date)
-		frappe.db.commit()
+
+	for group, rows in get_due_depreciation_groups(date):
+		for batch in create_batch(rows, DEPRECIATION_ENTRY_BATCH_SIZE):
+			try:
+				make_consolidated_depreciation_entry(group, batch)
+				frappe.db.commit()
+			except Exception:
+				frappe.db.rollback()
+				frappe.log_error(
+					title=_("Error while posting depreciation entries for {0}").format(
+						", ".join(sorted({row.asset for row in batch}))
+					)
+				)
 
 
 def get_depreciable_assets(date):
@@ -36,6 +56,73 @@ def get_depreciable_assets(date):
 	)
 
 
+def get_due_depreciation_schedules(date, dimension_fields=None):
+	"""Returns schedule rows due till `date` that are not yet booked, with the asset details
+	needed to post them"""
+	dimension_columns = "".join(", a.`{0}`".format(field) for field in dimension_fields or [])
+
+	return frappe.db.sql(
+		"""select ds.name, ds.parent as asset, ds.schedule_date, ds.depreciation_amount,
+			ds.finance_book, ds.finance_book_id, a.company, a.asset_category, a.cost_center {0}
+		from tabAsset a, `tabDepreciation Schedule` ds
+		where a.name = ds.parent and ds.parenttype = 'Asset' and a.docstatus=1
+			and ds.schedule_date<=%s and a.calculate_depreciation = 1
+			and a.status in ('Submitted', 'Partially Depreciated')
+			and ifnull(ds.journal_entry, '')=''
+		order by a.company, ds.schedule_date, ds.parent, ds.idx""".format(
+			dimension_columns
+		),
+		date,
+		as_dict=1,
+	)
+
+
+def get_due_depreciation_groups(date):
+	"""Returns a list of (group, schedule rows) for the due schedule rows, grouped by the values
+	that are common to one depreciation entry"""
+	accounting_dimensions = get_checks_for_pl_and_bs_accounts()
+	dimension_fields = list({dimension["fieldname"] for dimension in accounting_dimensions})
+
+	accounts_cache, company_cache = {}, {}
+	groups = {}
+
+	for row in get_due_depreciation_schedules(date, dimension_fields):
+		category_key = (row.asset_category, row.company)
+		if category_key not in accounts_cache:
+			_, accumulated_depreciation_account, depreciation_expense_account = get_depreciation_accounts(
+				row
+			)
+			accounts_cache[category_key] = get_credit_and_debit_accounts(
+				accumulated_depreciation_account, depreciation_expense_account
+			)
+
+		if row.company not in company_cache:
+			company_cache[row.company] = frappe.get_cached_value(
+				"Company", row.company, ["depreciation_cost_center", "series_for_depreciation_entry"]
+			)
+
+		credit_account, debit_account = accounts_cache[category_key]
+		depreciation_cost_center, depreciation_series = company_cache[row.company]
+		credit_dimensions, debit_dimensions = get_depreciation_entry_dimensions(
+			row, accounting_dimensions
+		)
+
+		group = frappe._dict(
+			company=row.company,
+			finance_book=row.finance_book,
+			schedule_date=row.schedule_date,
+			naming_series=depreciation_series,
+			credit_account=credit_account,
+			debit_account=debit_account,
+			cost_center=row.cost_center or depreciation_cost_center,
+			credit_dimensions=tuple(sorted(credit_dimensions.items())),
+			debit_dimensions=tuple(sorted(debit_dimensions.items())),
+		)
+		groups.setdefault(tuple(group.values()), (group, []))[1].append(row)
+
+	return list(groups.values())
+
+
 @frappe.whitelist()
 def make_depreciation_entry(asset_name, date=None):
 	frappe.has_permission("Journal Entry", throw=True)
@@ -88,22 +175,11 @@ def make_depreciation_entry(asset_name, date=None):
 				"cost_center": depreciation_cost_center,
 			}
 
-			for dimension in accounting_dimensions:
-				if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_bs"):
-					credit_entry.update(
-						{
-							dimension["fieldname"]: asset.get(dimension["fieldname"])
-							or dimension.get("default_dimension")
-						}
-					)
-
-				if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_pl"):
-					debit_entry.update(
-						{
-							dimension["fieldname"]: asset.get(dimension["fieldname"])
-							or dimension.get("default_dimension")
-						}
-					)
+			credit_dimensions, debit_dimensions = get_depreciation_entry_dimensions(
+				asset, accounting_dimensions
+			)
+			credit_entry.update(credit_dimensions)
+			debit_entry.update(debit_dimensions)
 
 			je.append("accounts", credit_entry)
 
@@ -126,6 +202,169 @@ def make_depreciation_entry(asset_name, date=None):
 	return asset
 
 
+def make_consolidated_depreciation_entry(group, schedules):
+	"""Posts one Journal Entry for the given due schedule rows, all sharing the values in `group`,
+	and updates the schedules and asset values in bulk"""
+	je = frappe.new_doc("Journal Entry")
+	je.voucher_type = "Depreciation Entry"
+	je.naming_series = group.naming_series
+	je.posting_date = group.schedule_date
+	je.company = group.company
+	je.finance_book = group.finance_book
+
+	total_depreciation = sum(flt(d.depreciation_amount) for d in schedules)
+	assets = list({d.asset: None for d in schedules})
+	if len(assets) == 1:
+		je.remark = "Depreciation Entry against {0} worth {1}".format(assets[0], total_depreciation)
+	else:
+		je.remark = "Depreciation Entry against {0} assets worth {1}".format(
+			len(assets), total_depreciation
+		)
+
+	for d in schedules:
+		credit_entry = {
+			"account": group.credit_account,
+			"credit_in_account_currency": d.depreciation_amount,
+			"reference_type": "Asset",
+			"reference_name": d.asset,
+			"cost_center": group.cost_center,
+		}
+		credit_entry.update(dict(group.credit_dimensions))
+
+		debit_entry = {
+			"account": group.debit_account,
+			"debit_in_account_currency": d.depreciation_amount,
+			"reference_type": "Asset",
+			"reference_name": d.asset,
+			"cost_center": group.cost_center,
+		}
+		debit_entry.update(dict(group.debit_dimensions))
+
+		je.append("accounts", credit_entry)
+		je.append("accounts", debit_entry)
+
+	je.flags.ignore_permissions = True
+	je.save()
+	if not je.meta.get_workflow():
+		je.submit()
+
+	DepreciationSchedule = frappe.qb.DocType("Depreciation Schedule")
+	(
+		frappe.qb.update(DepreciationSchedule)
+		.set(DepreciationSchedule.journal_entry, je.name)
+		.where(DepreciationSchedule.name.isin([d.name for d in schedules]))
+	).run()
+
+	update_value_after_depreciation(schedules)
+	update_asset_status(assets)
+
+	return je
+
+
+def update_value_after_depreciation(schedules):
+	"""Reduces the value after depreciation of the booked finance books in one update"""
+	amounts = {}
+	for d in schedules:
+		key = (d.asset, cint(d.finance_book_id) or 1)
+		amounts[key] = amounts.get(key, 0) + flt(d.depreciation_amount)
+
+	finance_books = frappe.get_all(
+		"Asset Finance Book",
+		filters={"parent": ("in", list({d.asset for d in schedules})), "parenttype": "Asset"},
+		fields=["name", "parent", "idx"],
+	)
+
+	AssetFinanceBook = frappe.qb.DocType("Asset Finance Book")
+	depreciation_amount = frappe.qb.terms.Case()
+	names = []
+	for row in finance_books:
+		amount = amounts.get((row.parent, cint(row.idx)))
+		if amount:
+			depreciation_amount = depreciation_amount.when(AssetFinanceBook.name == row.name, amount)
+			names.append(row.name)
+
+	if names:
+		(
+			frappe.qb.update(AssetFinanceBook)
+			.set(
+				AssetFinanceBook.value_after_depreciation,
+				AssetFinanceBook.value_after_depreciation - depreciation_amount.else_(0),
+			)
+			.where(AssetFinanceBook.name.isin(names))
+		).run()
+
+
+def update_asset_status(assets):
+	"""Sets the status of submitted assets from their finance books, as `Asset.get_status` does,
+	with one update per status"""
+	asset_details = frappe.get_all(
+		"Asset",
+		filters={"name": ("in", assets)},
+		fields=[
+			"name",
+			"company",
+			"status",
+			"journal_entry_for_scrap",
+			"gross_purchase_amount",
+			"default_finance_book",
+		],
+	)
+	finance_books = {}
+	for row in frappe.get_all(
+		"Asset Finance Book",
+		filters={"parent": ("in", assets), "parenttype": "Asset"},
+		fields=["parent", "finance_book", "value_after_depreciation", "expected_value_after_useful_life"],
+		order_by="idx",
+	):
+		finance_books.setdefault(row.parent, []).append(row)
+
+	assets_by_status = {}
+	for asset in asset_details:
+		status = "Submitted"
+		if asset.journal_entry_for_scrap:
+			status = "Scrapped"
+		elif finance_books.get(asset.name):
+			rows = finance_books[asset.name]
+			default_finance_book = asset.default_finance_book or erpnext.get_default_finance_book(
+				asset.company
+			)
+			row = next(
+				(d for d in rows if default_finance_book and d.finance_book == default_finance_book),
+				rows[0],
+			)
+
+			if flt(row.value_after_depreciation) <= row.expected_value_after_useful_life:
+				status = "Fully Depreciated"
+			elif flt(row.value_after_depreciation) < flt(asset.gross_purchase_amount):
+				status = "Partially Depreciated"
+
+		if status != asset.status:
+			assets_by_status.setdefault(status, []).append(asset.name)
+
+	Asset = frappe.qb.DocType("Asset")
+	for status, names in assets_by_status.items():
+		frappe.qb.update(Asset).set(Asset.status, status).where(Asset.name.isin(names)).run()
+
+
+def get_depreciation_entry_dimensions(asset, accounting_dimensions):
+	"""Returns the accounting dimensions to be set on the credit and debit rows of the
+	depreciation entry of an asset"""
+	credit_dimensions, debit_dimensions = {}, {}
+
+	for dimension in accounting_dimensions:
+		if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_bs"):
+			credit_dimensions[dimension["fieldname"]] = asset.get(
+				dimension["fieldname"]
+			) or dimension.get("default_dimension")
+
+		if asset.get(dimension["fieldname"]) or dimension.get("mandatory_for_pl"):
+			debit_dimensions[dimension["fieldname"]] = asset.get(
+				dimension["fieldname"]
+			) or dimension.get("default_dimension")
+
+	return credit_dimensions, debit_dimensions
+
+
 def get_depreciation_accounts(asset):
 	fixed_asset_account = accumulated_depreciation_account = depreciation_expense_account = None
 
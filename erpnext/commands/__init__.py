@@ -2,10 +2,42 @@
 # GPL v3 License. See license.txt
 
 import click
+import frappe
+from frappe.commands import pass_context
 
 
 def call_command(cmd, context):
 	return click.Context(cmd, obj=context).forward(cmd)
 
 
-commands = []
+@click.command("rebuild-batch-bins")
+@click.option(
+	"--verify", is_flag=True, default=False, help="Only list the batch bins not matching the ledger"
+)
+@pass_context
+def rebuild_batch_bins(context, verify=False):
+	"Rebuild batch-wise quantities in Batch Bin from the Stock Ledger Entries"
+	from erpnext.stock.doctype.batch_bin.batch_bin import rebuild_batch_bins, verify_batch_bins
+
+	for site in context.sites:
+		frappe.init(site=site)
+		frappe.connect()
+		try:
+			mismatches = verify_batch_bins()
+			for item_code, warehouse, batch_no, batch_bin_qty, ledger_qty in mismatches:
+				click.echo(
+					f"{item_code}, {warehouse}, {batch_no}: Batch Bin qty {batch_bin_qty}, "
+					f"Stock Ledger qty {ledger_qty}"
+				)
+
+			if not mismatches:
+				click.echo(f"Batch Bins of {site} match the Stock Ledger")
+			elif not verify:
+				rebuild_batch_bins()
+				frappe.db.commit()
+				click.echo(f"Rebuilt Batch Bins of {site}")
+		finally:
+			frappe.destroy()
+
+
+commands = [rebuild_batch_bins]
@@ -3,11 +3,12 @@
 
 
 import json
+from collections import defaultdict
 
 import frappe
 from frappe import _, throw
 from frappe.model.workflow import get_workflow_name, is_transition_condition_satisfied
-from frappe.query_builder.functions import Sum
+from frappe.query_builder.functions import Coalesce, Min, Sum
 from frappe.utils import (
 	add_days,
 	add_months,
@@ -47,6 +48,9 @@ from erpnext.controllers.sales_and_purchase_return import validate_return
 from erpnext.exceptions import InvalidCurrency
 from erpnext.setup.utils import get_exchange_rate
 from erpnext.stock.doctype.packed_item.packed_item import make_packing_list
+from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+	delete_serial_no_ledger_entries,
+)
 from erpnext.stock.get_item_details import (
 	_get_item_tax_template,
 	get_conversion_factor,
@@ -73,6 +77,9 @@ force_item_fields = (
 	"total_weight",
 )
 
+# unallocated advances loaded by "Get Advances", oldest first
+ADVANCES_PAGE_LENGTH = 100
+
 
 class AccountsController(TransactionBase):
 	def __init__(self, *args, **kwargs):
@@ -211,6 +218,7 @@ class AccountsController(TransactionBase):
 				"delete from `tabStock Ledger Entry` where voucher_type=%s and voucher_no=%s",
 				(self.doctype, self.name),
 			)
+			delete_serial_no_ledger_entries(self.doctype, self.name)
 
 	def validate_deferred_income_expense_account(self):
 		field_map = {
@@ -780,7 +788,7 @@ class AccountsController(TransactionBase):
 	def set_advances(self):
 		"""Returns list of advances against Account, Party, Reference"""
 
-		res = self.get_advance_entries()
+		res = self.get_advance_entries(limit=ADVANCES_PAGE_LENGTH)
 
 		self.set("advances", [])
 		advance_allocated = 0
@@ -809,7 +817,9 @@ class AccountsController(TransactionBase):
 
 			self.append("advances", advance_row)
 
-	def get_advance_entries(self, include_unallocated=True):
+	def get_advance_entries(self, include_unallocated=True, limit=None, start=0):
+		"""Returns the advances against the orders of the invoice, and with `include_unallocated`,
+		the oldest unallocated advances of the party, `limit` vouchers from `start`"""
 		if self.doctype == "Sales Invoice":
 			party_account = self.debit_to
 			party_type = "Customer"
@@ -827,12 +837,31 @@ class AccountsController(TransactionBase):
 
 		order_list = list(set(d.get(order_field) for d in self.get("items") if d.get(order_field)))
 
+		unallocated_vouchers = {}
+		if include_unallocated:
+			unallocated_vouchers = get_unallocated_advance_vouchers(
+				party_type, party, party_account, limit=limit, start=start
+			)
+
 		journal_entries = get_advance_journal_entries(
-			party_type, party, party_account, amount_field, order_doctype, order_list, include_unallocated
+			party_type,
+			party,
+			party_account,
+			amount_field,
+			order_doctype,
+			order_list,
+			include_unallocated=bool(unallocated_vouchers.get("Journal Entry")),
+			vouchers=unallocated_vouchers.get("Journal Entry"),
 		)
 
 		payment_entries = get_advance_payment_entries(
-			party_type, party, party_account, order_doctype, order_list, include_unallocated
+			party_type,
+			party,
+			party_account,
+			order_doctype,
+			order_list,
+			include_unallocated=bool(unallocated_vouchers.get("Payment Entry")),
+			vouchers=unallocated_vouchers.get("Payment Entry"),
 		)
 
 		res = journal_entries + payment_entries
@@ -1177,10 +1206,22 @@ class AccountsController(TransactionBase):
 				)
 
 	def validate_multiple_billing(self, ref_dt, item_ref_dn, based_on, parentfield):
-		from erpnext.controllers.status_updater import get_allowance_for
+		from erpnext.controllers.status_updater import get_allowances_for
 
-		item_allowance = {}
-		global_qty_allowance, global_amount_allowance = None, None
+		items = [item for item in self.get("items") if item.get(item_ref_dn)]
+		if not items:
+			return
+
+		ref_names = list({item.get(item_ref_dn) for item in items})
+		ref_amounts = self.get_reference_amounts(ref_dt + " Item", ref_names, based_on)
+		billed_amounts = self.get_billed_amounts_for_items(
+			items[0].doctype, item_ref_dn, ref_names, based_on
+		)
+		allowances = get_allowances_for({item.item_code for item in items}, "amount")
+
+		draft_amounts = defaultdict(float)
+		for item in items:
+			draft_amounts[item.get(item_ref_dn)] += flt(item.get(based_on))
 
 		role_allowed_to_over_bill = frappe.db.get_single_value(
 			"Accounts Settings", "role_allowed_to_over_bill"
@@ -1189,14 +1230,8 @@ class AccountsController(TransactionBase):
 
 		total_overbilled_amt = 0.0
 
-		for item in self.get("items"):
-			if not item.get(item_ref_dn):
-				continue
-
-			ref_amt = flt(
-				frappe.db.get_value(ref_dt + " Item", item.get(item_ref_dn), based_on),
-				self.precision(based_on, item),
-			)
+		for item in items:
+			ref_amt = flt(ref_amounts.get(item.get(item_ref_dn)), self.precision(based_on, item))
 			if not ref_amt:
 				frappe.msgprint(
 					_("System will not check overbilling since amount for Item {0} in {1} is zero").format(
@@ -1207,17 +1242,16 @@ class AccountsController(TransactionBase):
 				)
 				continue
 
-			already_billed = self.get_billed_amount_for_item(item, item_ref_dn, based_on)
+			already_billed = flt(billed_amounts.get(item.get(item_ref_dn)))
+			if not self.is_new():
+				# other rows of this draft linked to the same reference
+				already_billed += draft_amounts[item.get(item_ref_dn)] - flt(item.get(based_on))
 
 			total_billed_amt = flt(
 				flt(already_billed) + flt(item.get(based_on)), self.precision(based_on, item)
 			)
 
-			allowance, item_allowance, global_qty_allowance, global_amount_allowance = get_allowance_for(
-				item.item_code, item_allowance, global_qty_allowance, global_amount_allowance, "amount"
-			)
-
-			max_allowed_amt = flt(ref_amt * (100 + allowance) / 100)
+			max_allowed_amt = flt(ref_amt * (100 + allowances[item.item_code]) / 100)
 
 			if total_billed_amt < 0 and max_allowed_amt < 0:
 				# while making debit note against purchase return entry(purchase receipt) getting overbill error
@@ -1246,47 +1280,37 @@ class AccountsController(TransactionBase):
 				alert=True,
 			)
 
-	def get_billed_amount_for_item(self, item, item_ref_dn, based_on):
+	@staticmethod
+	def get_reference_amounts(ref_item_doctype, ref_names, based_on):
+		"""Returns {reference item row: `based_on` amount}"""
+		ref_item = frappe.qb.DocType(ref_item_doctype)
+		return dict(
+			frappe.qb.from_(ref_item)
+			.select(ref_item.name, frappe.qb.Field(based_on))
+			.where(ref_item.name.isin(ref_names))
+			.run()
+		)
+
+	def get_billed_amounts_for_items(self, item_doctype, item_ref_dn, ref_names, based_on):
 		"""
 		Returns Sum of Amount of
-		Sales/Purchase Invoice Items
-		that are linked to `item_ref_dn` (`dn_detail` / `pr_detail`)
-		that are submitted OR not submitted but are under current invoice
+		submitted Sales/Purchase Invoice Items, other than the ones of this invoice,
+		grouped by the `item_ref_dn` (`dn_detail` / `pr_detail`) they are linked to
 		"""
-
-		from frappe.query_builder import Criterion
-		from frappe.query_builder.functions import Sum
-
-		item_doctype = frappe.qb.DocType(item.doctype)
-		based_on_field = frappe.qb.Field(based_on)
+		invoice_item = frappe.qb.DocType(item_doctype)
 		join_field = frappe.qb.Field(item_ref_dn)
 
-		result = (
-			frappe.qb.from_(item_doctype)
-			.select(Sum(based_on_field))
-			.where(join_field == item.get(item_ref_dn))
+		return dict(
+			frappe.qb.from_(invoice_item)
+			.select(join_field, Sum(frappe.qb.Field(based_on)))
 			.where(
-				Criterion.any(
-					[  # select all items from other invoices OR current invoices
-						Criterion.all(
-							[  # for selecting items from other invoices
-								item_doctype.docstatus == 1,
-								item_doctype.parent != self.name,
-							]
-						),
-						Criterion.all(
-							[  # for selecting items from current invoice, that are linked to same reference
-								item_doctype.docstatus == 0,
-								item_doctype.parent == self.name,
-								item_doctype.name != item.name,
-							]
-						),
-					]
-				)
+				(join_field.isin(ref_names))
+				& (invoice_item.docstatus == 1)
+				& (invoice_item.parent != self.name)
 			)
-		).run()
-
-		return result[0][0] if result else 0
+			.groupby(join_field)
+			.run()
+		)
 
 	def throw_overbill_exception(self, item, max_allowed_amt):
 		frappe.throw(
@@ -2016,14 +2040,26 @@ def get_advance_journal_entries(
 	order_doctype,
 	order_list,
 	include_unallocated=True,
+	vouchers=None,
 ):
+	"""Returns the advance rows of Journal Entries against the orders, and with
+	`include_unallocated`, the ones without a reference, of `vouchers` if given"""
 	dr_or_cr = (
 		"credit_in_account_currency" if party_type == "Customer" else "debit_in_account_currency"
 	)
 
 	conditions = []
+	values = []
 	if include_unallocated:
-		conditions.append("ifnull(t2.reference_name, '')=''")
+		if vouchers:
+			conditions.append(
+				" (ifnull(t2.reference_name, '')='' and t1.name in ({0}))".format(
+					", ".join(["%s"] * len(vouchers))
+				)
+			)
+			values += vouchers
+		else:
+			conditions.append("ifnull(t2.reference_name, '')=''")
 
 	if order_list:
 		order_condition = ", ".join(["%s"] * len(order_list))
@@ -2032,8 +2068,12 @@ def get_advance_journal_entries(
 				order_doctype, order_condition
 			)
 		)
+		values += order_list
+
+	if not conditions:
+		return []
 
-	reference_condition = " and (" + " or ".join(conditions) + ")" if conditions else ""
+	reference_condition = " and (" + " or ".join(conditions) + ")"
 
 	# nosemgrep
 	journal_entries = frappe.db.sql(
@@ -2052,7 +2092,7 @@ def get_advance_journal_entries(
 		order by t1.posting_date""".format(
 			amount_field, dr_or_cr, reference_condition
 		),
-		[party_account, party_type, party] + order_list,
+		[party_account, party_type, party] + values,
 		as_dict=1,
 	)
 
@@ -2069,6 +2109,7 @@ def get_advance_payment_entries(
 	against_all_orders=False,
 	limit=None,
 	condition=None,
+	vouchers=None,
 ):
 	party_account_field = "paid_from" if party_type == "Customer" else "paid_to"
 	currency_field = (
@@ -2112,6 +2153,13 @@ def get_advance_payment_entries(
 		)
 
 	if include_unallocated:
+		values = [party_account, party_type, party, payment_type]
+		if vouchers:
+			condition = (condition or "") + " and name in ({0})".format(
+				", ".join(["%s"] * len(vouchers))
+			)
+			values += vouchers
+
 		unallocated_payment_entries = frappe.db.sql(
 			"""
 				select "Payment Entry" as reference_type, name as reference_name, posting_date,
@@ -2124,13 +2172,70 @@ def get_advance_payment_entries(
 			""".format(
 				party_account_field, limit_cond, exchange_rate_field, currency_field, condition=condition or ""
 			),
-			(party_account, party_type, party, payment_type),
+			values,
 			as_dict=1,
 		)
 
 	return list(payment_entries_against_order) + list(unallocated_payment_entries)
 
 
+def get_unallocated_advance_vouchers(party_type, party, party_account, limit=None, start=0):
+	"""Returns {voucher_type: [voucher_no]} of the oldest Payment and Journal Entries of the party
+	with an unallocated balance in the party account, from the Payment Ledger.
+
+	An unallocated balance is booked against the voucher itself, and has the opposite sign of
+	the outstanding of an invoice. Journal Entries are only taken if they have an unreferenced
+	advance row of the party, as `get_advance_journal_entries` drops the others."""
+	ple = frappe.qb.DocType("Payment Ledger Entry")
+	jea = frappe.qb.DocType("Journal Entry Account")
+	dr_or_cr = (
+		jea.credit_in_account_currency if party_type == "Customer" else jea.debit_in_account_currency
+	)
+	advance_journal_entries = (
+		frappe.qb.from_(jea)
+		.select(jea.parent)
+		.where(
+			(jea.party_type == party_type)
+			& (jea.party == party)
+			& (jea.account == party_account)
+			& (jea.is_advance == "Yes")
+			& (Coalesce(jea.reference_name, "") == "")
+			& (dr_or_cr > 0)
+		)
+	)
+	query = (
+		frappe.qb.from_(ple)
+		.select(ple.voucher_type, ple.voucher_no)
+		.where(
+			(ple.party_type == party_type)
+			& (ple.party == party)
+			& (ple.account == party_account)
+			& (ple.delinked == 0)
+			& (
+				(ple.voucher_type == "Payment Entry")
+				| (
+					(ple.voucher_type == "Journal Entry")
+					& (ple.voucher_no.isin(advance_journal_entries))
+				)
+			)
+			& (ple.against_voucher_type == ple.voucher_type)
+			& (ple.against_voucher_no == ple.voucher_no)
+		)
+		.groupby(ple.voucher_type, ple.voucher_no)
+		.having(Sum(ple.amount_in_account_currency) < 0)
+		.orderby(Min(ple.posting_date))
+		.orderby(ple.voucher_no)
+	)
+	if limit:
+		query = query.limit(limit).offset(start)
+
+	vouchers = {}
+	for voucher_type, voucher_no in query.run():
+		vouchers.setdefault(voucher_type, []).append(voucher_no)
+
+	return vouchers
+
+
 def update_invoice_status():
 	"""Updates status as Overdue for applicable invoices. Runs daily."""
 	today = getdate()
@@ -15,6 +15,7 @@ from erpnext.controllers.stock_controller import StockController
 from erpnext.controllers.subcontracting import Subcontracting
 from erpnext.stock.get_item_details import get_conversion_factor
 from erpnext.stock.utils import get_incoming_rate
+from erpnext.utilities.instrumentation import instrument
 
 
 class QtyMismatchError(ValidationError):
@@ -460,6 +461,7 @@ class BuyingController(StockController, Subcontracting):
 				if status in ("Closed", "On Hold"):
 					frappe.throw(_("{0} {1} is {2}").format(ref_doctype, d.get(ref_fieldname), status))
 
+	@instrument
 	def update_stock_ledger(self, allow_negative_stock=False, via_landed_cost_voucher=False):
 		self.update_ordered_and_reserved_qty()
 
@@ -12,6 +12,7 @@ from frappe.utils import nowdate, unique
 
 import erpnext
 from erpnext.stock.get_item_details import _get_item_tax_template
+from erpnext.utilities.doctype.link_search_token.link_search_token import get_link_search_condition
 
 
 # searches for active employees
@@ -87,8 +88,13 @@ def customer_query(doctype, txt, searchfield, start, page_len, filters):
 
 	fields = get_fields("Customer", fields)
 
-	searchfields = frappe.get_meta("Customer").get_search_fields()
-	searchfields = " or ".join(field + " like %(txt)s" for field in searchfields)
+	search_values = {}
+	search_condition = get_link_search_condition("Customer", txt, "`tabCustomer`.name")
+	if search_condition:
+		searchfields, search_values = search_condition
+	else:
+		searchfields = frappe.get_meta("Customer").get_search_fields()
+		searchfields = " or ".join(field + " like %(txt)s" for field in searchfields)
 
 	return frappe.db.sql(
 		"""select {fields} from `tabCustomer`
@@ -108,7 +114,13 @@ def customer_query(doctype, txt, searchfield, start, page_len, filters):
 				"fcond": get_filters_cond(doctype, filters, conditions).replace("%", "%%"),
 			}
 		),
-		{"txt": "%%%s%%" % txt, "_txt": txt.replace("%", ""), "start": start, "page_len": page_len},
+		{
+			"txt": "%%%s%%" % txt,
+			"_txt": txt.replace("%", ""),
+			"start": start,
+			"page_len": page_len,
+			**search_values,
+		},
 	)
 
 
@@ -125,11 +137,17 @@ def supplier_query(doctype, txt, searchfield, start, page_len, filters):
 
 	fields = get_fields("Supplier", fields)
 
+	search_values = {}
+	search_condition = get_link_search_condition("Supplier", txt, "`tabSupplier`.name")
+	if search_condition:
+		scond, search_values = search_condition
+	else:
+		scond = "{key} like %(txt)s or supplier_name like %(txt)s".format(key=searchfield)
+
 	return frappe.db.sql(
 		"""select {field} from `tabSupplier`
 		where docstatus < 2
-			and ({key} like %(txt)s
-			or supplier_name like %(txt)s) and disabled=0
+			and ({scond}) and disabled=0
 			and (on_hold = 0 or (on_hold = 1 and CURDATE() > release_date))
 			{mcond}
 		order by
@@ -138,9 +156,15 @@ def supplier_query(doctype, txt, searchfield, start, page_len, filters):
 			idx desc,
 			name, supplier_name
 		limit %(start)s, %(page_len)s """.format(
-			**{"field": ", ".join(fields), "key": searchfield, "mcond": get_match_cond(doctype)}
+			**{"field": ", ".join(fields), "scond": scond, "mcond": get_match_cond(doctype)}
 		),
-		{"txt": "%%%s%%" % txt, "_txt": txt.replace("%", ""), "start": start, "page_len": page_len},
+		{
+			"txt": "%%%s%%" % txt,
+			"_txt": txt.replace("%", ""),
+			"start": start,
+			"page_len": page_len,
+			**search_values,
+		},
 	)
 
 
@@ -256,10 +280,22 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			filters.pop("customer", None)
 			filters.pop("supplier", None)
 
-	description_cond = ""
-	if frappe.db.count("Item", cache=True) < 50000:
-		# scan description only if items are less than 50000
-		description_cond = "or tabItem.description LIKE %(txt)s"
+	search_values = {}
+	search_condition = get_link_search_condition("Item", txt, "tabItem.name")
+	if search_condition:
+		# item code, name, description and barcode words are all in the search index
+		scond, search_values = search_condition
+	else:
+		description_cond = ""
+		if frappe.db.count("Item", cache=True) < 50000:
+			# scan description only if items are less than 50000
+			description_cond = "or tabItem.description LIKE %(txt)s"
+
+		scond = """{searchfields} or tabItem.item_code IN
+			(select parent from `tabItem Barcode` where barcode LIKE %(txt)s) {description_cond}""".format(
+			searchfields=searchfields, description_cond=description_cond
+		)
+
 	return frappe.db.sql(
 		"""select
 			tabItem.name, tabItem.item_name, tabItem.item_group,
@@ -271,8 +307,7 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			and tabItem.disabled=0
 			and tabItem.has_variants=0
 			and (tabItem.end_of_life > %(today)s or ifnull(tabItem.end_of_life, '0000-00-00')='0000-00-00')
-			and ({scond} or tabItem.item_code IN (select parent from `tabItem Barcode` where barcode LIKE %(txt)s)
-				{description_cond})
+			and ({scond})
 			{fcond} {mcond}
 		order by
 			if(locate(%(_txt)s, name), locate(%(_txt)s, name), 99999),
@@ -281,10 +316,9 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			name, item_name
 		limit %(start)s, %(page_len)s """.format(
 			columns=columns,
-			scond=searchfields,
+			scond=scond,
 			fcond=get_filters_cond(doctype, filters, conditions).replace("%", "%%"),
 			mcond=get_match_cond(doctype).replace("%", "%%"),
-			description_cond=description_cond,
 		),
 		{
 			"today": nowdate(),
@@ -292,6 +326,7 @@ def item_query(doctype, txt, searchfield, start, page_len, filters, as_dict=Fals
 			"_txt": txt.replace("%", ""),
 			"start": start,
 			"page_len": page_len,
+			**search_values,
 		},
 		as_dict=as_dict,
 	)
@@ -416,7 +451,7 @@ def get_batch_no(doctype, txt, searchfield, start, page_len, filters):
 		"page_len": page_len,
 	}
 
-	having_clause = "having sum(sle.actual_qty) > 0"
+	having_clause = "having sum(batch_bin.actual_qty) > 0"
 	if filters.get("is_return"):
 		having_clause = ""
 
@@ -437,17 +472,16 @@ def get_batch_no(doctype, txt, searchfield, start, page_len, filters):
 			search_cond = " or " + " or ".join([field + " like %(txt)s" for field in searchfields])
 
 		batch_nos = frappe.db.sql(
-			"""select sle.batch_no, round(sum(sle.actual_qty),2), sle.stock_uom,
+			"""select batch_bin.batch_no, round(sum(batch_bin.actual_qty),2), batch.stock_uom,
 				concat('MFG-',batch.manufacturing_date), concat('EXP-',batch.expiry_date)
 				{search_columns}
-			from `tabStock Ledger Entry` sle
-				INNER JOIN `tabBatch` batch on sle.batch_no = batch.name
+			from `tabBatch Bin` batch_bin
+				INNER JOIN `tabBatch` batch on batch_bin.batch_no = batch.name
 			where
 				batch.disabled = 0
-				and sle.is_cancelled = 0
-				and sle.item_code = %(item_code)s
-				and sle.warehouse = %(warehouse)s
-				and (sle.batch_no like %(txt)s
+				and batch_bin.item_code = %(item_code)s
+				and batch_bin.warehouse = %(warehouse)s
+				and (batch_bin.batch_no like %(txt)s
 				or batch.expiry_date like %(txt)s
 				or batch.manufacturing_date like %(txt)s
 				{search_cond})
@@ -455,7 +489,7 @@ def get_batch_no(doctype, txt, searchfield, start, page_len, filters):
 				{cond}
 				{match_conditions}
 			group by batch_no {having_clause}
-			order by batch.expiry_date, sle.batch_no desc
+			order by batch.expiry_date, batch_bin.batch_no desc
 			limit %(start)s, %(page_len)s""".format(
 				search_columns=search_columns,
 				cond=cond,
@@ -13,6 +13,7 @@ from erpnext.controllers.stock_controller import StockController
 from erpnext.stock.doctype.item.item import set_item_default
 from erpnext.stock.get_item_details import get_bin_details, get_conversion_factor
 from erpnext.stock.utils import get_incoming_rate
+from erpnext.utilities.instrumentation import instrument
 
 
 class SellingController(StockController):
@@ -420,7 +421,7 @@ class SellingController(StockController):
 				qty = flt(d.get("stock_qty") or d.get("actual_qty"))
 
 				if not (self.get("is_return") and d.incoming_rate):
-					d.incoming_rate = get_incoming_rate(
+					args = frappe._dict(
 						{
 							"item_code": d.item_code,
 							"warehouse": d.warehouse,
@@ -433,9 +434,12 @@ class SellingController(StockController):
 							"voucher_type": self.doctype,
 							"voucher_no": self.name,
 							"allow_zero_valuation": d.get("allow_zero_valuation"),
-						},
-						raise_error_if_no_rate=False,
+						}
 					)
+					if d.warehouse and self.get("posting_time"):
+						args.previous_sle = self.get_previous_sle(d.item_code, d.warehouse)
+
+					d.incoming_rate = get_incoming_rate(args, raise_error_if_no_rate=False)
 
 				# For internal transfers use incoming rate as the valuation rate
 				if self.is_internal_transfer():
@@ -465,6 +469,7 @@ class SellingController(StockController):
 					self.doctype, self.name, d.item_code, self.return_against, item_row=d
 				)
 
+	@instrument
 	def update_stock_ledger(self):
 		self.update_reserved_qty()
 
@@ -7,6 +7,8 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import comma_or, flt, getdate, now, nowdate
 
+from erpnext.utilities.instrumentation import instrument
+
 
 class OverAllowanceError(frappe.ValidationError):
 	pass
@@ -163,6 +165,7 @@ class StatusUpdater(Document):
 	Installation Note: Update Installed Qty, Update Percent Qty and Validate over installation
 	"""
 
+	@instrument
 	def update_prevdoc_status(self):
 		self.update_qty()
 		self.validate_qty()
@@ -595,3 +598,38 @@ def get_allowance_for(
 		item_allowance.setdefault(item_code, frappe._dict()).setdefault("amount", over_billing_allowance)
 
 	return allowance, item_allowance, global_qty_allowance, global_amount_allowance
+
+
+def get_allowances_for(item_codes, qty_or_amount="qty"):
+	"""
+	Returns {item_code: allowance} for the items, falling back to the global allowance
+	for the items that do not set one
+	"""
+	item_codes = list(item_codes)
+	if not item_codes:
+		return {}
+
+	fieldname = (
+		"over_delivery_receipt_allowance" if qty_or_amount == "qty" else "over_billing_allowance"
+	)
+	item_allowances = dict(
+		frappe.get_all(
+			"Item",
+			filters={"name": ("in", item_codes)},
+			fields=["name", fieldname],
+			as_list=True,
+		)
+	)
+
+	if qty_or_amount == "qty":
+		global_allowance = flt(
+			frappe.db.get_single_value("Stock Settings", "over_delivery_receipt_allowance")
+		)
+	else:
+		global_allowance = flt(
+			frappe.db.get_single_value("Accounts Settings", "over_billing_allowance")
+		)
+
+	return {
+		item_code: flt(item_allowances.get(item_code)) or global_allowance for item_code in item_codes
+	}
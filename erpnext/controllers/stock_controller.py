@@ -19,6 +19,7 @@ from erpnext.accounts.utils import get_fiscal_year
 from erpnext.controllers.accounts_controller import AccountsController
 from erpnext.stock import get_warehouse_account_map
 from erpnext.stock.stock_ledger import get_items_to_be_repost
+from erpnext.utilities.instrumentation import instrument
 
 
 class QualityInspectionRequiredError(frappe.ValidationError):
@@ -35,6 +36,8 @@ class QualityInspectionNotSubmittedError(frappe.ValidationError):
 
 class StockController(AccountsController):
 	def validate(self):
+		# previous stock ledger entries are fetched afresh for each save or submit
+		self._previous_sles = {}
 		super(StockController, self).validate()
 		if not self.get("is_return"):
 			self.validate_inspection()
@@ -45,6 +48,7 @@ class StockController(AccountsController):
 		self.validate_internal_transfer()
 		self.validate_putaway_capacity()
 
+	@instrument
 	def make_gl_entries(self, gl_entries=None, from_repost=False):
 		if self.docstatus == 2:
 			make_reverse_gl_entries(voucher_type=self.doctype, voucher_no=self.name)
@@ -366,9 +370,35 @@ class StockController(AccountsController):
 		sl_dict.update(args)
 		return sl_dict
 
+	def get_previous_sle(self, item_code, warehouse):
+		"""Returns the last Stock Ledger Entry of the item in the warehouse on or before the posting
+		time. The entries of all the item rows are fetched together on first use, and are shared by
+		the validations and the posting of one save or submit till its stock ledger entries are
+		made."""
+		from erpnext.stock.stock_ledger import get_previous_sles
+
+		if not hasattr(self, "_previous_sles"):
+			self._previous_sles = {}
+
+		posting = (self.posting_date, self.posting_time)
+		if (item_code, warehouse, *posting) not in self._previous_sles:
+			keys = {(item_code, warehouse)}
+			for d in (self.get("items") or []) + (self.get("packed_items") or []):
+				row_warehouse = d.get("s_warehouse") or d.get("t_warehouse") or d.get("warehouse")
+				if d.item_code and row_warehouse:
+					keys.add((d.item_code, row_warehouse))
+
+			keys = [key for key in keys if (*key, *posting) not in self._previous_sles]
+			for key, sle in get_previous_sles(keys, *posting).items():
+				self._previous_sles[(*key, *posting)] = sle
+
+		return self._previous_sles[(item_code, warehouse, *posting)]
+
 	def make_sl_entries(self, sl_entries, allow_negative_stock=False, via_landed_cost_voucher=False):
 		from erpnext.stock.stock_ledger import make_sl_entries
 
+		# previous entries fetched before posting are stale now
+		self._previous_sles = {}
 		make_sl_entries(sl_entries, allow_negative_stock, via_landed_cost_voucher)
 
 	def make_gl_entries_on_cancel(self):
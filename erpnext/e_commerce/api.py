@@ -23,6 +23,7 @@ def get_product_filter_data(query_args=None):
 	field_filters (dict): Keys include item_group, brand, etc.
 	attribute_filters(dict): Keys include Color, Size, etc.
 	start (int): Offset items by
+	after (list): (ranking, name) cursor of the last item on the previous page
 	item_group (str): Valid Item Group
 	from_filters (bool): Set as True to jump to page 1
 	"""
@@ -35,16 +36,19 @@ def get_product_filter_data(query_args=None):
 		field_filters = query_args.get("field_filters", {})
 		attribute_filters = query_args.get("attribute_filters", {})
 		start = cint(query_args.start) if query_args.get("start") else 0
+		after = query_args.get("after")
+		if isinstance(after, str):
+			after = json.loads(after)
 		item_group = query_args.get("item_group")
 		from_filters = query_args.get("from_filters")
 	else:
-		search, attribute_filters, item_group, from_filters = None, None, None, None
+		search, attribute_filters, item_group, from_filters, after = None, None, None, None, None
 		field_filters = {}
 		start = 0
 
 	# if new filter is checked, reset start to show filtered items from page 1
 	if from_filters:
-		start = 0
+		start, after = 0, None
 
 	sub_categories = []
 	if item_group:
@@ -53,7 +57,12 @@ def get_product_filter_data(query_args=None):
 	engine = ProductQuery()
 	try:
 		result = engine.query(
-			attribute_filters, field_filters, search_term=search, start=start, item_group=item_group
+			attribute_filters,
+			field_filters,
+			search_term=search,
+			start=start,
+			item_group=item_group,
+			after=after,
 		)
 	except Exception:
 		frappe.log_error("Product query with filter failed")
@@ -73,6 +82,8 @@ def get_product_filter_data(query_args=None):
 		"settings": engine.settings,
 		"sub_categories": sub_categories,
 		"items_count": result["items_count"],
+		"next_cursor": result["next_cursor"],
+		"attribute_facets": result["attribute_facets"],
 	}
 
 
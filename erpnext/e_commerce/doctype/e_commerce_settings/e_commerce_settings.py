@@ -8,8 +8,7 @@ from frappe.model.document import Document
 from frappe.utils import comma_and, flt, unique
 
 from erpnext.e_commerce.redisearch_utils import (
-	create_website_items_index,
-	define_autocomplete_dictionary,
+	enqueue_website_items_index,
 	get_indexable_web_fields,
 	is_search_module_loaded,
 )
@@ -48,8 +47,7 @@ class ECommerceSettings(Document):
 		# if redisearch is enabled (value changed) create indexes and dictionary
 		value_changed = self.is_redisearch_enabled != self.is_redisearch_enabled_pre_save
 		if self.is_redisearch_loaded and self.is_redisearch_enabled and value_changed:
-			define_autocomplete_dictionary()
-			create_website_items_index()
+			enqueue_website_items_index()
 
 	@staticmethod
 	def validate_field_filters(filter_fields, enable_field_filters):
@@ -156,7 +154,7 @@ class ECommerceSettings(Document):
 
 			# if search index fields get changed
 			if not (new_fields == old_fields):
-				create_website_items_index()
+				enqueue_website_items_index()
 
 
 def validate_cart_settings(doc=None, method=None):
@@ -17,6 +17,7 @@ from erpnext.e_commerce.redisearch_utils import (
 	update_index_for_item,
 )
 from erpnext.e_commerce.shopping_cart.cart import _set_price_list
+from erpnext.e_commerce.variant_selector.item_attribute_index import invalidate_attribute_index
 from erpnext.setup.doctype.item_group.item_group import (
 	get_parent_item_groups,
 	invalidate_cache_for,
@@ -70,8 +71,11 @@ class WebsiteItem(WebsiteGenerator):
 			self.old_website_item_groups = [x[0] for x in result]
 
 	def on_update(self):
+		from erpnext.e_commerce.shopping_cart.product_info import update_website_item_discounts
+
 		invalidate_cache_for_web_item(self)
 		self.update_template_item()
+		update_website_item_discounts([self.item_code])
 
 	def on_trash(self):
 		super(WebsiteItem, self).on_trash()
@@ -85,10 +89,16 @@ class WebsiteItem(WebsiteGenerator):
 			frappe.throw(message, title=_("Already Published"))
 
 	def publish_unpublish_desk_item(self, publish=True):
-		if frappe.db.get_value("Item", self.item_code, "published_in_website") and publish:
+		published, item_group = frappe.db.get_value(
+			"Item", self.item_code, ["published_in_website", "item_group"]
+		) or (None, None)
+		if published and publish:
 			return  # if already published don't publish again
 		frappe.db.set_value("Item", self.item_code, "published_in_website", publish)
 
+		# the flag is set without running Item hooks, so the posting lists are dropped here
+		invalidate_attribute_index([item_group])
+
 	def make_route(self):
 		"""Called from set_route in WebsiteGenerator."""
 		if not self.route:
@@ -386,6 +396,8 @@ def invalidate_cache_for_web_item(doc):
 	from erpnext.stock.doctype.item.item import invalidate_item_variants_cache_for_website
 
 	invalidate_cache_for(doc, doc.item_group)
+	frappe.cache().delete_keys("website_item_count:")
+	invalidate_attribute_index([doc.item_group])
 
 	website_item_groups = list(
 		set(
@@ -409,6 +421,7 @@ def on_doctype_update():
 
 	frappe.db.add_index("Website Item", ["item_group"])
 	frappe.db.add_index("Website Item", ["brand"])
+	frappe.db.add_index("Website Item", ["ranking", "name"])
 
 
 def check_if_user_is_customer(user=None):
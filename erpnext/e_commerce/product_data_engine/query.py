@@ -1,13 +1,20 @@
 # Copyright (c) 2021, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+import hashlib
+import json
+
 import frappe
-from frappe.utils import flt
+from frappe.utils import cint, flt
 
 from erpnext.e_commerce.doctype.item_review.item_review import get_customer
-from erpnext.e_commerce.shopping_cart.product_info import get_product_info_for_website
+from erpnext.e_commerce.shopping_cart.product_info import get_prices_for_website_items
+from erpnext.e_commerce.variant_selector.item_attribute_index import ItemAttributeIndex
 from erpnext.utilities.product import get_non_stock_item_status
 
+# totals are cached per filter signature and cleared whenever a Website Item changes
+ITEMS_COUNT_CACHE_TTL = 600
+
 
 class ProductQuery:
 	"""Query engine for product listing
@@ -26,6 +33,7 @@ class ProductQuery:
 
 		self.or_filters = []
 		self.filters = [["published", "=", 1]]
+		self.attribute_index = None
 		self.fields = [
 			"web_item_name",
 			"name",
@@ -44,16 +52,20 @@ class ProductQuery:
 			"on_backorder",
 		]
 
-	def query(self, attributes=None, fields=None, search_term=None, start=0, item_group=None):
+	def query(
+		self, attributes=None, fields=None, search_term=None, start=0, item_group=None, after=None
+	):
 		"""
 		Args:
 		        attributes (dict, optional): Item Attribute filters
 		        fields (dict, optional): Field level filters
 		        search_term (str, optional): Search term to lookup
 		        start (int, optional): Page start
+		        after (list, optional): (ranking, name) of the last item of the previous page
 
 		Returns:
-		        dict: Dict containing items, item count & discount range
+		        dict: Dict containing items, total item count, discount range, next page cursor
+		                & item counts per attribute value
 		"""
 		# track if discounts included in field filters
 		self.filter_with_discount = bool(fields.get("discount"))
@@ -67,12 +79,17 @@ class ProductQuery:
 			self.build_search_filters(search_term)
 		if self.settings.hide_variants:
 			self.filters.append(["variant_of", "is", "not set"])
+		if self.filter_with_discount:
+			self.build_discount_filters(fields["discount"])
 
 		# query results
 		if attributes:
-			result, count = self.query_items_with_attributes(attributes, start)
+			result, count = self.query_items_with_attributes(attributes, start, after)
 		else:
-			result, count = self.query_items(start=start)
+			result, count = self.query_items(start=start, after=after)
+
+		next_cursor = [result[-1].ranking, result[-1].name] if result else None
+		attribute_facets = self.get_attribute_facets(attributes, item_group)
 
 		# sort combined results by ranking
 		result = sorted(result, key=lambda x: x.get("ranking"), reverse=True)
@@ -86,71 +103,105 @@ class ProductQuery:
 		if discount_list:
 			discounts = [min(discount_list), max(discount_list)]
 
-		result = self.filter_results_by_discount(fields, result)
+		return {
+			"items": result,
+			"items_count": count,
+			"discounts": discounts,
+			"next_cursor": next_cursor,
+			"attribute_facets": attribute_facets,
+		}
 
-		return {"items": result, "items_count": count, "discounts": discounts}
+	def query_items(self, start=0, after=None):
+		"""Build a query to fetch Website Items based on field filters.
 
-	def query_items(self, start=0):
-		"""Build a query to fetch Website Items based on field filters."""
-		# MySQL does not support offset without limit,
-		# frappe does not accept two parameters for limit
-		# https://dev.mysql.com/doc/refman/8.0/en/select.html#id4651989
-		count_items = frappe.db.get_all(
-			"Website Item",
-			filters=self.filters,
-			or_filters=self.or_filters,
-			limit_page_length=184467440737095516,
-			limit_start=start,  # get all items from this offset for total count ahead
-			order_by="ranking desc",
-		)
-		count = len(count_items)
+		Pages are ordered by (ranking, name). If the cursor of the previous page is passed as
+		`after`, the page is read from there on instead of skipping `start` rows."""
+		count = self.get_items_count()
+
+		if not after:
+			return self.get_items(start=start), count
+
+		ranking, name = cint(after[0]), after[1]
 
-		# If discounts included, return all rows.
-		# Slice after filtering rows with discount (See `filter_results_by_discount`).
-		# Slicing before hand will miss discounted items on the 3rd or 4th page.
-		# Discounts are fetched on computing Pricing Rules so we cannot query them directly.
-		page_length = 184467440737095516 if self.filter_with_discount else self.page_length
+		# rest of the items with the same ranking, then the ones ranked lower
+		items = self.get_items([["ranking", "=", ranking], ["name", "<", name]])
+		if len(items) < self.page_length:
+			items += self.get_items(
+				[["ranking", "<", ranking]], page_length=self.page_length - len(items)
+			)
+
+		return items, count
 
-		items = frappe.db.get_all(
+	def get_items(self, filters=None, start=0, page_length=None):
+		return frappe.db.get_all(
 			"Website Item",
 			fields=self.fields,
-			filters=self.filters,
+			filters=self.filters + (filters or []),
 			or_filters=self.or_filters,
-			limit_page_length=page_length,
+			limit_page_length=page_length or self.page_length,
 			limit_start=start,
-			order_by="ranking desc",
+			order_by="`tabWebsite Item`.ranking desc, `tabWebsite Item`.name desc",
 		)
 
-		return items, count
+	def get_items_count(self):
+		"""Returns the total count of items matching the filters, cached per filter signature."""
+		signature = json.dumps([self.filters, self.or_filters], sort_keys=True, default=str)
+		key = "website_item_count:" + hashlib.md5(signature.encode()).hexdigest()
+
+		count = frappe.cache().get_value(key)
+		if count is None:
+			count = frappe.db.get_all(
+				"Website Item",
+				fields=["count(distinct `tabWebsite Item`.name) as count"],
+				filters=self.filters,
+				or_filters=self.or_filters,
+			)[0].count
+			frappe.cache().set_value(key, count, expires_in_sec=ITEMS_COUNT_CACHE_TTL)
+
+		return count
 
-	def query_items_with_attributes(self, attributes, start=0):
+	def query_items_with_attributes(self, attributes, start=0, after=None):
 		"""Build a query to fetch Website Items based on field & attribute filters."""
-		item_codes = []
-
-		for attribute, values in attributes.items():
-			if not isinstance(values, list):
-				values = [values]
-
-			# get items that have selected attribute & value
-			item_code_list = frappe.db.get_all(
-				"Item",
-				fields=["item_code"],
-				filters=[
-					["published_in_website", "=", 1],
-					["Item Variant Attribute", "attribute", "=", attribute],
-					["Item Variant Attribute", "attribute_value", "in", values],
-				],
-			)
-			item_codes.append({x.item_code for x in item_code_list})
+		# items that have the selected attributes & values, from the cached attribute index
+		item_codes = self.get_attribute_index().get_items_with_attributes(attributes)
+
+		if item_codes is not None:
+			if not item_codes:
+				return [], 0
 
-		if item_codes:
-			item_codes = list(set.intersection(*item_codes))
-			self.filters.append(["item_code", "in", item_codes])
+			self.filters.append(["item_code", "in", list(item_codes)])
 
-		items, count = self.query_items(start=start)
+		items, count = self.query_items(start=start, after=after)
 
 		return items, count
 
+	def get_attribute_facets(self, attributes=None, item_group=None):
+		"""Returns {attribute: {value: item count}} for the filter attributes in settings.
+		Counts are taken within the selection of the other attributes, over the items of
+		`item_group` (and its descendants if included in its page), or of all item groups."""
+		from erpnext.setup.doctype.item_group.item_group import get_child_groups_for_website
+
+		filter_attributes = [row.attribute for row in self.settings.filter_attributes]
+		if not (self.settings.enable_attribute_filters and filter_attributes):
+			return {}
+
+		item_groups = None
+		if item_group:
+			item_groups = [item_group]
+			if frappe.db.get_value("Item Group", item_group, "include_descendants"):
+				item_groups = [
+					d.name for d in get_child_groups_for_website(item_group, include_self=True)
+				]
+
+		return self.get_attribute_index(item_groups).get_facets(filter_attributes, attributes)
+
+	def get_attribute_index(self, item_groups=None):
+		"""Returns the attribute index of `item_groups`, loaded from cache once per query"""
+		if self.attribute_index is None:
+			self.attribute_index = ItemAttributeIndex(item_groups)
+
+		return self.attribute_index.scoped(item_groups)
+
 	def build_fields_filters(self, filters):
 		"""Build filters for field values
 
@@ -177,6 +228,15 @@ class ProductQuery:
 				# `=` will be faster than `IN` for most cases
 				self.filters.append([field, "=", values])
 
+	def build_discount_filters(self, discount):
+		"""Filter items with a discount up to the selected percentage, as precomputed from
+		Pricing Rules in `Website Item.discount_percent`."""
+		if isinstance(discount, list):
+			discount = discount[0]
+
+		self.filters.append(["discount_percent", ">", 0])
+		self.filters.append(["discount_percent", "<=", flt(discount)])
+
 	def build_item_group_filters(self, item_group):
 		"Add filters for Item group page and include Website Item Groups."
 		from erpnext.setup.doctype.item_group.item_group import get_child_groups_for_website
@@ -222,25 +282,28 @@ class ProductQuery:
 
 	def add_display_details(self, result, discount_list, cart_items):
 		"""Add price and availability details in result."""
-		for item in result:
-			product_info = get_product_info_for_website(item.item_code, skip_quotation_creation=True).get(
-				"product_info"
+		item_codes = [item.item_code for item in result]
+		prices = get_prices_for_website_items(item_codes)
+		wished_items = set(
+			frappe.get_all(
+				"Wishlist Item",
+				filters={"parent": frappe.session.user, "item_code": ("in", item_codes)},
+				pluck="item_code",
 			)
+			if item_codes
+			else []
+		)
 
-			if product_info and product_info["price"]:
-				# update/mutate item and discount_list objects
-				self.get_price_discount_info(item, product_info["price"], discount_list)
+		if self.settings.show_stock_availability:
+			self.set_stock_availability(result)
 
-			if self.settings.show_stock_availability:
-				self.get_stock_availability(item)
+		for item in result:
+			if prices.get(item.item_code):
+				# update/mutate item and discount_list objects
+				self.get_price_discount_info(item, prices[item.item_code], discount_list)
 
 			item.in_cart = item.item_code in cart_items
-
-			item.wished = False
-			if frappe.db.exists(
-				"Wishlist Item", {"item_code": item.item_code, "parent": frappe.session.user}
-			):
-				item.wished = True
+			item.wished = item.item_code in wished_items
 
 		return result, discount_list
 
@@ -259,27 +322,42 @@ class ProductQuery:
 				"formatted_discount_rate"
 			)
 
-	def get_stock_availability(self, item):
-		"""Modify item object and add stock details."""
-		item.in_stock = False
-		warehouse = item.get("website_warehouse")
-		is_stock_item = frappe.get_cached_value("Item", item.item_code, "is_stock_item")
-
-		if item.get("on_backorder"):
-			return
+	def set_stock_availability(self, result):
+		"""Modify item objects and add stock details, reading Bins for all the items at once."""
+		item_codes = [item.item_code for item in result]
+		stock_items = set(
+			frappe.get_all("Item", filters={"name": ("in", item_codes), "is_stock_item": 1}, pluck="name")
+			if item_codes
+			else []
+		)
 
-		if not is_stock_item:
-			if warehouse:
-				# product bundle case
-				item.in_stock = get_non_stock_item_status(item.item_code, "website_warehouse")
-			else:
-				item.in_stock = True
-		elif warehouse:
-			# stock item and has warehouse
-			actual_qty = frappe.db.get_value(
-				"Bin", {"item_code": item.item_code, "warehouse": item.get("website_warehouse")}, "actual_qty"
+		warehouses = list({item.website_warehouse for item in result if item.get("website_warehouse")})
+		actual_qty = {}
+		if stock_items and warehouses:
+			bins = frappe.get_all(
+				"Bin",
+				filters={"item_code": ("in", list(stock_items)), "warehouse": ("in", warehouses)},
+				fields=["item_code", "warehouse", "actual_qty"],
 			)
-			item.in_stock = bool(flt(actual_qty))
+			actual_qty = {(d.item_code, d.warehouse): d.actual_qty for d in bins}
+
+		for item in result:
+			item.in_stock = False
+			warehouse = item.get("website_warehouse")
+
+			if item.get("on_backorder"):
+				continue
+
+			if item.item_code not in stock_items:
+				if warehouse:
+					# product bundle case
+					item.in_stock = get_non_stock_item_status(item.item_code, "website_warehouse")
+				else:
+					item.in_stock = True
+			elif warehouse:
+				# stock item and has warehouse
+				item.in_stock = bool(flt(actual_qty.get((item.item_code, warehouse))))
+
 
 	def get_cart_items(self):
 		customer = get_customer(silent=True)
@@ -304,19 +382,3 @@ class ProductQuery:
 				return items
 
 		return []
-
-	def filter_results_by_discount(self, fields, result):
-		if fields and fields.get("discount"):
-			discount_percent = frappe.utils.flt(fields["discount"][0])
-			result = [
-				row
-				for row in result
-				if row.get("discount_percent") and row.discount_percent <= discount_percent
-			]
-
-		if self.filter_with_discount:
-			# no limit was added to results while querying
-			# slice results manually
-			result[: self.page_length]
-
-		return result
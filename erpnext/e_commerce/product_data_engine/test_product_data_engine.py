@@ -80,6 +80,29 @@ class TestProductDataEngine(unittest.TestCase):
 		self.assertEqual(items[1].get("item_code"), "Test 12I Laptop")
 		self.assertEqual(items[2].get("item_code"), "Test 11I Laptop")
 
+	def test_product_list_keyset_paging(self):
+		"Test if paging with the cursor of the previous page matches paging by offset."
+		engine = ProductQuery()
+		first_page = engine.query(attributes={}, fields={}, search_term=None, start=0, item_group=None)
+
+		engine = ProductQuery()
+		by_offset = engine.query(attributes={}, fields={}, search_term=None, start=4, item_group=None)
+
+		engine = ProductQuery()
+		by_cursor = engine.query(
+			attributes={},
+			fields={},
+			search_term=None,
+			start=4,
+			item_group=None,
+			after=first_page["next_cursor"],
+		)
+
+		self.assertEqual(
+			[d.item_code for d in by_cursor["items"]], [d.item_code for d in by_offset["items"]]
+		)
+		self.assertEqual(by_cursor["items_count"], first_page["items_count"])
+
 	def test_change_product_ranking(self):
 		"Test if item on second page appear on first if ranking is changed."
 		item_code = "Test 12I Laptop"
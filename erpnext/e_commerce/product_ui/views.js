@@ -71,6 +71,7 @@ erpnext.ProductView =  class {
 
 						me.products = result.message["items"];
 						me.product_count = result.message["items_count"];
+						me.next_cursor = result.message["next_cursor"];
 					}
 
 					// Bind filter actions
@@ -142,6 +143,7 @@ erpnext.ProductView =  class {
 			attribute_filters: attribute_filters,
 			item_group: this.item_group,
 			start: filters.start || null,
+			after: filters.after || null,
 			from_filters: this.from_filters || false
 		};
 	}
@@ -161,7 +163,7 @@ erpnext.ProductView =  class {
 			let page_length = settings.products_per_page || 0;
 
 			let prev_disable = start > 0 ? "" : "disabled";
-			let next_disable = (this.product_count > page_length) ? "" : "disabled";
+			let next_disable = (start + page_length < this.product_count) ? "" : "disabled";
 
 			paging_html += `
 				<button class="btn btn-default btn-prev" data-start="${ start - page_length }"
@@ -171,6 +173,7 @@ erpnext.ProductView =  class {
 
 			paging_html += `
 				<button class="btn btn-default btn-next" data-start="${ start + page_length }"
+					data-after="${ frappe.utils.escape_html(JSON.stringify(this.next_cursor || null)) }"
 					${next_disable}>
 					${ __("Next") }
 				</button>
@@ -270,6 +273,14 @@ erpnext.ProductView =  class {
 
 			let query_params = frappe.utils.get_query_params();
 			query_params.start = start;
+
+			// next page continues from the last item shown, previous page is read by offset
+			const after = $btn.data('after');
+			if (after) {
+				query_params.after = JSON.stringify(after);
+			} else {
+				delete query_params.after;
+			}
 			let path = window.location.pathname + '?' + frappe.utils.get_url_from_dict(query_params);
 			window.location.href = path;
 		});
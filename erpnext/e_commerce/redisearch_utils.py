@@ -5,6 +5,7 @@ import json
 
 import frappe
 from frappe import _
+from frappe.utils import create_batch
 from frappe.utils.redis_wrapper import RedisWrapper
 from redis import ResponseError
 from redisearch import AutoCompleter, Client, IndexDefinition, Suggestion, TagField, TextField
@@ -13,6 +14,13 @@ WEBSITE_ITEM_INDEX = "website_items_index"
 WEBSITE_ITEM_KEY_PREFIX = "website_item:"
 WEBSITE_ITEM_NAME_AUTOCOMPLETE = "website_items_name_dict"
 WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE = "website_items_category_dict"
+WEBSITE_ITEM_INDEX_VERSION = "website_items_index_version"
+WEBSITE_ITEM_INDEX_QUEUE = "website_items_index_queue"
+WEBSITE_ITEM_INDEX_QUEUED = "website_items_index_queued"
+WEBSITE_ITEM_INDEX_STALE_NAMES = "website_items_index_stale_names"
+
+# items read from the database and written to redis per round trip
+REINDEX_BATCH_SIZE = 1000
 
 
 def get_indexable_web_fields():
@@ -63,21 +71,16 @@ def make_key(key):
 
 @if_redisearch_enabled
 def create_website_items_index():
-	"Creates Index Definition."
-
-	# CREATE index
-	client = Client(make_key(WEBSITE_ITEM_INDEX), conn=frappe.cache())
+	"""Creates Index Definition.
 
-	try:
-		client.drop_index()  # drop if already exists
-	except ResponseError:
-		# will most likely raise a ResponseError if index does not exist
-		# ignore and create index
-		pass
-	except Exception:
-		raise_redisearch_error()
+	The index is built under a new name and key prefix while search keeps using the live one.
+	`WEBSITE_ITEM_INDEX` is an alias, pointed to the new index once all items are loaded."""
+	cache = frappe.cache()
+	old_version = get_index_version()
+	version = frappe.generate_hash(length=10)
 
-	idx_def = IndexDefinition([make_key(WEBSITE_ITEM_KEY_PREFIX)])
+	client = Client(make_key(get_index_name(version)), conn=cache)
+	idx_def = IndexDefinition([make_key(get_key_prefix(version))])
 
 	# Index fields mentioned in e-commerce settings
 	idx_fields = frappe.db.get_single_value("E Commerce Settings", "search_index_fields")
@@ -88,13 +91,53 @@ def create_website_items_index():
 
 	idx_fields = list(map(to_search_field, idx_fields))
 
-	client.create_index(
-		[TextField("web_item_name", sortable=True)] + idx_fields,
-		definition=idx_def,
-	)
+	try:
+		client.create_index(
+			[TextField("web_item_name", sortable=True)] + idx_fields,
+			definition=idx_def,
+		)
+	except Exception:
+		raise_redisearch_error()
 
-	reindex_all_web_items()
+	reindex_all_web_items(version)
 	define_autocomplete_dictionary()
+	switch_live_index(client, old_version, version)
+
+
+def enqueue_website_items_index():
+	"Rebuild the index in a background job, the live index serves searches meanwhile."
+	frappe.enqueue(
+		"erpnext.e_commerce.redisearch_utils.create_website_items_index",
+		queue="long",
+		enqueue_after_commit=True,
+		now=frappe.flags.in_test,
+	)
+
+
+def switch_live_index(client, old_version, version):
+	"Point the live index alias to the new index and drop the index (and items) it replaced."
+	cache = frappe.cache()
+	alias = make_key(WEBSITE_ITEM_INDEX)
+
+	try:
+		live_index = Client(alias, conn=cache)
+		try:
+			is_legacy_index = live_index.info().get("index_name") == frappe.as_unicode(alias)
+		except ResponseError:
+			# no index or alias by the live name yet
+			is_legacy_index = False
+
+		if is_legacy_index:
+			# index created before aliases were used, the alias cannot share its name
+			live_index.drop_index()
+
+		client.aliasupdate(alias)
+		super(RedisWrapper, cache).set(make_key(WEBSITE_ITEM_INDEX_VERSION), version)
+
+		if old_version:
+			Client(make_key(get_index_name(old_version)), conn=cache).drop_index()
+	except ResponseError:
+		raise_redisearch_error()
 
 
 def to_search_field(field):
@@ -111,8 +154,7 @@ def insert_item_to_index(website_item_doc):
 	cache = frappe.cache()
 	web_item = create_web_item_map(website_item_doc)
 
-	for field, value in web_item.items():
-		super(RedisWrapper, cache).hset(make_key(key), field, value)
+	super(RedisWrapper, cache).hset(make_key(key), mapping=web_item)
 
 	insert_to_name_ac(website_item_doc.web_item_name, website_item_doc.name)
 
@@ -123,8 +165,8 @@ def insert_to_name_ac(web_name, doc_name):
 	ac.add_suggestions(Suggestion(web_name, payload=doc_name))
 
 
-def create_web_item_map(website_item_doc):
-	fields_to_index = get_fields_indexed()
+def create_web_item_map(website_item_doc, fields_to_index=None):
+	fields_to_index = fields_to_index or get_fields_indexed()
 	web_item = {}
 
 	for field in fields_to_index:
@@ -135,9 +177,92 @@ def create_web_item_map(website_item_doc):
 
 @if_redisearch_enabled
 def update_index_for_item(website_item_doc):
-	# Reinsert to Cache
-	insert_item_to_index(website_item_doc)
-	define_autocomplete_dictionary()
+	"""Queue the item to be reindexed. Items saved while a reindex job is pending are
+	picked up by that job, so quick successive saves are indexed together."""
+	cache = frappe.cache()
+	super(RedisWrapper, cache).sadd(make_key(WEBSITE_ITEM_INDEX_QUEUE), website_item_doc.name)
+
+	# keep the name suggested before the first of the queued renames, to remove it when indexing
+	doc_before_save = website_item_doc.get_doc_before_save()
+	if doc_before_save and doc_before_save.web_item_name != website_item_doc.web_item_name:
+		super(RedisWrapper, cache).hsetnx(
+			make_key(WEBSITE_ITEM_INDEX_STALE_NAMES),
+			website_item_doc.name,
+			doc_before_save.web_item_name,
+		)
+
+	# enqueue only if no job is pending, the flag expires in case a job is lost
+	if super(RedisWrapper, cache).set(make_key(WEBSITE_ITEM_INDEX_QUEUED), 1, nx=True, ex=600):
+		frappe.enqueue(
+			"erpnext.e_commerce.redisearch_utils.process_index_queue",
+			enqueue_after_commit=True,
+			now=frappe.flags.in_test,
+		)
+
+
+@if_redisearch_enabled
+def process_index_queue():
+	"Reindex the Website Items queued by `update_index_for_item` in one pipeline."
+	cache = frappe.cache()
+	queue = make_key(WEBSITE_ITEM_INDEX_QUEUE)
+	stale_names = make_key(WEBSITE_ITEM_INDEX_STALE_NAMES)
+
+	# clear the flag first, items queued from now on get a new job
+	super(RedisWrapper, cache).delete(make_key(WEBSITE_ITEM_INDEX_QUEUED))
+
+	pipeline = cache.pipeline()
+	pipeline.smembers(queue)
+	pipeline.hgetall(stale_names)
+	pipeline.delete(queue, stale_names)
+	queued, stale = pipeline.execute()[:2]
+
+	names = [frappe.as_unicode(name) for name in queued]
+	stale = {frappe.as_unicode(name): frappe.as_unicode(old) for name, old in (stale or {}).items()}
+
+	for batch in create_batch(names, REINDEX_BATCH_SIZE):
+		index_web_items(batch, stale)
+
+
+def index_web_items(names, stale_names=None):
+	"""Write the given Website Items to the live index and their names to the autocomplete
+	dictionary, removing the ones not published.
+
+	:param stale_names: (optional) dict of Website Item -> name suggested before it was renamed."""
+	cache = frappe.cache()
+	fields = get_fields_indexed()
+	key_prefix = get_key_prefix(get_index_version())
+	stale_names = stale_names or {}
+
+	items = frappe.get_all(
+		"Website Item", fields=fields + ["published"], filters={"name": ("in", names)}
+	)
+	published_items = [item for item in items if item.published]
+	published = {item.name: item.web_item_name for item in published_items}
+	unpublished_names = {item.name: item.web_item_name for item in items if not item.published}
+
+	autocomplete_key = make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE)
+	pipeline = cache.pipeline(transaction=False)
+
+	# remove suggestions before adding, a renamed item may get its old name back
+	for name in names:
+		old_names = {stale_names.get(name), unpublished_names.get(name)}
+		for old_name in old_names - {None, published.get(name)}:
+			pipeline.execute_command("FT.SUGDEL", autocomplete_key, old_name)
+
+		if name not in published:
+			pipeline.delete(make_key(get_cache_key(name, key_prefix)))
+
+	add_items_to_pipeline(pipeline, published_items, fields, key_prefix, autocomplete_key)
+	pipeline.execute()
+
+
+def add_items_to_pipeline(pipeline, items, fields, key_prefix, autocomplete_key):
+	for item in items:
+		pipeline.hset(
+			make_key(get_cache_key(item.name, key_prefix)),
+			mapping=create_web_item_map(item, fields),
+		)
+		pipeline.execute_command("FT.SUGADD", autocomplete_key, item.web_item_name, 1.0)
 
 
 @if_redisearch_enabled
@@ -146,7 +271,7 @@ def delete_item_from_index(website_item_doc):
 	key = get_cache_key(website_item_doc.name)
 
 	try:
-		cache.delete(key)
+		cache.delete(make_key(key))
 	except Exception:
 		raise_redisearch_error()
 
@@ -165,35 +290,23 @@ def delete_from_ac_dict(website_item_doc):
 @if_redisearch_enabled
 def define_autocomplete_dictionary():
 	"""
-	Defines/Redefines an autocomplete search dictionary for Website Item Name.
-	Also creats autocomplete dictionary for Published Item Groups.
+	Defines/Redefines an autocomplete search dictionary for Published Item Groups.
+	The dictionary for Website Item Names is built with the items in `reindex_all_web_items`.
 	"""
-
 	cache = frappe.cache()
-	item_ac = AutoCompleter(make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE), conn=cache)
-	item_group_ac = AutoCompleter(make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE), conn=cache)
+	shadow_key = make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE + ":new")
 
-	# Delete both autocomplete dicts
 	try:
-		cache.delete(make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE))
-		cache.delete(make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE))
+		cache.delete(shadow_key)
+		create_item_groups_autocomplete_dict(autocompleter=AutoCompleter(shadow_key, conn=cache))
+
+		if super(RedisWrapper, cache).exists(shadow_key):
+			super(RedisWrapper, cache).rename(shadow_key, make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE))
+		else:
+			cache.delete(make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE))
 	except Exception:
 		raise_redisearch_error()
 
-	create_items_autocomplete_dict(autocompleter=item_ac)
-	create_item_groups_autocomplete_dict(autocompleter=item_group_ac)
-
-
-@if_redisearch_enabled
-def create_items_autocomplete_dict(autocompleter):
-	"Add items as suggestions in Autocompleter."
-	items = frappe.get_all(
-		"Website Item", fields=["web_item_name", "item_group"], filters={"published": 1}
-	)
-
-	for item in items:
-		autocompleter.add_suggestions(Suggestion(item.web_item_name))
-
 
 @if_redisearch_enabled
 def create_item_groups_autocomplete_dict(autocompleter):
@@ -216,21 +329,63 @@ def create_item_groups_autocomplete_dict(autocompleter):
 
 
 @if_redisearch_enabled
-def reindex_all_web_items():
-	items = frappe.get_all("Website Item", fields=get_fields_indexed(), filters={"published": True})
-
+def reindex_all_web_items(version=None):
+	"""Write all published Website Items under the key prefix of the index `version`, along
+	with the name autocomplete dictionary. Items are read and written in batches, each batch
+	in one pipeline round trip."""
 	cache = frappe.cache()
-	for item in items:
-		web_item = create_web_item_map(item)
-		key = make_key(get_cache_key(item.name))
+	fields = get_fields_indexed()
+	key_prefix = get_key_prefix(version)
+
+	# build the name dictionary aside and swap it in, so that suggestions never go empty
+	autocomplete_key = make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE + ":new")
+	cache.delete(autocomplete_key)
+
+	last_name = ""
+	while True:
+		items = frappe.get_all(
+			"Website Item",
+			fields=fields,
+			filters={"published": 1, "name": (">", last_name)},
+			order_by="name",
+			limit_page_length=REINDEX_BATCH_SIZE,
+		)
+		if not items:
+			break
+
+		pipeline = cache.pipeline(transaction=False)
+		add_items_to_pipeline(pipeline, items, fields, key_prefix, autocomplete_key)
+		pipeline.execute()
+
+		last_name = items[-1].name
+
+	if super(RedisWrapper, cache).exists(autocomplete_key):
+		super(RedisWrapper, cache).rename(autocomplete_key, make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE))
+	else:
+		cache.delete(make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE))
+
+
+def get_index_version():
+	"Returns the version of the live index, None if it was built before indexes were versioned."
+	version = super(RedisWrapper, frappe.cache()).get(make_key(WEBSITE_ITEM_INDEX_VERSION))
+	return frappe.as_unicode(version) if version else None
+
+
+def get_index_name(version):
+	return f"{WEBSITE_ITEM_INDEX}_{version}"
+
+
+def get_key_prefix(version=None):
+	# must not start with the unversioned prefix, or the old index would pick up the items too
+	return f"website_item_{version}:" if version else WEBSITE_ITEM_KEY_PREFIX
 
-		for field, value in web_item.items():
-			super(RedisWrapper, cache).hset(key, field, value)
 
+def get_cache_key(name, key_prefix=None):
+	if key_prefix is None:
+		key_prefix = get_key_prefix(get_index_version())
 
-def get_cache_key(name):
 	name = frappe.scrub(name)
-	return f"{WEBSITE_ITEM_KEY_PREFIX}{name}"
+	return f"{key_prefix}{name}"
 
 
 def get_fields_indexed():
@@ -2,18 +2,23 @@
 # License: GNU General Public License v3. See license.txt
 
 import frappe
+from frappe.utils import create_batch, flt
 
 from erpnext.e_commerce.doctype.e_commerce_settings.e_commerce_settings import (
 	get_shopping_cart_settings,
 	show_quantity_in_website,
 )
-from erpnext.e_commerce.shopping_cart.cart import _get_cart_quotation, _set_price_list
+from erpnext.e_commerce.shopping_cart.cart import _get_cart_quotation, _set_price_list, get_party
 from erpnext.utilities.product import (
 	get_non_stock_item_status,
 	get_price,
+	get_prices,
 	get_web_item_qty_in_stock,
 )
 
+# listing prices are cached briefly, so that pricing rule or price changes show up soon
+WEBSITE_PRICE_CACHE_TTL = 300
+
 
 @frappe.whitelist(allow_guest=True)
 def get_product_info_for_website(item_code, skip_quotation_creation=False):
@@ -97,3 +102,122 @@ def set_product_info_for_website(item):
 		else:
 			item["price_stock_uom"] = ""
 			item["price_sales_uom"] = ""
+
+
+def get_prices_for_website_items(item_codes):
+	"""Returns {item_code: price} for the items of a listing page, as `get_product_info_for_website`
+	would show them. Prices are cached per price list and customer for a few minutes, so guests
+	(who all resolve to the same price list) share one cache."""
+	cart_settings = get_shopping_cart_settings()
+	if not (cart_settings.enabled and cart_settings.show_price and item_codes):
+		return {}
+
+	if frappe.session.user == "Guest" and cart_settings.hide_price_for_guest:
+		return {}
+
+	party = get_party()
+	price_list = _set_price_list(cart_settings, None)
+	customer = party.name if party and party.doctype == "Customer" else None
+	cache_key = "website_item_price:{0}:{1}:{2}:{3}".format(
+		price_list, cart_settings.default_customer_group, cart_settings.company, customer or ""
+	)
+
+	cache = frappe.cache()
+	prices, missing = {}, []
+	for item_code in item_codes:
+		price = cache.hget(cache_key, item_code)
+		if price is None:
+			missing.append(item_code)
+		else:
+			prices[item_code] = price
+
+	if missing:
+		fetched = get_prices(
+			missing, price_list, cart_settings.default_customer_group, cart_settings.company, party
+		)
+		for item_code in missing:
+			# cache items without a price too, to skip the lookup next time
+			prices[item_code] = fetched.get(item_code) or {}
+			cache.hset(cache_key, item_code, prices[item_code])
+
+		# expire the hash a fixed time after it was created, and not after the latest miss, so
+		# that price changes show up even while the listing is being browsed
+		if cache.ttl(cache.make_key(cache_key)) == -1:
+			cache.expire(cache.make_key(cache_key), WEBSITE_PRICE_CACHE_TTL)
+
+	return prices
+
+
+def clear_website_item_price_cache():
+	frappe.cache().delete_keys("website_item_price:")
+
+
+def update_website_item_discounts(item_codes=None):
+	"""Sets the `discount_percent` of Website Items to the discount a guest gets on the default
+	price list, so that listings can be filtered by discount in the query itself.
+	Updates all published Website Items if `item_codes` is not passed."""
+	cart_settings = get_shopping_cart_settings()
+	if not (cart_settings.enabled and cart_settings.price_list):
+		return
+
+	filters = {"published": 1}
+	if item_codes is not None:
+		if not item_codes:
+			return
+		filters["item_code"] = ("in", item_codes)
+
+	web_items = frappe.get_all("Website Item", filters=filters, fields=["item_code", "discount_percent"])
+	for batch in create_batch(web_items, 500):
+		prices = get_prices(
+			[d.item_code for d in batch],
+			cart_settings.price_list,
+			cart_settings.default_customer_group,
+			cart_settings.company,
+		)
+
+		changed = {}
+		for d in batch:
+			discount_percent = flt((prices.get(d.item_code) or {}).get("discount_percent"))
+			if discount_percent != flt(d.discount_percent):
+				changed.setdefault(discount_percent, []).append(d.item_code)
+
+		web_item = frappe.qb.DocType("Website Item")
+		for discount_percent, codes in changed.items():
+			(
+				frappe.qb.update(web_item)
+				.set(web_item.discount_percent, discount_percent)
+				.where(web_item.item_code.isin(codes))
+			).run()
+
+
+def get_items_with_variants(item_codes):
+	variants = frappe.get_all("Item", filters={"variant_of": ("in", item_codes)}, pluck="name")
+	return list(item_codes) + variants
+
+
+def on_pricing_rule_update(doc, method=None):
+	"""Refresh listing prices and discounts affected by a selling Pricing Rule"""
+	if not doc.selling:
+		return
+
+	clear_website_item_price_cache()
+
+	item_codes = None
+	if doc.apply_on == "Item Code":
+		item_codes = get_items_with_variants([d.item_code for d in doc.items if d.item_code])
+
+	frappe.enqueue(
+		"erpnext.e_commerce.shopping_cart.product_info.update_website_item_discounts",
+		queue="long",
+		item_codes=item_codes,
+		now=frappe.flags.in_test,
+	)
+
+
+def on_item_price_update(doc, method=None):
+	"""Refresh listing prices and discounts of the item (and its variants) for a selling price"""
+	if not doc.selling:
+		return
+
+	clear_website_item_price_cache()
+	update_website_item_discounts(get_items_with_variants([doc.item_code]))
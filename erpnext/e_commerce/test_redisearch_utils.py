@@ -0,0 +1,153 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import ceil
+from frappe.utils.redis_wrapper import RedisWrapper
+from redis.client import Pipeline
+
+from erpnext.e_commerce.doctype.website_item.test_website_item import create_regular_web_item
+from erpnext.e_commerce.redisearch_utils import (
+	WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE,
+	WEBSITE_ITEM_NAME_AUTOCOMPLETE,
+	define_autocomplete_dictionary,
+	index_web_items,
+	make_key,
+	reindex_all_web_items,
+)
+
+test_dependencies = ["Item", "Item Group"]
+
+ITEM_COMMANDS = ("HSET", "FT.SUGADD")
+
+
+class RoundTripCounter(RedisWrapper):
+	"""Stands in for the redis server. Records the commands sent one by one and the ones sent
+	in each pipeline. Only the keys written are tracked, other commands read as nil."""
+
+	def __init__(self, keys=None):
+		super().__init__()
+		self.commands = []
+		self.pipelines = []
+		self.keys = set(keys or [])
+
+	def execute_command(self, *args, **options):
+		self.commands.append(args)
+		return self.apply(args)
+
+	def apply(self, args):
+		command, keys = args[0], args[1:]
+		if command in ("HSET", "FT.SUGADD"):
+			self.keys.add(keys[0])
+		elif command == "DEL":
+			self.keys.difference_update(keys)
+		elif command == "EXISTS":
+			return len(self.keys.intersection(keys))
+		elif command == "RENAME":
+			self.keys.discard(keys[0])
+			self.keys.add(keys[1])
+
+	def pipeline(self, transaction=True, shard_hint=None):
+		return CountingPipeline(self, transaction, shard_hint)
+
+	def get_item_commands(self):
+		"""Returns the commands writing items or their suggestions, sent one by one"""
+		return [args for args in self.commands if args[0] in ITEM_COMMANDS]
+
+
+class CountingPipeline(Pipeline):
+	def __init__(self, cache, transaction, shard_hint):
+		super().__init__(cache.connection_pool, cache.response_callbacks, transaction, shard_hint)
+		self.cache = cache
+
+	def execute(self, raise_on_error=True):
+		commands = [args for args, options in self.command_stack]
+		self.reset()
+
+		self.cache.pipelines.append(commands)
+		return [self.cache.apply(args) for args in commands]
+
+
+class TestRedisearchUtils(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		for index in range(5):
+			item_code = f"Test Indexed Item {index}"
+			if not frappe.db.exists("Website Item", {"item_code": item_code}):
+				create_regular_web_item(item_code)
+
+	def run_with_cache(self, function, *args, cache=None):
+		cache = cache or RoundTripCounter()
+		with patch("frappe.cache", return_value=cache), patch(
+			"erpnext.e_commerce.redisearch_utils.is_redisearch_enabled", return_value=True
+		):
+			function(*args)
+
+		return cache
+
+	@patch("erpnext.e_commerce.redisearch_utils.REINDEX_BATCH_SIZE", 2)
+	def test_reindex_in_one_round_trip_per_batch(self):
+		published = frappe.db.count("Website Item", {"published": 1})
+		cache = self.run_with_cache(reindex_all_web_items, "test")
+
+		# one pipeline per batch of 2 items, each item written along with its name suggestion
+		self.assertEqual(len(cache.pipelines), ceil(published / 2))
+		for commands in cache.pipelines:
+			self.assertEqual({args[0] for args in commands}, set(ITEM_COMMANDS))
+		self.assertEqual(sum(len(commands) for commands in cache.pipelines), published * 2)
+		self.assertFalse(cache.get_item_commands())
+
+	def test_queued_items_indexed_in_one_round_trip(self):
+		names = frappe.get_all(
+			"Website Item", filters={"item_code": ("like", "Test Indexed Item %")}, pluck="name"
+		)
+		cache = self.run_with_cache(index_web_items, names)
+
+		self.assertEqual(len(cache.pipelines), 1)
+		self.assertEqual(len(cache.pipelines[0]), len(names) * 2)
+		self.assertFalse(cache.get_item_commands())
+
+	def test_unpublished_and_renamed_items_removed_from_suggestions(self):
+		names = frappe.get_all(
+			"Website Item",
+			filters={"item_code": ("in", ["Test Indexed Item 0", "Test Indexed Item 1"])},
+			fields=["name", "web_item_name"],
+			order_by="item_code",
+		)
+		unpublished, renamed = names
+		frappe.db.set_value("Website Item", unpublished.name, "published", 0)
+
+		cache = self.run_with_cache(
+			index_web_items, [unpublished.name, renamed.name], {renamed.name: "Old Item Name"}
+		)
+		frappe.db.set_value("Website Item", unpublished.name, "published", 1)
+
+		commands = cache.pipelines[0]
+		autocomplete_key = make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE)
+		self.assertIn(("FT.SUGDEL", autocomplete_key, unpublished.web_item_name), commands)
+		self.assertIn(("FT.SUGDEL", autocomplete_key, "Old Item Name"), commands)
+		self.assertIn(("FT.SUGADD", autocomplete_key, renamed.web_item_name, 1.0), commands)
+		self.assertNotIn(("FT.SUGDEL", autocomplete_key, renamed.web_item_name), commands)
+
+	def test_autocomplete_dictionaries_survive_reindex(self):
+		frappe.db.set_value("Item Group", "_Test Item Group", "show_in_website", 1)
+		live_keys = {
+			make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE),
+			make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE),
+		}
+
+		cache = RoundTripCounter(keys=live_keys)
+		self.run_with_cache(reindex_all_web_items, "test", cache=cache)
+		self.run_with_cache(define_autocomplete_dictionary, cache=cache)
+
+		# the dictionaries built aside replace the live ones, which are never deleted
+		self.assertEqual(cache.keys & live_keys, live_keys)
+		self.assertNotIn(make_key(WEBSITE_ITEM_NAME_AUTOCOMPLETE + ":new"), cache.keys)
+		self.assertNotIn(make_key(WEBSITE_ITEM_CATEGORY_AUTOCOMPLETE + ":new"), cache.keys)
+		for args in cache.commands:
+			if args[0] == "DEL":
+				self.assertFalse(live_keys.intersection(args[1:]))
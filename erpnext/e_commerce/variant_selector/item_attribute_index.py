@@ -0,0 +1,170 @@
+import frappe
+
+# hash of item group => {(attribute, attribute_value): set of item codes}
+ATTRIBUTE_INDEX_KEY = "item_attribute_index"
+# hash field holding the names of all the item groups in the index
+ALL_ITEM_GROUPS = "__all__"
+
+
+class ItemAttributeIndex:
+	"""Posting lists of the items published in website for each (attribute, value) pair,
+	built once per item group and kept in cache until an Item of the group is saved.
+
+	Selected attribute values are matched and counted by intersecting the lists in memory."""
+
+	def __init__(self, item_groups=None, group_postings=None):
+		self.item_groups = item_groups
+		self.group_postings = (
+			get_group_postings(item_groups) if group_postings is None else group_postings
+		)
+		self.postings = {}
+		for postings in self.group_postings.values():
+			merge_postings(self.postings, postings)
+
+	def scoped(self, item_groups):
+		"""Returns the index of `item_groups`, reusing the posting lists already loaded"""
+		if item_groups is None or item_groups == self.item_groups:
+			return self
+
+		group_postings = {}
+		missing = []
+		for item_group in item_groups:
+			if item_group in self.group_postings:
+				group_postings[item_group] = self.group_postings[item_group]
+			elif self.item_groups is None:
+				# not in the index of all item groups, so the group has no items
+				group_postings[item_group] = {}
+			else:
+				missing.append(item_group)
+
+		if missing:
+			group_postings.update(get_group_postings(missing))
+
+		return ItemAttributeIndex(item_groups, group_postings)
+
+	def get_items(self, attribute, values):
+		"""Returns items having any of the `values` for `attribute`"""
+		if not isinstance(values, (list, tuple, set)):
+			values = [values]
+
+		items = set()
+		for value in values:
+			items.update(self.postings.get((attribute, value), ()))
+
+		return items
+
+	def get_items_with_attributes(self, attributes, exclude=None):
+		"""Returns items matching all the selected `attributes` ({attribute: values}), ignoring
+		the selection for `exclude`. Returns None if nothing is selected."""
+		items = None
+		for attribute, values in attributes.items():
+			if attribute == exclude or not values:
+				continue
+
+			matching = self.get_items(attribute, values)
+			items = matching if items is None else items & matching
+
+		return items
+
+	def get_facets(self, attributes, selected=None):
+		"""Returns {attribute: {value: count}} for `attributes`, counting the items that
+		match the `selected` values of all the other attributes"""
+		selected = selected or {}
+		facets = {attribute: {} for attribute in attributes}
+		candidates = {
+			attribute: self.get_items_with_attributes(selected, exclude=attribute)
+			for attribute in attributes
+		}
+
+		for (attribute, value), items in self.postings.items():
+			if attribute not in facets:
+				continue
+
+			matching = candidates[attribute]
+			count = len(items) if matching is None else len(items & matching)
+			if count:
+				facets[attribute][value] = count
+
+		return facets
+
+
+def get_group_postings(item_groups=None):
+	"""Returns {item group: posting lists} of `item_groups`, of all item groups if not passed"""
+	cache = frappe.cache()
+
+	if item_groups is None:
+		item_groups = cache.hget(ATTRIBUTE_INDEX_KEY, ALL_ITEM_GROUPS)
+		if item_groups is None:
+			return build_attribute_index()
+
+	group_postings = {}
+	for item_group in item_groups:
+		postings = cache.hget(ATTRIBUTE_INDEX_KEY, item_group)
+		if postings is None:
+			postings = build_attribute_index(item_group)[item_group]
+
+		group_postings[item_group] = postings
+
+	return group_postings
+
+
+def merge_postings(postings, group_postings):
+	for key, items in group_postings.items():
+		if key in postings:
+			postings[key] = postings[key] | items
+		else:
+			postings[key] = items
+
+
+def build_attribute_index(item_group=None):
+	"""Builds and caches the posting lists of `item_group`, or of all item groups.
+	Returns {item group: posting lists} built."""
+	iva = frappe.qb.DocType("Item Variant Attribute")
+	item = frappe.qb.DocType("Item")
+	query = (
+		frappe.qb.from_(iva)
+		.join(item)
+		.on(item.name == iva.parent)
+		.select(item.item_group, iva.parent, iva.attribute, iva.attribute_value)
+		.where((iva.parenttype == "Item") & (item.published_in_website == 1))
+	)
+	if item_group:
+		query = query.where(item.item_group == item_group)
+
+	index = {}
+	for group, item_code, attribute, attribute_value in query.run():
+		index.setdefault(group, {}).setdefault((attribute, attribute_value), set()).add(item_code)
+
+	cache = frappe.cache()
+	if item_group:
+		index.setdefault(item_group, {})
+	else:
+		cache.hset(ATTRIBUTE_INDEX_KEY, ALL_ITEM_GROUPS, list(index))
+
+	for group, group_postings in index.items():
+		cache.hset(ATTRIBUTE_INDEX_KEY, group, group_postings)
+
+	return index
+
+
+def invalidate_attribute_index(item_groups):
+	"""Drops the posting lists of `item_groups`, to be rebuilt on next use"""
+	cache = frappe.cache()
+	item_groups = [d for d in item_groups if d]
+
+	for item_group in item_groups:
+		cache.hdel(ATTRIBUTE_INDEX_KEY, item_group)
+
+	all_item_groups = cache.hget(ATTRIBUTE_INDEX_KEY, ALL_ITEM_GROUPS)
+	if all_item_groups is not None and not set(item_groups).issubset(all_item_groups):
+		# a new item group has to be listed
+		cache.hdel(ATTRIBUTE_INDEX_KEY, ALL_ITEM_GROUPS)
+
+
+def invalidate_attribute_index_for_item(doc):
+	"""Invalidates the posting lists of the Item's item group, and the previous one if changed"""
+	doc_before_save = doc.get_doc_before_save()
+	if not (doc.get("attributes") or (doc_before_save and doc_before_save.get("attributes"))):
+		return
+
+	invalidate_attribute_index([doc.item_group, doc.get("old_item_group")])
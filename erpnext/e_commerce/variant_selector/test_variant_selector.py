@@ -6,6 +6,7 @@ from erpnext.e_commerce.doctype.e_commerce_settings.test_e_commerce_settings imp
 	setup_e_commerce_settings,
 )
 from erpnext.e_commerce.doctype.website_item.website_item import make_website_item
+from erpnext.e_commerce.variant_selector.item_attribute_index import ItemAttributeIndex
 from erpnext.e_commerce.variant_selector.utils import get_next_attribute_and_values
 from erpnext.stock.doctype.item.test_item import make_item
 
@@ -92,6 +93,31 @@ class TestVariantSelector(FrappeTestCase):
 		self.assertEqual(next_colours.pop(), "Red")
 		self.assertEqual(len(filtered_items), 1)
 		self.assertEqual(filtered_items.pop(), "Test-Tshirt-Temp-S-R")
+		self.assertEqual(next_values["attribute_value_counts"]["Test Colour"], {"Red": 1})
+
+		next_values = get_next_attribute_and_values(
+			"Test-Tshirt-Temp", selected_attributes={"Test Colour": "Red"}
+		)
+		self.assertEqual(
+			next_values["attribute_value_counts"]["Test Size"], {"Small": 1, "Medium": 1, "Large": 1}
+		)
+
+	def test_attribute_index_on_publish(self):
+		"""Publishing or unpublishing a variant updates the cached attribute index."""
+		item_group = frappe.db.get_value("Item", "Test-Tshirt-Temp-M-G", "item_group")
+		index = ItemAttributeIndex([item_group])
+		self.assertNotIn("Test-Tshirt-Temp-M-G", index.get_items("Test Colour", "Green"))
+
+		web_item = make_website_item(frappe.get_doc("Item", "Test-Tshirt-Temp-M-G"))
+		index = ItemAttributeIndex()
+		self.assertIn("Test-Tshirt-Temp-M-G", index.get_items("Test Colour", "Green"))
+		self.assertIn(
+			"Test-Tshirt-Temp-M-G", index.scoped([item_group]).get_items("Test Size", "Medium")
+		)
+
+		frappe.delete_doc("Website Item", web_item[0])
+		index = ItemAttributeIndex([item_group])
+		self.assertNotIn("Test-Tshirt-Temp-M-G", index.get_items("Test Colour", "Green"))
 
 	def test_exact_match_with_price(self):
 		"""
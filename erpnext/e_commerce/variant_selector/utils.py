@@ -105,14 +105,15 @@ def get_attributes_and_values(item_code):
 @frappe.whitelist(allow_guest=True)
 def get_next_attribute_and_values(item_code, selected_attributes):
 	"""Find the count of Items that match the selected attributes.
-	Also, find the attribute values that are not applicable for further searching.
+	Also, find the attribute values that are not applicable for further searching,
+	and the count of Items for each applicable value.
 	If less than equal to 10 items are found, return item_codes of those items.
 	If one item is matched exactly, return item_code of that item.
 	"""
 	selected_attributes = frappe.parse_json(selected_attributes)
 
 	item_cache = ItemVariantsCacheManager(item_code)
-	item_variants_data = item_cache.get_item_variants_data()
+	attribute_value_item_map = item_cache.get_attribute_value_item_map()
 
 	attributes = get_item_attributes(item_code)
 	attribute_list = [a.attribute for a in attributes]
@@ -126,31 +127,36 @@ def get_next_attribute_and_values(item_code, selected_attributes):
 			break
 
 	valid_options_for_attributes = frappe._dict()
+	attribute_value_counts = frappe._dict()
 
 	for a in attribute_list:
 		valid_options_for_attributes[a] = set()
+		attribute_value_counts[a] = {}
 
 		selected_attribute = selected_attributes.get(a, None)
 		if selected_attribute:
 			# already selected attribute values are valid options
 			valid_options_for_attributes[a].add(selected_attribute)
+			attribute_value_counts[a][selected_attribute] = len(filtered_items)
+
+	# intersect the items of each value with the filtered items
+	for (attribute, attribute_value), items in attribute_value_item_map.items():
+		if attribute in selected_attributes or attribute not in attribute_list:
+			continue
 
-	for row in item_variants_data:
-		item_code, attribute, attribute_value = row
-		if (
-			item_code in filtered_items
-			and attribute not in selected_attributes
-			and attribute in attribute_list
-		):
+		count = len(filtered_items.intersection(items))
+		if count:
 			valid_options_for_attributes[attribute].add(attribute_value)
+			attribute_value_counts[attribute][attribute_value] = count
 
 	optional_attributes = item_cache.get_optional_attributes()
 	exact_match = []
 	# search for exact match if all selected attributes are required attributes
 	if len(selected_attributes.keys()) >= (len(attribute_list) - len(optional_attributes)):
 		item_attribute_value_map = item_cache.get_item_attribute_value_map()
-		for item_code, attr_dict in item_attribute_value_map.items():
-			if item_code in filtered_items and set(attr_dict.keys()) == set(selected_attributes.keys()):
+		for item_code in filtered_items:
+			attr_dict = item_attribute_value_map.get(item_code) or {}
+			if set(attr_dict.keys()) == set(selected_attributes.keys()):
 				exact_match.append(item_code)
 
 	filtered_items_count = len(filtered_items)
@@ -169,6 +175,7 @@ def get_next_attribute_and_values(item_code, selected_attributes):
 	return {
 		"next_attribute": next_attribute,
 		"valid_options_for_attributes": valid_options_for_attributes,
+		"attribute_value_counts": attribute_value_counts,
 		"filtered_items_count": filtered_items_count,
 		"filtered_items": filtered_items if filtered_items_count < 10 else [],
 		"exact_match": exact_match,
@@ -279,6 +279,9 @@ standard_queries = {
 	"Customer": "erpnext.selling.doctype.customer.customer.get_customer_list",
 }
 
+# returns the condition used by link queries to search Item, Customer and Supplier
+link_search_backend = "erpnext.utilities.doctype.link_search_token.link_search_token.get_search_condition"
+
 doc_events = {
 	"*": {
 		"validate": "erpnext.support.doctype.service_level_agreement.service_level_agreement.apply",
@@ -305,6 +308,14 @@ doc_events = {
 		"on_update": "erpnext.e_commerce.doctype.e_commerce_settings.e_commerce_settings.validate_cart_settings"
 	},
 	"Tax Category": {"validate": "erpnext.regional.india.utils.validate_tax_category"},
+	"Pricing Rule": {
+		"on_update": "erpnext.e_commerce.shopping_cart.product_info.on_pricing_rule_update",
+		"after_delete": "erpnext.e_commerce.shopping_cart.product_info.on_pricing_rule_update",
+	},
+	"Item Price": {
+		"on_update": "erpnext.e_commerce.shopping_cart.product_info.on_item_price_update",
+		"after_delete": "erpnext.e_commerce.shopping_cart.product_info.on_item_price_update",
+	},
 	"Sales Invoice": {
 		"on_submit": [
 			"erpnext.regional.create_transaction_log",
@@ -349,8 +360,25 @@ doc_events = {
 			"erpnext.regional.italy.utils.set_state_code",
 			"erpnext.regional.india.utils.update_gst_category",
 		],
+		"on_update": "erpnext.accounts.party.clear_linked_party_contexts",
+		"on_trash": "erpnext.accounts.party.clear_linked_party_contexts",
+	},
+	"Supplier": {
+		"validate": "erpnext.regional.india.utils.validate_pan_for_india",
+		"on_update": "erpnext.utilities.doctype.link_search_token.link_search_token.update_link_search_tokens",
+		"on_trash": "erpnext.utilities.doctype.link_search_token.link_search_token.delete_link_search_tokens",
+		"after_rename": "erpnext.utilities.doctype.link_search_token.link_search_token.on_rename",
+	},
+	"Item": {
+		"on_update": "erpnext.utilities.doctype.link_search_token.link_search_token.update_link_search_tokens",
+		"on_trash": "erpnext.utilities.doctype.link_search_token.link_search_token.delete_link_search_tokens",
+		"after_rename": "erpnext.utilities.doctype.link_search_token.link_search_token.on_rename",
+	},
+	"Customer": {
+		"on_update": "erpnext.utilities.doctype.link_search_token.link_search_token.update_link_search_tokens",
+		"on_trash": "erpnext.utilities.doctype.link_search_token.link_search_token.delete_link_search_tokens",
+		"after_rename": "erpnext.utilities.doctype.link_search_token.link_search_token.on_rename",
 	},
-	"Supplier": {"validate": "erpnext.regional.india.utils.validate_pan_for_india"},
 	(
 		"Sales Invoice",
 		"Sales Order",
@@ -360,9 +388,13 @@ doc_events = {
 		"Purchase Receipt",
 	): {"validate": ["erpnext.regional.india.utils.set_place_of_supply"]},
 	"Contact": {
-		"on_trash": "erpnext.support.doctype.issue.issue.update_issue",
+		"on_trash": [
+			"erpnext.support.doctype.issue.issue.update_issue",
+			"erpnext.accounts.party.clear_linked_party_contexts",
+		],
 		"after_insert": "erpnext.telephony.doctype.call_log.call_log.link_existing_conversations",
 		"validate": ["erpnext.crm.utils.update_lead_phone_numbers"],
+		"on_update": "erpnext.accounts.party.clear_linked_party_contexts",
 	},
 	"Email Unsubscribe": {
 		"after_insert": "erpnext.crm.doctype.email_campaign.email_campaign.unsubscribe_recipient"
@@ -376,6 +408,10 @@ doc_events = {
 			"erpnext.regional.saudi_arabia.utils.delete_vat_settings_for_company",
 		]
 	},
+	("Tax Rule", "Customer Group", "Supplier Group", "Company"): {
+		"on_update": "erpnext.accounts.party.clear_all_party_contexts",
+		"on_trash": "erpnext.accounts.party.clear_all_party_contexts",
+	},
 	"Integration Request": {
 		"validate": "erpnext.accounts.doctype.payment_request.payment_request.validate_payment"
 	},
@@ -451,6 +487,7 @@ scheduler_events = {
 		"erpnext.loan_management.doctype.process_loan_security_shortfall.process_loan_security_shortfall.create_process_loan_security_shortfall",
 		"erpnext.loan_management.doctype.process_loan_interest_accrual.process_loan_interest_accrual.process_loan_interest_accrual_for_term_loans",
 		"erpnext.crm.doctype.lead.lead.daily_open_lead",
+		"erpnext.e_commerce.shopping_cart.product_info.update_website_item_discounts",
 	],
 	"weekly": ["erpnext.hr.doctype.employee.employee_reminders.send_reminders_in_advance_weekly"],
 	"monthly": ["erpnext.hr.doctype.employee.employee_reminders.send_reminders_in_advance_monthly"],
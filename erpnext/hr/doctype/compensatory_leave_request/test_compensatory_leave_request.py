@@ -17,6 +17,7 @@ class TestCompensatoryLeaveRequest(unittest.TestCase):
 	def setUp(self):
 		frappe.db.sql(""" delete from `tabCompensatory Leave Request`""")
 		frappe.db.sql(""" delete from `tabLeave Ledger Entry`""")
+		frappe.db.sql(""" delete from `tabLeave Allocation Balance`""")
 		frappe.db.sql(""" delete from `tabLeave Allocation`""")
 		frappe.db.sql(
 			""" delete from `tabAttendance` where attendance_date in {0} """.format(
@@ -136,38 +136,23 @@ def mark_attendance_and_link_log(
 		return None
 
 	elif attendance_status in ("Present", "Absent", "Half Day"):
-		employee_doc = frappe.get_doc("Employee", employee)
 		duplicate = get_duplicate_attendance_record(employee, attendance_date, shift)
 		overlapping = get_overlapping_shift_attendance(employee, attendance_date, shift)
 
 		if not duplicate and not overlapping:
-			doc_dict = {
-				"doctype": "Attendance",
-				"employee": employee,
-				"attendance_date": attendance_date,
-				"status": attendance_status,
-				"working_hours": working_hours,
-				"company": employee_doc.company,
-				"shift": shift,
-				"late_entry": late_entry,
-				"early_exit": early_exit,
-				"in_time": in_time,
-				"out_time": out_time,
-			}
-			attendance = frappe.get_doc(doc_dict).insert()
-			attendance.submit()
-
-			if attendance_status == "Absent":
-				attendance.add_comment(
-					text=_("Employee was marked Absent for not meeting the working hours threshold.")
-				)
-
-			frappe.db.sql(
-				"""update `tabEmployee Checkin`
-				set attendance = %s
-				where name in %s""",
-				(attendance.name, log_names),
+			attendance = create_attendance_for_checkins(
+				employee,
+				frappe.db.get_value("Employee", employee, "company"),
+				attendance_status,
+				attendance_date,
+				working_hours,
+				late_entry,
+				early_exit,
+				in_time,
+				out_time,
+				shift,
 			)
+			link_checkins_to_attendance({attendance.name: log_names})
 			return attendance
 		else:
 			skip_attendance_in_checkins(log_names)
@@ -178,6 +163,67 @@ def mark_attendance_and_link_log(
 		frappe.throw(_("{} is an invalid Attendance Status.").format(attendance_status))
 
 
+def create_attendance_for_checkins(
+	employee,
+	company,
+	attendance_status,
+	attendance_date,
+	working_hours=None,
+	late_entry=False,
+	early_exit=False,
+	in_time=None,
+	out_time=None,
+	shift=None,
+):
+	"""Creates and submits an attendance for checkins without checking for duplicate attendance.
+	The checkins are to be linked by the caller with `link_checkins_to_attendance`."""
+	attendance = frappe.get_doc(
+		{
+			"doctype": "Attendance",
+			"employee": employee,
+			"attendance_date": attendance_date,
+			"status": attendance_status,
+			"working_hours": working_hours,
+			"company": company,
+			"shift": shift,
+			"late_entry": late_entry,
+			"early_exit": early_exit,
+			"in_time": in_time,
+			"out_time": out_time,
+		}
+	).insert()
+	attendance.submit()
+
+	if attendance_status == "Absent":
+		attendance.add_comment(
+			text=_("Employee was marked Absent for not meeting the working hours threshold.")
+		)
+
+	return attendance
+
+
+def link_checkins_to_attendance(attendance_logs):
+	"""Links checkins to their attendance in a single update.
+
+	:param attendance_logs: dict of Attendance name -> list of 'Employee Checkin' names.
+	"""
+	if not attendance_logs:
+		return
+
+	EmployeeCheckin = frappe.qb.DocType("Employee Checkin")
+	attendance = frappe.qb.terms.Case()
+	log_names = []
+	for attendance_name, logs in attendance_logs.items():
+		attendance = attendance.when(EmployeeCheckin.name.isin(logs), attendance_name)
+		log_names.extend(logs)
+
+	(
+		frappe.qb.update(EmployeeCheckin)
+		.set(EmployeeCheckin.attendance, attendance)
+		.where(EmployeeCheckin.name.isin(log_names))
+	).run()
+
+
 def calculate_working_hours(logs, check_in_out_type, working_hours_calc_type):
 	"""Given a set of logs in chronological order calculates the total working hours based on the parameters.
 	Zero is returned for all invalid cases.
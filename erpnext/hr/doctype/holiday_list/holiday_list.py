@@ -118,3 +118,11 @@ def is_holiday(holiday_list, date=None):
 		return bool(frappe.get_all("Holiday List", dict(name=holiday_list, holiday_date=date)))
 	else:
 		return False
+
+
+def get_holiday_dates(holiday_list):
+	"""Returns the set of holiday dates in the given holiday list"""
+	if not holiday_list:
+		return set()
+
+	return set(frappe.get_all("Holiday", filters={"parent": holiday_list}, pluck="holiday_date"))
@@ -19,6 +19,7 @@ class TestLeaveAllocation(FrappeTestCase):
 		frappe.db.delete("Leave Period")
 		frappe.db.delete("Leave Allocation")
 		frappe.db.delete("Leave Ledger Entry")
+		frappe.db.delete("Leave Allocation Balance")
 
 		emp_id = make_employee("test_emp_leave_allocation@salary.com", company="_Test Company")
 		self.employee = frappe.get_doc("Employee", emp_id)
@@ -0,0 +1,195 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from typing import Dict, List, Optional
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Max, Min, Sum
+from frappe.utils import flt, getdate
+
+
+class LeaveAllocationBalance(Document):
+	pass
+
+
+def update_leave_allocation_balances(employee: str, leave_type: str) -> None:
+	"""Rebuilds the balances of an employee's allocations for a leave type from the Leave Ledger.
+	Called whenever a ledger entry for the (employee, leave type) is submitted, cancelled or deleted,
+	so that balance lookups do not have to scan the ledger."""
+	from erpnext.hr.doctype.leave_application.leave_application import get_leaves_for_period
+
+	if not (employee and leave_type):
+		return
+
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+	entries = (
+		frappe.qb.from_(Ledger)
+		.select(
+			Ledger.transaction_name,
+			Ledger.is_carry_forward,
+			Sum(Ledger.leaves).as_("leaves"),
+			Min(Ledger.from_date).as_("from_date"),
+			Max(Ledger.from_date).as_("last_allocated_on"),
+			Max(Ledger.to_date).as_("to_date"),
+		)
+		.where(
+			(Ledger.employee == employee)
+			& (Ledger.leave_type == leave_type)
+			& (Ledger.docstatus == 1)
+			& (Ledger.transaction_type == "Leave Allocation")
+			& (Ledger.is_expired == 0)
+			& (Ledger.is_lwp == 0)
+		)
+		.groupby(Ledger.transaction_name, Ledger.is_carry_forward)
+	).run(as_dict=True)
+
+	allocations = {}
+	for entry in entries:
+		allocation = allocations.setdefault(
+			entry.transaction_name,
+			frappe._dict(
+				employee=employee,
+				leave_type=leave_type,
+				leave_allocation=entry.transaction_name,
+				from_date=entry.from_date,
+				to_date=entry.to_date,
+				carry_forward_expiry=None,
+				last_allocated_on=entry.last_allocated_on,
+				new_leaves_allocated=0,
+				unused_leaves=0,
+			),
+		)
+		allocation.from_date = min(allocation.from_date, entry.from_date)
+		allocation.to_date = max(allocation.to_date, entry.to_date)
+		allocation.last_allocated_on = max(allocation.last_allocated_on, entry.last_allocated_on)
+
+		if entry.is_carry_forward:
+			allocation.unused_leaves = flt(entry.leaves)
+			allocation.carry_forward_expiry = entry.to_date
+		else:
+			allocation.new_leaves_allocated = flt(entry.leaves)
+
+	existing = dict(
+		frappe.get_all(
+			"Leave Allocation Balance",
+			filters={"employee": employee, "leave_type": leave_type},
+			fields=["leave_allocation", "name"],
+			as_list=True,
+		)
+	)
+
+	for allocation in allocations.values():
+		allocation.leaves_taken = (
+			get_leaves_for_period(employee, leave_type, allocation.from_date, allocation.to_date) * -1
+		)
+		allocation.leave_balance = (
+			allocation.new_leaves_allocated + allocation.unused_leaves - allocation.leaves_taken
+		)
+
+		name = existing.pop(allocation.leave_allocation, None)
+		if name:
+			frappe.db.set_value("Leave Allocation Balance", name, allocation, update_modified=False)
+		else:
+			frappe.get_doc(dict(allocation, doctype="Leave Allocation Balance")).db_insert()
+
+	if existing:
+		frappe.db.delete("Leave Allocation Balance", {"name": ("in", list(existing.values()))})
+
+
+def get_leave_balances(
+	employees: List[str], date: str, leave_type: Optional[str] = None
+) -> Dict[str, Dict[str, Dict]]:
+	"""Returns the allocation and balance of the leaves allocated on `date` for many employees
+	in one query, as {employee: {leave_type: details}}. Carry forwarded leaves are counted
+	only till they expire, as in `get_leave_allocation_records`.
+
+	Allocations with ledger entries dated after `date`, like earned leave accruals, are read
+	from the Leave Ledger instead, so that leaves are not counted before they are allocated."""
+	if not employees:
+		return {}
+
+	date = getdate(date)
+	filters = {"employee": ("in", employees), "from_date": ("<=", date), "to_date": (">=", date)}
+	if leave_type:
+		filters["leave_type"] = leave_type
+
+	balances = frappe.get_all(
+		"Leave Allocation Balance",
+		filters=filters,
+		fields=[
+			"employee",
+			"leave_type",
+			"from_date",
+			"to_date",
+			"carry_forward_expiry",
+			"last_allocated_on",
+			"new_leaves_allocated",
+			"unused_leaves",
+			"leaves_taken",
+		],
+	)
+
+	leave_balances = {}
+	for d in balances:
+		if not d.last_allocated_on or getdate(d.last_allocated_on) > date:
+			balance = get_leave_balance_from_ledger(d.employee, d.leave_type, date)
+			if balance:
+				leave_balances.setdefault(d.employee, {})[d.leave_type] = balance
+			continue
+
+		unused_leaves = d.unused_leaves
+		if d.carry_forward_expiry and getdate(d.carry_forward_expiry) < date:
+			unused_leaves = 0
+
+		total_leaves_allocated = flt(d.new_leaves_allocated) + flt(unused_leaves)
+		leave_balances.setdefault(d.employee, {})[d.leave_type] = frappe._dict(
+			from_date=d.from_date,
+			to_date=d.to_date,
+			total_leaves_allocated=total_leaves_allocated,
+			new_leaves_allocated=d.new_leaves_allocated,
+			unused_leaves=unused_leaves,
+			leaves_taken=flt(d.leaves_taken),
+			remaining_leaves=total_leaves_allocated - flt(d.leaves_taken),
+		)
+
+	return leave_balances
+
+
+def get_leave_balance_from_ledger(employee: str, leave_type: str, date: str) -> Optional[Dict]:
+	"""Returns the details of `get_leave_balances` for one allocation, from the ledger entries
+	dated on or before `date`"""
+	from erpnext.hr.doctype.leave_application.leave_application import (
+		get_leave_allocation_records,
+		get_leaves_for_period,
+	)
+
+	allocation = get_leave_allocation_records(employee, date, leave_type).get(leave_type)
+	if not allocation:
+		return None
+
+	leaves_taken = (
+		get_leaves_for_period(employee, leave_type, allocation.from_date, allocation.to_date) * -1
+	)
+	return frappe._dict(
+		from_date=allocation.from_date,
+		to_date=allocation.to_date,
+		total_leaves_allocated=allocation.total_leaves_allocated,
+		new_leaves_allocated=flt(allocation.new_leaves_allocated),
+		unused_leaves=flt(allocation.unused_leaves),
+		leaves_taken=leaves_taken,
+		remaining_leaves=allocation.total_leaves_allocated - leaves_taken,
+	)
+
+
+def rebuild_leave_allocation_balances() -> None:
+	"""Rebuilds balances for every (employee, leave type) in the Leave Ledger"""
+	pairs = frappe.get_all(
+		"Leave Ledger Entry",
+		filters={"docstatus": 1, "transaction_type": "Leave Allocation"},
+		fields=["employee", "leave_type"],
+		distinct=True,
+		as_list=True,
+	)
+	for employee, leave_type in pairs:
+		update_leave_allocation_balances(employee, leave_type)
@@ -0,0 +1,102 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, get_year_ending, get_year_start, getdate
+
+from erpnext.hr.doctype.employee.test_employee import make_employee
+from erpnext.hr.doctype.holiday_list.test_holiday_list import set_holiday_list
+from erpnext.hr.doctype.leave_allocation_balance.leave_allocation_balance import get_leave_balances
+from erpnext.hr.doctype.leave_application.leave_application import get_leave_balance_on
+from erpnext.hr.doctype.leave_application.test_leave_application import (
+	get_first_sunday,
+	make_allocation_record,
+)
+from erpnext.payroll.doctype.salary_slip.test_salary_slip import (
+	make_holiday_list,
+	make_leave_application,
+)
+
+
+class TestLeaveAllocationBalance(FrappeTestCase):
+	def setUp(self):
+		for dt in [
+			"Leave Application",
+			"Leave Allocation",
+			"Leave Ledger Entry",
+			"Leave Allocation Balance",
+		]:
+			frappe.db.delete(dt)
+
+		self.holiday_list = make_holiday_list()
+
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_balance_maintained_from_ledger(self):
+		employee = make_employee("test_leave_balance@example.com", company="_Test Company")
+		date = getdate()
+		allocation = make_allocation_record(
+			employee=employee, from_date=get_year_start(date), to_date=get_year_ending(date)
+		)
+
+		balance = frappe.db.get_value(
+			"Leave Allocation Balance",
+			{"leave_allocation": allocation.name},
+			["leaves_taken", "leave_balance"],
+			as_dict=True,
+		)
+		self.assertEqual(balance.leaves_taken, 0)
+		self.assertEqual(balance.leave_balance, 30)
+
+		first_sunday = get_first_sunday(self.holiday_list)
+		leave_application = make_leave_application(
+			employee, add_days(first_sunday, 1), add_days(first_sunday, 4), "_Test Leave Type"
+		)
+
+		balances = get_leave_balances([employee], date)
+		self.assertEqual(balances[employee]["_Test Leave Type"].leaves_taken, 4)
+		self.assertEqual(
+			balances[employee]["_Test Leave Type"].remaining_leaves,
+			get_leave_balance_on(
+				employee,
+				"_Test Leave Type",
+				date,
+				to_date=allocation.to_date,
+				consider_all_leaves_in_the_allocation_period=True,
+			),
+		)
+
+		leave_application.cancel()
+		balances = get_leave_balances([employee], date)
+		self.assertEqual(balances[employee]["_Test Leave Type"].remaining_leaves, 30)
+
+	def test_balance_before_later_ledger_entry(self):
+		employee = make_employee("test_leave_balance@example.com", company="_Test Company")
+		year_start = get_year_start(getdate())
+		allocation = make_allocation_record(
+			employee=employee, from_date=year_start, to_date=get_year_ending(year_start)
+		)
+
+		# leaves accrued later in the allocation period, like earned leaves
+		frappe.get_doc(
+			dict(
+				doctype="Leave Ledger Entry",
+				employee=employee,
+				leave_type="_Test Leave Type",
+				transaction_type="Leave Allocation",
+				transaction_name=allocation.name,
+				leaves=5,
+				from_date=add_days(year_start, 60),
+				to_date=allocation.to_date,
+				is_carry_forward=0,
+				company="_Test Company",
+			)
+		).submit()
+
+		balances = get_leave_balances([employee], add_days(year_start, 30))
+		self.assertEqual(balances[employee]["_Test Leave Type"].total_leaves_allocated, 30)
+		self.assertEqual(balances[employee]["_Test Leave Type"].remaining_leaves, 30)
+
+		balances = get_leave_balances([employee], add_days(year_start, 60))
+		self.assertEqual(balances[employee]["_Test Leave Type"].total_leaves_allocated, 35)
+		self.assertEqual(balances[employee]["_Test Leave Type"].remaining_leaves, 35)
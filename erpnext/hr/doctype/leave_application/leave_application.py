@@ -1,7 +1,7 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import frappe
 from frappe import _
@@ -21,6 +21,7 @@ from frappe.utils import (
 
 from erpnext.buying.doctype.supplier_scorecard.supplier_scorecard import daterange
 from erpnext.hr.doctype.employee.employee import get_holiday_list_for_employee
+from erpnext.hr.doctype.leave_allocation_balance.leave_allocation_balance import get_leave_balances
 from erpnext.hr.doctype.leave_block_list.leave_block_list import get_applicable_block_dates
 from erpnext.hr.doctype.leave_ledger_entry.leave_ledger_entry import create_leave_ledger_entry
 from erpnext.hr.utils import (
@@ -753,28 +754,7 @@ def get_number_of_leave_days(
 
 @frappe.whitelist()
 def get_leave_details(employee, date):
-	allocation_records = get_leave_allocation_records(employee, date)
-	leave_allocation = {}
-	for d in allocation_records:
-		allocation = allocation_records.get(d, frappe._dict())
-		remaining_leaves = get_leave_balance_on(
-			employee, d, date, to_date=allocation.to_date, consider_all_leaves_in_the_allocation_period=True
-		)
-
-		end_date = allocation.to_date
-		leaves_taken = get_leaves_for_period(employee, d, allocation.from_date, end_date) * -1
-		leaves_pending = get_leaves_pending_approval_for_period(
-			employee, d, allocation.from_date, end_date
-		)
-		expired_leaves = allocation.total_leaves_allocated - (remaining_leaves + leaves_taken)
-
-		leave_allocation[d] = {
-			"total_leaves": allocation.total_leaves_allocated,
-			"expired_leaves": expired_leaves if expired_leaves > 0 else 0,
-			"leaves_taken": leaves_taken,
-			"leaves_pending_approval": leaves_pending,
-			"remaining_leaves": remaining_leaves,
-		}
+	leave_allocation = get_leave_details_for_employees([employee], date).get(employee, {})
 
 	# is used in set query
 	lwp = frappe.get_list("Leave Type", filters={"is_lwp": 1}, pluck="name")
@@ -786,6 +766,59 @@ def get_leave_details(employee, date):
 	}
 
 
+def get_leave_details_for_employees(employees: List[str], date: str) -> Dict[str, Dict]:
+	"""Returns the allocation details per leave type of many employees, as shown in
+	`get_leave_details`, from the maintained Leave Allocation Balances"""
+	leave_balances = get_leave_balances(employees, date)
+	pending_leaves = get_leaves_pending_approval_for_employees(list(leave_balances), leave_balances)
+
+	leave_details = {}
+	for employee, allocations in leave_balances.items():
+		for leave_type, allocation in allocations.items():
+			expired_leaves = allocation.total_leaves_allocated - (
+				allocation.remaining_leaves + allocation.leaves_taken
+			)
+			leave_details.setdefault(employee, {})[leave_type] = {
+				"total_leaves": allocation.total_leaves_allocated,
+				"expired_leaves": expired_leaves if expired_leaves > 0 else 0,
+				"leaves_taken": allocation.leaves_taken,
+				"leaves_pending_approval": pending_leaves.get((employee, leave_type), 0.0),
+				"remaining_leaves": allocation.remaining_leaves,
+			}
+
+	return leave_details
+
+
+def get_leaves_pending_approval_for_employees(
+	employees: List[str], leave_balances: Dict[str, Dict]
+) -> Dict:
+	"""Returns leaves pending for approval within each allocation period in `leave_balances`,
+	as {(employee, leave_type): leaves}"""
+	if not employees:
+		return {}
+
+	applications = frappe.get_all(
+		"Leave Application",
+		filters={"employee": ("in", employees), "status": "Open"},
+		fields=["employee", "leave_type", "from_date", "to_date", "total_leave_days"],
+	)
+
+	pending_leaves = {}
+	for application in applications:
+		allocation = leave_balances.get(application.employee, {}).get(application.leave_type)
+		if not allocation:
+			continue
+
+		from_date, to_date = getdate(allocation.from_date), getdate(allocation.to_date)
+		if (from_date <= getdate(application.from_date) <= to_date) or (
+			from_date <= getdate(application.to_date) <= to_date
+		):
+			key = (application.employee, application.leave_type)
+			pending_leaves[key] = pending_leaves.get(key, 0.0) + flt(application.total_leave_days)
+
+	return pending_leaves
+
+
 @frappe.whitelist()
 def get_leave_balance_on(
 	employee: str,
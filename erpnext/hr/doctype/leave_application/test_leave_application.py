@@ -81,6 +81,7 @@ class TestLeaveApplication(unittest.TestCase):
 			"Leave Allocation",
 			"Salary Slip",
 			"Leave Ledger Entry",
+			"Leave Allocation Balance",
 			"Leave Period",
 			"Leave Policy Assignment",
 		]:
@@ -29,6 +29,7 @@ class TestLeaveEncashment(FrappeTestCase):
 		frappe.db.delete("Leave Policy Assignment")
 		frappe.db.delete("Leave Allocation")
 		frappe.db.delete("Leave Ledger Entry")
+		frappe.db.delete("Leave Allocation Balance")
 		frappe.db.delete("Additional Salary")
 		frappe.db.delete("Leave Encashment")
 
@@ -7,12 +7,19 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import DATE_FORMAT, flt, getdate, today
 
+from erpnext.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+	update_leave_allocation_balances,
+)
+
 
 class LeaveLedgerEntry(Document):
 	def validate(self):
 		if getdate(self.from_date) > getdate(self.to_date):
 			frappe.throw(_("To date needs to be before from date"))
 
+	def on_submit(self):
+		update_leave_allocation_balances(self.employee, self.leave_type)
+
 	def on_cancel(self):
 		# allow cancellation of expiry leaves
 		if self.is_expired:
@@ -20,6 +27,8 @@ class LeaveLedgerEntry(Document):
 		else:
 			frappe.throw(_("Only expired allocation can be cancelled"))
 
+		update_leave_allocation_balances(self.employee, self.leave_type)
+
 
 def validate_leave_allocation_against_leave_application(ledger):
 	"""Checks that leave allocation has no leave application against it"""
@@ -81,6 +90,7 @@ def delete_ledger_entry(ledger):
 			OR `name`=%s""",
 		(ledger.transaction_name, expired_entry),
 	)
+	update_leave_allocation_balances(ledger.employee, ledger.leave_type)
 
 
 def get_previous_expiry_ledger_entry(ledger):
@@ -27,6 +27,7 @@ class TestLeavePolicyAssignment(FrappeTestCase):
 			"Leave Allocation",
 			"Leave Policy Assignment",
 			"Leave Ledger Entry",
+			"Leave Allocation Balance",
 		]:
 			frappe.db.delete(doctype)
 
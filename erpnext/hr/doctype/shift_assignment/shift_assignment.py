@@ -261,6 +261,44 @@ def get_shifts_for_date(employee: str, for_timestamp: datetime) -> List[Dict[str
 	).run(as_dict=True)
 
 
+def get_shift_assignments_for_employees(
+	employees: List[str], from_date: str, to_date: str
+) -> Dict[str, List[Dict]]:
+	"""Returns a dict of employee -> active shift assignments overlapping the given date range"""
+	assignment = frappe.qb.DocType("Shift Assignment")
+
+	assignments = (
+		frappe.qb.from_(assignment)
+		.select(
+			assignment.name,
+			assignment.employee,
+			assignment.shift_type,
+			assignment.start_date,
+			assignment.end_date,
+		)
+		.where(
+			(assignment.employee.isin(employees))
+			& (assignment.docstatus == 1)
+			& (assignment.status == "Active")
+			& (assignment.start_date <= getdate(to_date))
+			& (
+				Criterion.any(
+					[
+						assignment.end_date.isnull(),
+						(assignment.end_date.isnotnull() & (getdate(from_date) <= assignment.end_date)),
+					]
+				)
+			)
+		)
+	).run(as_dict=True)
+
+	employee_assignments = {}
+	for entry in assignments:
+		employee_assignments.setdefault(entry.employee, []).append(entry)
+
+	return employee_assignments
+
+
 def get_shift_for_timestamp(employee: str, for_timestamp: datetime) -> Dict:
 	shifts = get_shifts_for_date(employee, for_timestamp)
 	if shifts:
@@ -478,7 +516,7 @@ def get_shift_details(shift_type_name: str, for_timestamp: datetime = None) -> D
 	if for_timestamp is None:
 		for_timestamp = now_datetime()
 
-	shift_type = frappe.get_doc("Shift Type", shift_type_name)
+	shift_type = frappe.get_cached_doc("Shift Type", shift_type_name)
 	shift_actual_start = shift_type.start_time - timedelta(
 		minutes=shift_type.begin_check_in_before_shift_start_time
 	)
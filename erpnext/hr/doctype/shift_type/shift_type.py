@@ -7,21 +7,38 @@ from datetime import datetime, timedelta
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import cint, get_datetime, get_time, getdate
+from frappe.utils import cint, create_batch, get_datetime, get_time, getdate
 
 from erpnext.buying.doctype.supplier_scorecard.supplier_scorecard import daterange
-from erpnext.hr.doctype.attendance.attendance import mark_attendance
 from erpnext.hr.doctype.employee.employee import get_holiday_list_for_employee
 from erpnext.hr.doctype.employee_checkin.employee_checkin import (
 	calculate_working_hours,
+	create_attendance_for_checkins,
+	link_checkins_to_attendance,
 	mark_attendance_and_link_log,
+	skip_attendance_in_checkins,
 )
-from erpnext.hr.doctype.holiday_list.holiday_list import is_holiday
+from erpnext.hr.doctype.holiday_list.holiday_list import get_holiday_dates
 from erpnext.hr.doctype.shift_assignment.shift_assignment import (
 	get_employee_shift,
+	get_shift_assignments_for_employees,
 	get_shift_details,
+	get_shift_for_time,
+	has_overlapping_timings,
 )
 
+EMPLOYEE_BATCH_SIZE = 500
+CHECKIN_FIELDS = [
+	"name",
+	"employee",
+	"log_type",
+	"time",
+	"shift_start",
+	"shift_end",
+	"shift_actual_start",
+	"shift_actual_end",
+]
+
 
 class ShiftType(Document):
 	@frappe.whitelist()
@@ -40,14 +57,46 @@ class ShiftType(Document):
 			"shift_actual_end": ("<", self.last_sync_of_checkin),
 			"shift": self.name,
 		}
+		employees = frappe.db.get_list(
+			"Employee Checkin", filters=filters, pluck="employee", distinct=True, order_by="employee"
+		)
+
+		for employee_batch in create_batch(employees, EMPLOYEE_BATCH_SIZE):
+			self.process_checkins_for_employees(employee_batch, filters)
+
+		assigned_employees = self.get_assigned_employee(self.process_attendance_after, True)
+		for employee_batch in create_batch(assigned_employees, EMPLOYEE_BATCH_SIZE):
+			self.mark_absent_for_employees(employee_batch)
+
+	def process_checkins_for_employees(self, employees, filters):
+		"""Marks attendance from the unprocessed checkins of a batch of employees. Checkins are fetched
+		with only the columns needed, and attendance links are written back in bulk."""
 		logs = frappe.db.get_list(
-			"Employee Checkin", fields="*", filters=filters, order_by="employee,time"
+			"Employee Checkin",
+			fields=CHECKIN_FIELDS,
+			filters=dict(filters, employee=("in", employees)),
+			order_by="employee,time",
+		)
+		if not logs:
+			return
+
+		employee_company = dict(
+			frappe.get_all(
+				"Employee", filters={"name": ("in", employees)}, fields=["name", "company"], as_list=True
+			)
 		)
+		marked_attendance = get_marked_attendance(
+			employees,
+			min(log.shift_actual_start for log in logs).date(),
+			max(log.shift_actual_start for log in logs).date(),
+		)
+		attendance_logs, skipped_logs = {}, []
 
 		for key, group in itertools.groupby(
 			logs, key=lambda x: (x["employee"], x["shift_actual_start"])
 		):
 			single_shift_logs = list(group)
+			employee, attendance_date = key[0], key[1].date()
 			(
 				attendance_status,
 				working_hours,
@@ -57,10 +106,30 @@ class ShiftType(Document):
 				out_time,
 			) = self.get_attendance(single_shift_logs)
 
-			mark_attendance_and_link_log(
-				single_shift_logs,
+			if attendance_status == "Skip":
+				skipped_logs.extend(log.name for log in single_shift_logs)
+				continue
+
+			if (employee, attendance_date) in marked_attendance:
+				# an attendance exists for the day, let the duplicate and overlapping shift checks decide
+				mark_attendance_and_link_log(
+					single_shift_logs,
+					attendance_status,
+					attendance_date,
+					working_hours,
+					late_entry,
+					early_exit,
+					in_time,
+					out_time,
+					self.name,
+				)
+				continue
+
+			attendance = create_attendance_for_checkins(
+				employee,
+				employee_company.get(employee),
 				attendance_status,
-				key[1].date(),
+				attendance_date,
 				working_hours,
 				late_entry,
 				early_exit,
@@ -68,9 +137,12 @@ class ShiftType(Document):
 				out_time,
 				self.name,
 			)
+			attendance_logs[attendance.name] = [log.name for log in single_shift_logs]
+			marked_attendance.setdefault((employee, attendance_date), set()).add(self.name)
 
-		for employee in self.get_assigned_employee(self.process_attendance_after, True):
-			self.mark_absent_for_dates_with_no_attendance(employee)
+		link_checkins_to_attendance(attendance_logs)
+		if skipped_logs:
+			skip_attendance_in_checkins(skipped_logs)
 
 	def get_attendance(self, logs):
 		"""Return attendance_status, working_hours, late_entry, early_exit, in_time, out_time
@@ -109,11 +181,60 @@ class ShiftType(Document):
 			return "Absent", total_working_hours, late_entry, early_exit, in_time, out_time
 		return "Present", total_working_hours, late_entry, early_exit, in_time, out_time
 
-	def mark_absent_for_dates_with_no_attendance(self, employee):
+	def mark_absent_for_employees(self, employees):
+		"""Marks Absents for a batch of employees. Employee details, shift assignments, holidays and
+		existing attendance are fetched once for the whole batch."""
+		employee_details = {
+			d.name: d
+			for d in frappe.get_all(
+				"Employee",
+				filters={"name": ("in", employees)},
+				fields=[
+					"name",
+					"company",
+					"default_shift",
+					"date_of_joining",
+					"relieving_date",
+					"creation",
+				],
+			)
+		}
+		from_date = self.process_attendance_after
+		to_date = get_datetime(self.last_sync_of_checkin).date()
+
+		marked_attendance = get_marked_attendance(employees, from_date, to_date)
+		shift_assignments = get_shift_assignments_for_employees(employees, from_date, to_date)
+		holidays = {}
+
+		for employee in employees:
+			if employee in employee_details:
+				self.mark_absent_for_dates_with_no_attendance(
+					employee,
+					employee_details[employee],
+					marked_attendance,
+					holidays,
+					shift_assignments.get(employee, []),
+				)
+
+	def mark_absent_for_dates_with_no_attendance(
+		self,
+		employee,
+		employee_details=None,
+		marked_attendance=None,
+		holidays=None,
+		shift_assignments=None,
+	):
 		"""Marks Absents for the given employee on working days in this shift which have no attendance marked.
 		The Absent is marked starting from 'process_attendance_after' or employee creation date.
+
+		:param employee_details: (optional) Employee's `company`, `default_shift`, `date_of_joining`,
+		        `relieving_date` and `creation`.
+		:param marked_attendance: (optional) dict of (employee, date) -> shifts with an attendance marked.
+		:param holidays: (optional) dict of holiday list -> set of holiday dates, filled as lists are loaded.
+		:param shift_assignments: (optional) employee's active shift assignments in the processed dates.
+		        The shift for each date is resolved from these instead of being queried per date.
 		"""
-		start_date, end_date = self.get_start_and_end_dates(employee)
+		start_date, end_date = self.get_start_and_end_dates(employee, employee_details)
 
 		# no shift assignment found, no need to process absent attendance records
 		if start_date is None:
@@ -123,37 +244,86 @@ class ShiftType(Document):
 		if not holiday_list_name:
 			holiday_list_name = get_holiday_list_for_employee(employee, False)
 
+		if holidays is None:
+			holidays = {}
+		if holiday_list_name not in holidays:
+			holidays[holiday_list_name] = get_holiday_dates(holiday_list_name)
+
 		start_time = get_time(self.start_time)
+		absent_dates = []
 
 		for date in daterange(getdate(start_date), getdate(end_date)):
-			if is_holiday(holiday_list_name, date):
+			if date in holidays[holiday_list_name]:
 				# skip marking absent on a holiday
 				continue
 
+			marked_shifts = marked_attendance.get((employee, date)) if marked_attendance else None
+			if marked_shifts and (self.name in marked_shifts or None in marked_shifts):
+				# duplicate attendance
+				continue
+
 			timestamp = datetime.combine(date, start_time)
-			shift_details = get_employee_shift(employee, timestamp, True)
-
-			if shift_details and shift_details.shift_type.name == self.name:
-				attendance = mark_attendance(employee, date, "Absent", self.name)
-				if attendance:
-					frappe.get_doc(
-						{
-							"doctype": "Comment",
-							"comment_type": "Comment",
-							"reference_doctype": "Attendance",
-							"reference_name": attendance,
-							"content": frappe._("Employee was marked Absent due to missing Employee Checkins."),
-						}
-					).insert(ignore_permissions=True)
-
-	def get_start_and_end_dates(self, employee):
+			if shift_assignments is None:
+				shift_details = get_employee_shift(employee, timestamp, True)
+			else:
+				# holidays of this shift are already skipped above
+				shift_details = get_shift_from_assignments(
+					shift_assignments, employee_details.default_shift, timestamp
+				)
+
+			if not shift_details or shift_details.shift_type.name != self.name:
+				continue
+
+			if marked_shifts and any(
+				has_overlapping_timings(self.name, shift) for shift in marked_shifts
+			):
+				# attendance is already marked for an overlapping shift
+				continue
+
+			absent_dates.append(date)
+
+		if absent_dates:
+			company = (
+				employee_details.company
+				if employee_details
+				else frappe.db.get_value("Employee", employee, "company")
+			)
+			self.mark_absent(employee, company, absent_dates)
+
+	def mark_absent(self, employee, company, dates):
+		"""Creates and submits Absent attendance for the given dates, already checked for duplicate
+		and overlapping attendance"""
+		for date in dates:
+			attendance = frappe.get_doc(
+				{
+					"doctype": "Attendance",
+					"employee": employee,
+					"attendance_date": date,
+					"status": "Absent",
+					"company": company,
+					"shift": self.name,
+				}
+			).insert()
+			attendance.submit()
+			attendance.add_comment(
+				text=frappe._("Employee was marked Absent due to missing Employee Checkins.")
+			)
+
+	def get_start_and_end_dates(self, employee, employee_details=None):
 		"""Returns start and end dates for checking attendance and marking absent
 		return: start date = max of `process_attendance_after` and DOJ
 		return: end date = min of shift before `last_sync_of_checkin` and Relieving Date
 		"""
-		date_of_joining, relieving_date, employee_creation = frappe.db.get_value(
-			"Employee", employee, ["date_of_joining", "relieving_date", "creation"]
-		)
+		if employee_details:
+			date_of_joining, relieving_date, employee_creation = (
+				employee_details.date_of_joining,
+				employee_details.relieving_date,
+				employee_details.creation,
+			)
+		else:
+			date_of_joining, relieving_date, employee_creation = frappe.db.get_value(
+				"Employee", employee, ["date_of_joining", "relieving_date", "creation"]
+			)
 
 		if not date_of_joining:
 			date_of_joining = employee_creation.date()
@@ -195,8 +365,46 @@ class ShiftType(Document):
 		return assigned_employees
 
 
+def get_marked_attendance(employees, from_date, to_date):
+	"""Returns a dict of (employee, attendance_date) -> set of shifts, for dates that have a draft
+	or submitted attendance. Attendance without a shift is recorded as None."""
+	attendance = frappe.get_all(
+		"Attendance",
+		filters={
+			"employee": ("in", employees),
+			"attendance_date": ("between", [getdate(from_date), getdate(to_date)]),
+			"docstatus": ("<", 2),
+		},
+		fields=["employee", "attendance_date", "shift"],
+		as_list=True,
+	)
+
+	marked_attendance = {}
+	for employee, attendance_date, shift in attendance:
+		marked_attendance.setdefault((employee, getdate(attendance_date)), set()).add(shift or None)
+
+	return marked_attendance
+
+
 def process_auto_attendance_for_all_shifts():
 	shift_list = frappe.get_all("Shift Type", "name", {"enable_auto_attendance": "1"}, as_list=True)
 	for shift in shift_list:
 		doc = frappe.get_doc("Shift Type", shift[0])
 		doc.process_auto_attendance()
+
+
+def get_shift_from_assignments(shift_assignments, default_shift, for_timestamp):
+	"""Returns the shift details for the timestamp from the employee's prefetched shift assignments,
+	falling back to the default shift like `get_employee_shift`. Holidays are not checked."""
+	date = for_timestamp.date()
+	shifts = [
+		entry
+		for entry in shift_assignments
+		if getdate(entry.start_date) <= date and (not entry.end_date or date <= getdate(entry.end_date))
+	]
+
+	shift_details = get_shift_for_time(shifts, for_timestamp) if shifts else {}
+	if not shift_details:
+		shift_details = get_shift_details(default_shift, for_timestamp)
+
+	return shift_details
@@ -203,6 +203,28 @@ class TestShiftType(FrappeTestCase):
 		)
 		self.assertEqual(attendance, "Absent")
 
+	def test_mark_absent_as_per_shift_assignment_dates(self):
+		employee = make_employee("test_employee_checkin@example.com", company="_Test Company")
+		date = getdate()
+		shift_type = setup_shift_type(
+			shift_type="Test Absent with no Attendance", process_attendance_after=add_days(date, -7)
+		)
+		other_shift = setup_shift_type(
+			shift_type="Test Absent Other Shift", start_time="15:00:00", end_time="19:00:00"
+		)
+
+		make_shift_assignment(shift_type.name, employee, add_days(date, -6), add_days(date, -4))
+		make_shift_assignment(other_shift.name, employee, add_days(date, -3))
+
+		shift_type.process_auto_attendance()
+
+		absent_dates = frappe.get_all(
+			"Attendance",
+			filters={"employee": employee, "shift": shift_type.name, "status": "Absent"},
+			pluck="attendance_date",
+		)
+		self.assertEqual(sorted(absent_dates), [add_days(date, days) for days in (-6, -5, -4)])
+
 	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
 	def test_skip_marking_absent_on_a_holiday(self):
 		employee = make_employee("test_employee_checkin@example.com", company="_Test Company")
@@ -326,6 +348,36 @@ class TestShiftType(FrappeTestCase):
 		self.assertEqual(log_in.skip_auto_attendance, 1)
 		self.assertEqual(log_out.skip_auto_attendance, 1)
 
+	def test_mark_attendance_for_multiple_employees(self):
+		from erpnext.hr.doctype.employee_checkin.test_employee_checkin import make_checkin
+
+		shift_type = setup_shift_type()
+		date = getdate()
+		logs = {}
+
+		for i in range(3):
+			employee = make_employee(f"test_bulk_checkin_{i}@example.com", company="_Test Company")
+			make_shift_assignment(shift_type.name, employee, date)
+			logs[employee] = [
+				make_checkin(employee, datetime.combine(date, get_time("08:00:00"))),
+				make_checkin(employee, datetime.combine(date, get_time("12:00:00"))),
+			]
+
+		shift_type.process_auto_attendance()
+
+		for employee, employee_logs in logs.items():
+			attendance = frappe.db.get_value(
+				"Attendance",
+				{"employee": employee, "attendance_date": date, "shift": shift_type.name},
+				["name", "status"],
+				as_dict=True,
+			)
+			self.assertEqual(attendance.status, "Present")
+
+			for log in employee_logs:
+				log.reload()
+				self.assertEqual(log.attendance, attendance.name)
+
 
 def setup_shift_type(**args):
 	args = frappe._dict(args)
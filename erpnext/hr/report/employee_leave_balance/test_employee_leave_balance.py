@@ -31,6 +31,7 @@ class TestEmployeeLeaveBalance(unittest.TestCase):
 			"Leave Allocation",
 			"Salary Slip",
 			"Leave Ledger Entry",
+			"Leave Allocation Balance",
 			"Leave Type",
 		]:
 			frappe.db.delete(dt)
@@ -5,7 +5,7 @@
 import frappe
 from frappe import _
 
-from erpnext.hr.doctype.leave_application.leave_application import get_leave_details
+from erpnext.hr.doctype.leave_application.leave_application import get_leave_details_for_employees
 from erpnext.hr.report.employee_leave_balance.employee_leave_balance import (
 	get_department_leave_approver_map,
 )
@@ -58,6 +58,9 @@ def get_data(filters, leave_types):
 	)
 
 	department_approver_map = get_department_leave_approver_map(filters.get("department"))
+	leave_details = get_leave_details_for_employees(
+		[employee.name for employee in active_employees], filters.date
+	)
 
 	data = []
 	for employee in active_employees:
@@ -71,12 +74,12 @@ def get_data(filters, leave_types):
 			or ("HR Manager" in frappe.get_roles(user))
 		):
 			row = [employee.name, employee.employee_name, employee.department]
-			available_leave = get_leave_details(employee.name, filters.date)
+			available_leave = leave_details.get(employee.name, {})
 			for leave_type in leave_types:
 				remaining = 0
-				if leave_type in available_leave["leave_allocation"]:
+				if leave_type in available_leave:
 					# opening balance
-					remaining = available_leave["leave_allocation"][leave_type]["remaining_leaves"]
+					remaining = available_leave[leave_type]["remaining_leaves"]
 
 				row += [remaining]
 
@@ -11,6 +11,7 @@ import frappe
 from frappe import _
 from frappe.core.doctype.version.version import get_diff
 from frappe.model.mapper import get_mapped_doc
+from frappe.model.naming import set_new_name
 from frappe.utils import cint, cstr, flt, today
 from frappe.website.website_generator import WebsiteGenerator
 
@@ -692,17 +693,17 @@ class BOM(WebsiteGenerator):
 		self.scrap_material_cost = total_sm_cost
 		self.base_scrap_material_cost = base_total_sm_cost
 
-	def update_exploded_items(self, save=True):
+	def update_exploded_items(self, save=True, exploded_items_cache=None):
 		"""Update Flat BOM, following will be correct data"""
-		self.get_exploded_items()
+		self.get_exploded_items(exploded_items_cache)
 		self.add_exploded_items(save=save)
 
-	def get_exploded_items(self):
+	def get_exploded_items(self, exploded_items_cache=None):
 		"""Get all raw materials including items from child bom"""
 		self.cur_exploded_items = {}
 		for d in self.get("items"):
 			if d.bom_no:
-				self.get_child_exploded_items(d.bom_no, d.stock_qty)
+				self.get_child_exploded_items(d.bom_no, d.stock_qty, exploded_items_cache)
 			elif d.item_code:
 				self.add_to_cur_exploded_items(
 					frappe._dict(
@@ -731,32 +732,14 @@ class BOM(WebsiteGenerator):
 		else:
 			self.cur_exploded_items[args.item_code] = args
 
-	def get_child_exploded_items(self, bom_no, stock_qty):
+	def get_child_exploded_items(self, bom_no, stock_qty, exploded_items_cache=None):
 		"""Add all items from Flat BOM of child BOM"""
-		# Did not use qty_consumed_per_unit in the query, as it leads to rounding loss
-		child_fb_items = frappe.db.sql(
-			"""
-			SELECT
-				bom_item.item_code,
-				bom_item.item_name,
-				bom_item.description,
-				bom_item.source_warehouse,
-				bom_item.operation,
-				bom_item.stock_uom,
-				bom_item.stock_qty,
-				bom_item.rate,
-				bom_item.include_item_in_manufacturing,
-				bom_item.sourced_by_supplier,
-				bom_item.stock_qty / ifnull(bom.quantity, 1) AS qty_consumed_per_unit
-			FROM `tabBOM Explosion Item` bom_item, `tabBOM` bom
-			WHERE
-				bom_item.parent = bom.name
-				AND bom.name = %s
-				AND bom.docstatus = 1
-		""",
-			bom_no,
-			as_dict=1,
-		)
+		if exploded_items_cache is not None and bom_no in exploded_items_cache:
+			child_fb_items = exploded_items_cache[bom_no]
+		else:
+			child_fb_items = get_exploded_items_of_bom(bom_no)
+			if exploded_items_cache is not None:
+				exploded_items_cache[bom_no] = child_fb_items
 
 		for d in child_fb_items:
 			self.add_to_cur_exploded_items(
@@ -780,9 +763,6 @@ class BOM(WebsiteGenerator):
 		"Add items to Flat BOM table"
 		self.set("exploded_items", [])
 
-		if save:
-			frappe.db.sql("""delete from `tabBOM Explosion Item` where parent=%s""", self.name)
-
 		for d in sorted(self.cur_exploded_items, key=itemgetter(0)):
 			ch = self.append("exploded_items", {})
 			for i in self.cur_exploded_items[d].keys():
@@ -791,8 +771,29 @@ class BOM(WebsiteGenerator):
 			ch.qty_consumed_per_unit = flt(ch.stock_qty) / flt(self.quantity)
 			ch.docstatus = self.docstatus
 
-			if save:
-				ch.db_insert()
+		if save:
+			frappe.db.delete("BOM Explosion Item", {"parent": self.name})
+			self.db_insert_exploded_items()
+
+	def db_insert_exploded_items(self):
+		"""Inserts all rows of the Flat BOM with one query"""
+		if not self.exploded_items:
+			return
+
+		now = frappe.utils.now()
+		rows = []
+		for ch in self.exploded_items:
+			set_new_name(ch)
+			ch.creation = ch.modified = now
+			# as set for child rows on save
+			ch.owner = ch.owner or self.owner or frappe.session.user
+			ch.modified_by = frappe.session.user
+			rows.append(ch.get_valid_dict(convert_dates_to_str=True))
+
+		fields = list(rows[0])
+		frappe.db.bulk_insert(
+			"BOM Explosion Item", fields=fields, values=[[d[f] for f in fields] for d in rows]
+		)
 
 	def validate_bom_links(self):
 		if not self.is_active:
@@ -867,6 +868,34 @@ class BOM(WebsiteGenerator):
 				frappe.throw(msg, title=_("Note"))
 
 
+def get_exploded_items_of_bom(bom_no):
+	"""Returns the Flat BOM of a submitted BOM"""
+	# Did not use qty_consumed_per_unit in the query, as it leads to rounding loss
+	return frappe.db.sql(
+		"""
+		SELECT
+			bom_item.item_code,
+			bom_item.item_name,
+			bom_item.description,
+			bom_item.source_warehouse,
+			bom_item.operation,
+			bom_item.stock_uom,
+			bom_item.stock_qty,
+			bom_item.rate,
+			bom_item.include_item_in_manufacturing,
+			bom_item.sourced_by_supplier,
+			bom_item.stock_qty / ifnull(bom.quantity, 1) AS qty_consumed_per_unit
+		FROM `tabBOM Explosion Item` bom_item, `tabBOM` bom
+		WHERE
+			bom_item.parent = bom.name
+			AND bom.name = %s
+			AND bom.docstatus = 1
+	""",
+		bom_no,
+		as_dict=1,
+	)
+
+
 def get_bom_item_rate(args, bom_doc):
 	if bom_doc.rm_cost_as_per == "Valuation Rate":
 		rate = get_valuation_rate(args) * (args.get("conversion_factor") or 1)
@@ -1,5 +1,6 @@
 # Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
+from collections import defaultdict, deque
 from typing import Dict, List, Literal, Optional
 
 import frappe
@@ -74,19 +75,26 @@ def replace_bom(boms: Dict) -> None:
 	frappe.cache().delete_key("bom_children")
 	parent_boms = get_parent_boms(new_bom)
 
+	# Flat BOMs of the child BOMs, kept as parent BOMs are updated from the bottom up
+	exploded_items_cache = {}
 	for bom in parent_boms:
 		bom_obj = frappe.get_doc("BOM", bom)
 		# this is only used for versioning and we do not want
 		# to make separate db calls by using load_doc_before_save
 		# which proves to be expensive while doing bulk replace
 		bom_obj._doc_before_save = bom_obj
-		bom_obj.update_exploded_items()
+		bom_obj.update_exploded_items(exploded_items_cache=exploded_items_cache)
 		bom_obj.calculate_cost()
 		bom_obj.update_parent_cost()
 		bom_obj.db_update()
 		if bom_obj.meta.get("track_changes") and not bom_obj.flags.ignore_version:
 			bom_obj.save_version()
 
+		if bom_obj.docstatus == 1:
+			exploded_items_cache[bom] = [d.as_dict() for d in bom_obj.exploded_items]
+		else:
+			exploded_items_cache.pop(bom, None)
+
 
 def update_new_bom_in_bom_items(unit_cost: float, current_bom: str, new_bom: str) -> None:
 	bom_item = frappe.qb.DocType("BOM Item")
@@ -101,25 +109,55 @@ def update_new_bom_in_bom_items(unit_cost: float, current_bom: str, new_bom: str
 	).run()
 
 
-def get_parent_boms(new_bom: str, bom_list: Optional[List] = None) -> List:
-	bom_list = bom_list or []
+def get_parent_boms(new_bom: str) -> List[str]:
+	"""Returns the BOMs using `new_bom` directly or through other BOMs, each one after all the
+	BOMs it uses. Reads the links between BOMs in one query."""
 	bom_item = frappe.qb.DocType("BOM Item")
-
-	parents = (
+	links = (
 		frappe.qb.from_(bom_item)
-		.select(bom_item.parent)
-		.where((bom_item.bom_no == new_bom) & (bom_item.docstatus < 2) & (bom_item.parenttype == "BOM"))
-		.run(as_dict=True)
-	)
-
-	for d in parents:
-		if new_bom == d.parent:
-			frappe.throw(_("BOM recursion: {0} cannot be child of {1}").format(new_bom, d.parent))
-
-		bom_list.append(d.parent)
-		get_parent_boms(d.parent, bom_list)
+		.select(bom_item.parent, bom_item.bom_no)
+		.distinct()
+		.where(
+			(bom_item.bom_no.isnotnull())
+			& (bom_item.bom_no != "")
+			& (bom_item.docstatus < 2)
+			& (bom_item.parenttype == "BOM")
+		)
+	).run()
 
-	return list(set(bom_list))
+	parents = defaultdict(set)
+	for parent, bom_no in links:
+		parents[bom_no].add(parent)
+
+	# count the links of each parent BOM to the BOMs using `new_bom`, and to `new_bom` itself
+	pending = defaultdict(int)
+	to_visit = deque([new_bom])
+	visited = {new_bom}
+	while to_visit:
+		bom = to_visit.popleft()
+		for parent in parents[bom]:
+			if parent == new_bom:
+				frappe.throw(_("BOM recursion: {0} cannot be child of {1}").format(new_bom, bom))
+
+			pending[parent] += 1
+			if parent not in visited:
+				visited.add(parent)
+				to_visit.append(parent)
+
+	bom_list = []
+	ready = deque([new_bom])
+	while ready:
+		for parent in sorted(parents[ready.popleft()]):
+			pending[parent] -= 1
+			if not pending[parent]:
+				bom_list.append(parent)
+				ready.append(parent)
+
+	if len(bom_list) != len(pending):
+		recursive_boms = [bom for bom, count in pending.items() if count]
+		frappe.throw(_("BOM recursion found in {0}").format(", ".join(recursive_boms[:10])))
+
+	return bom_list
 
 
 def get_new_bom_unit_cost(new_bom: str) -> float:
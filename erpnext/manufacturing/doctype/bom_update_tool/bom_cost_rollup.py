@@ -0,0 +1,429 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+from collections import defaultdict
+from typing import Dict, List, Set
+
+import frappe
+from frappe import _
+from frappe.model.meta import get_field_precision
+from frappe.query_builder.functions import Max, Sum
+from frappe.utils import create_batch, flt
+
+from erpnext.manufacturing.doctype.bom.bom import BOMRecursionError, get_bom_item_rate
+
+BATCH_SIZE = 500
+
+BOM_COST_FIELDS = [
+	"operating_cost",
+	"base_operating_cost",
+	"raw_material_cost",
+	"base_raw_material_cost",
+	"total_cost",
+	"base_total_cost",
+]
+ITEM_COST_FIELDS = ["rate", "base_rate", "amount", "base_amount"]
+ITEM_FIELDS = [
+	"item_code",
+	"bom_no",
+	"qty",
+	"uom",
+	"stock_uom",
+	"conversion_factor",
+	"sourced_by_supplier",
+] + ITEM_COST_FIELDS
+OPERATION_COST_FIELDS = [
+	"hour_rate",
+	"base_hour_rate",
+	"operating_cost",
+	"base_operating_cost",
+	"cost_per_unit",
+	"base_cost_per_unit",
+]
+OPERATION_FIELDS = [
+	"workstation",
+	"time_in_mins",
+	"batch_size",
+	"set_cost_based_on_bom_qty",
+] + OPERATION_COST_FIELDS
+EXPLODED_ITEM_COST_FIELDS = ["rate", "amount"]
+EXPLODED_ITEM_FIELDS = ["item_code", "stock_qty"] + EXPLODED_ITEM_COST_FIELDS
+
+
+class BOMCostRollup:
+	"""Updates the costs of all active submitted BOMs from bottom to top, like calling
+	`BOM.update_cost` on each of them in order, without loading any BOM.
+
+	The BOM tree is read in a few queries and split into levels, each BOM being above all of
+	its sub-assembly BOMs. Raw material rates are fetched in batches for each costing method,
+	costs are rolled up in memory level by level and only changed rows are written, in bulk."""
+
+	def __init__(self):
+		self.boms = get_active_boms()
+		self.items = get_child_rows("BOM Item", ITEM_FIELDS, self.boms)
+		self.operations = get_child_rows("BOM Operation", OPERATION_FIELDS, self.boms)
+		self.exploded_items = get_child_rows("BOM Explosion Item", EXPLODED_ITEM_FIELDS)
+
+		# costs of sub-assembly BOMs that are not rolled up, as in `BOM.get_bom_unitcost`
+		self.unit_costs = get_bom_unit_costs()
+		self.exploded_rates = {
+			bom: {d.item_code: flt(d.rate) for d in rows} for bom, rows in self.exploded_items.items()
+		}
+		self.workstation_rates = dict(
+			frappe.get_all("Workstation", fields=["name", "hour_rate"], as_list=True)
+		)
+		self.precisions = {}
+
+	def run(self):
+		self.set_raw_material_rates()
+
+		for level in get_bom_levels(self.boms, self.items):
+			updates = defaultdict(dict)
+			for bom in level:
+				self.update_bom_cost(self.boms[bom], updates)
+
+			for doctype, doc_updates in updates.items():
+				bulk_update(doctype, doc_updates)
+
+	def update_bom_cost(self, bom, updates):
+		raw_material_cost = base_raw_material_cost = 0
+		for row in self.items.get(bom.name, []):
+			self.update_item_rate(bom, row)
+			raw_material_cost += row.amount
+			base_raw_material_cost += row.base_amount
+			set_changes(updates["BOM Item"], row, ITEM_COST_FIELDS)
+
+		operating_cost = base_operating_cost = 0
+		for row in self.operations.get(bom.name, []):
+			if row.workstation:
+				self.update_operation_rate(bom, row)
+				set_changes(updates["BOM Operation"], row, OPERATION_COST_FIELDS)
+
+			if row.set_cost_based_on_bom_qty:
+				operating_cost += flt(row.cost_per_unit) * flt(bom.quantity)
+				base_operating_cost += flt(row.base_cost_per_unit) * flt(bom.quantity)
+			else:
+				operating_cost += flt(row.operating_cost)
+				base_operating_cost += flt(row.base_operating_cost)
+
+		bom.update(
+			{
+				"operating_cost": operating_cost,
+				"base_operating_cost": base_operating_cost,
+				"raw_material_cost": raw_material_cost,
+				"base_raw_material_cost": base_raw_material_cost,
+				"total_cost": operating_cost + raw_material_cost - flt(bom.scrap_material_cost),
+				"base_total_cost": (
+					base_operating_cost + base_raw_material_cost - flt(bom.base_scrap_material_cost)
+				),
+			}
+		)
+		set_changes(updates["BOM"], bom, BOM_COST_FIELDS)
+		self.unit_costs[bom.name] = bom.base_total_cost / bom.quantity if bom.quantity else 0
+
+		self.update_exploded_item_rates(bom, updates)
+
+	def update_item_rate(self, bom, row):
+		"""Sets the rate of a raw material as in `BOM.update_cost` and `BOM.calculate_rm_cost`"""
+		rate = 0
+		if not (self.is_customer_provided.get(row.item_code) or row.sourced_by_supplier):
+			if row.bom_no and bom.set_rate_of_sub_assembly_item_based_on_bom:
+				rate = flt(self.unit_costs.get(row.bom_no)) * (row.conversion_factor or 1)
+			else:
+				rate = self.get_raw_material_rate(bom, row)
+
+		rate = flt(rate) * flt(bom.plc_conversion_rate or 1) / (bom.conversion_rate or 1)
+		if rate:
+			row.rate = rate
+
+		row.base_rate = flt(row.rate) * flt(bom.conversion_rate)
+		row.amount = flt(row.rate, self.get_precision("rate", bom.currency)) * flt(
+			row.qty, self.get_precision("qty")
+		)
+		row.base_amount = row.amount * flt(bom.conversion_rate)
+
+	def update_operation_rate(self, bom, row):
+		"""Sets the operating cost of an operation as in `BOM.update_rate_and_time`"""
+		hour_rate = flt(self.workstation_rates.get(row.workstation))
+		if hour_rate:
+			row.hour_rate = hour_rate / flt(bom.conversion_rate) if bom.conversion_rate else hour_rate
+
+		if row.hour_rate and row.time_in_mins:
+			row.base_hour_rate = flt(row.hour_rate) * flt(bom.conversion_rate)
+			row.operating_cost = flt(row.hour_rate) * flt(row.time_in_mins) / 60.0
+			row.base_operating_cost = flt(row.operating_cost) * flt(bom.conversion_rate)
+			row.cost_per_unit = row.operating_cost / (row.batch_size or 1.0)
+			row.base_cost_per_unit = row.base_operating_cost / (row.batch_size or 1.0)
+
+	def update_exploded_item_rates(self, bom, updates):
+		"""Sets the rates of the exploded items from the raw materials and the exploded items of
+		sub-assembly BOMs, the first one found for an item being used as in `BOM.get_exploded_items`"""
+		rates = {}
+		for row in self.items.get(bom.name, []):
+			if row.bom_no:
+				for item_code, rate in self.exploded_rates.get(row.bom_no, {}).items():
+					rates.setdefault(item_code, rate)
+			elif row.item_code:
+				rates.setdefault(row.item_code, flt(row.base_rate) / (flt(row.conversion_factor) or 1.0))
+
+		for row in self.exploded_items.get(bom.name, []):
+			if row.item_code in rates:
+				row.rate = rates[row.item_code]
+				row.amount = flt(row.stock_qty) * flt(row.rate)
+				set_changes(updates["BOM Explosion Item"], row, EXPLODED_ITEM_COST_FIELDS)
+
+		self.exploded_rates[bom.name] = rates
+
+	def get_raw_material_rate(self, bom, row):
+		conversion_factor = row.conversion_factor or 1
+		if bom.rm_cost_as_per == "Valuation Rate":
+			return self.valuation_rates.get((row.item_code, bom.company), 0) * conversion_factor
+		elif bom.rm_cost_as_per == "Last Purchase Rate":
+			return self.last_purchase_rates.get(row.item_code, 0) * conversion_factor
+		elif bom.rm_cost_as_per == "Price List":
+			key = (
+				bom.buying_price_list,
+				bom.company,
+				bom.currency,
+				row.item_code,
+				row.qty,
+				row.uom,
+				row.stock_uom,
+				conversion_factor,
+			)
+			if key not in self.price_list_rates:
+				self.price_list_rates[key] = get_bom_item_rate(row, bom)
+
+			return self.price_list_rates[key]
+
+		return 0
+
+	def set_raw_material_rates(self):
+		"""Fetches the item details and rates needed by all BOMs, in batches"""
+		item_codes = set()
+		valuation_items = defaultdict(set)
+		for bom, rows in self.items.items():
+			for row in rows:
+				item_codes.add(row.item_code)
+				if self.boms[bom].rm_cost_as_per == "Valuation Rate":
+					valuation_items[self.boms[bom].company].add(row.item_code)
+
+		self.is_customer_provided = {}
+		self.last_purchase_rates = {}
+		item_valuation_rates = {}
+		for batch in create_batch(list(item_codes), BATCH_SIZE):
+			for d in frappe.get_all(
+				"Item",
+				filters={"name": ("in", batch)},
+				fields=["name", "is_customer_provided_item", "last_purchase_rate", "valuation_rate"],
+			):
+				self.is_customer_provided[d.name] = d.is_customer_provided_item
+				self.last_purchase_rates[d.name] = flt(d.last_purchase_rate)
+				item_valuation_rates[d.name] = flt(d.valuation_rate)
+
+		self.valuation_rates = get_valuation_rates(valuation_items, item_valuation_rates)
+		self.price_list_rates = {}
+
+	def get_precision(self, fieldname, currency=None):
+		key = (fieldname, currency)
+		if key not in self.precisions:
+			df = frappe.get_meta("BOM Item").get_field(fieldname)
+			self.precisions[key] = get_field_precision(df, currency=currency)
+
+		return self.precisions[key]
+
+
+def get_active_boms() -> Dict[str, Dict]:
+	boms = frappe.get_all(
+		"BOM",
+		filters={"docstatus": 1, "is_active": 1},
+		fields=[
+			"name",
+			"company",
+			"currency",
+			"quantity",
+			"conversion_rate",
+			"plc_conversion_rate",
+			"rm_cost_as_per",
+			"buying_price_list",
+			"set_rate_of_sub_assembly_item_based_on_bom",
+			"scrap_material_cost",
+			"base_scrap_material_cost",
+		]
+		+ BOM_COST_FIELDS,
+	)
+
+	for bom in boms:
+		bom.rm_cost_as_per = bom.rm_cost_as_per or "Valuation Rate"
+		bom.original = {field: bom.get(field) for field in BOM_COST_FIELDS}
+
+	return {bom.name: bom for bom in boms}
+
+
+def get_child_rows(doctype: str, fields: List[str], boms: Dict = None) -> Dict[str, List[Dict]]:
+	"""Returns the rows of the submitted BOMs in `boms`, of all submitted BOMs if not passed,
+	as {bom: rows in order}"""
+	table = frappe.qb.DocType(doctype)
+	rows = (
+		frappe.qb.from_(table)
+		.select(table.name, table.parent, *[table[field] for field in fields])
+		.where((table.parenttype == "BOM") & (table.docstatus == 1))
+		.orderby(table.parent)
+		.orderby(table.idx)
+	).run(as_dict=True)
+
+	rows_by_bom = defaultdict(list)
+	for row in rows:
+		if boms is None or row.parent in boms:
+			row.original = {field: row.get(field) for field in fields}
+			rows_by_bom[row.parent].append(row)
+
+	return rows_by_bom
+
+
+def get_bom_unit_costs() -> Dict[str, float]:
+	bom = frappe.qb.DocType("BOM")
+	return dict(
+		(
+			frappe.qb.from_(bom)
+			.select(bom.name, bom.base_total_cost / bom.quantity)
+			.where(bom.is_active == 1)
+		).run()
+	)
+
+
+def get_bom_levels(boms: Dict, items: Dict[str, List[Dict]]) -> List[List[str]]:
+	"""Splits `boms` into levels, from the BOMs without sub-assembly BOMs upwards. BOMs of a level
+	depend only on BOMs of the levels below it."""
+	children: Dict[str, Set[str]] = {}
+	parents = defaultdict(list)
+	for bom in boms:
+		children[bom] = {row.bom_no for row in items.get(bom, []) if row.bom_no in boms}
+		for child in children[bom]:
+			parents[child].append(bom)
+
+	pending = {bom: len(bom_children) for bom, bom_children in children.items()}
+	level = [bom for bom, count in pending.items() if not count]
+	levels = []
+	while level:
+		levels.append(level)
+		next_level = []
+		for bom in level:
+			for parent in parents[bom]:
+				pending[parent] -= 1
+				if not pending[parent]:
+					next_level.append(parent)
+
+		level = next_level
+
+	if sum(len(level) for level in levels) != len(boms):
+		recursive_boms = [bom for bom, count in pending.items() if count]
+		frappe.throw(
+			_("BOM recursion found in {0}").format(", ".join(recursive_boms[:10])),
+			exc=BOMRecursionError,
+		)
+
+	return levels
+
+
+def get_valuation_rates(
+	items_by_company: Dict[str, Set[str]], item_valuation_rates: Dict[str, float]
+) -> Dict:
+	"""Returns the valuation rates of items in companies, as {(item_code, company): rate},
+	computed as in `erpnext.manufacturing.doctype.bom.bom.get_valuation_rate`"""
+	bin = frappe.qb.DocType("Bin")
+	warehouse = frappe.qb.DocType("Warehouse")
+
+	valuation_rates = {}
+	for company, item_codes in items_by_company.items():
+		for batch in create_batch(list(item_codes), BATCH_SIZE):
+			for item_code, actual_qty, stock_value in (
+				frappe.qb.from_(bin)
+				.join(warehouse)
+				.on(bin.warehouse == warehouse.name)
+				.select(bin.item_code, Sum(bin.actual_qty), Sum(bin.stock_value))
+				.where((bin.item_code.isin(batch)) & (warehouse.company == company))
+				.groupby(bin.item_code)
+			).run():
+				if flt(actual_qty):
+					valuation_rates[(item_code, company)] = flt(stock_value) / flt(actual_qty)
+
+	missing = {
+		item_code
+		for company, item_codes in items_by_company.items()
+		for item_code in item_codes
+		if flt(valuation_rates.get((item_code, company))) <= 0
+	}
+	last_valuation_rates = get_last_valuation_rates(missing)
+
+	for company, item_codes in items_by_company.items():
+		for item_code in item_codes:
+			key = (item_code, company)
+			if flt(valuation_rates.get(key)) <= 0:
+				valuation_rates[key] = last_valuation_rates.get(item_code) or flt(
+					item_valuation_rates.get(item_code)
+				)
+
+	return valuation_rates
+
+
+def get_last_valuation_rates(item_codes: Set[str]) -> Dict[str, float]:
+	"""Returns the valuation rate of the latest stock ledger entry of each item"""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	condition = (sle.valuation_rate > 0) & (sle.is_cancelled == 0)
+
+	last_valuation_rates = {}
+	for batch in create_batch(list(item_codes), BATCH_SIZE):
+		last_dates = dict(
+			(
+				frappe.qb.from_(sle)
+				.select(sle.item_code, Max(sle.posting_date))
+				.where(condition & sle.item_code.isin(batch))
+				.groupby(sle.item_code)
+			).run()
+		)
+		if not last_dates:
+			continue
+
+		entries = (
+			frappe.qb.from_(sle)
+			.select(sle.item_code, sle.posting_date, sle.valuation_rate)
+			.where(
+				condition
+				& sle.item_code.isin(list(last_dates))
+				& sle.posting_date.isin(list(set(last_dates.values())))
+			)
+			.orderby(sle.posting_time, order=frappe.qb.desc)
+			.orderby(sle.creation, order=frappe.qb.desc)
+		).run(as_dict=True)
+
+		for d in entries:
+			if d.posting_date == last_dates[d.item_code]:
+				last_valuation_rates.setdefault(d.item_code, flt(d.valuation_rate))
+
+	return last_valuation_rates
+
+
+def set_changes(doc_updates: Dict, row: Dict, fields: List[str]) -> None:
+	changes = {field: row.get(field) for field in fields if row.get(field) != row.original.get(field)}
+	if changes:
+		doc_updates[row.name] = changes
+
+
+def bulk_update(doctype: str, doc_updates: Dict[str, Dict]) -> None:
+	"""Updates many rows of `doctype` ({name: {fieldname: value}}) with one query per batch"""
+	table = frappe.qb.DocType(doctype)
+	for batch in create_batch(list(doc_updates.items()), BATCH_SIZE):
+		fields = {field for _name, changes in batch for field in changes}
+
+		query = frappe.qb.update(table)
+		for field in sorted(fields):
+			value = frappe.qb.terms.Case()
+			for name, changes in batch:
+				if field in changes:
+					value = value.when(table.name == name, changes[field])
+
+			query = query.set(table[field], value.else_(table[field]))
+
+		query.where(table.name.isin([name for name, _changes in batch])).run()
+
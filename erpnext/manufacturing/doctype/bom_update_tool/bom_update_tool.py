@@ -10,7 +10,7 @@ if TYPE_CHECKING:
 import frappe
 from frappe.model.document import Document
 
-from erpnext.manufacturing.doctype.bom.bom import get_boms_in_bottom_up_order
+from erpnext.manufacturing.doctype.bom_update_tool.bom_cost_rollup import BOMCostRollup
 
 
 class BOMUpdateTool(Document):
@@ -45,9 +45,7 @@ def auto_update_latest_price_in_all_boms() -> None:
 
 def update_cost() -> None:
 	"""Updates Cost for all BOMs from bottom to top."""
-	bom_list = get_boms_in_bottom_up_order()
-	for bom in bom_list:
-		frappe.get_doc("BOM", bom).update_cost(update_parent=False, from_child_bom=True)
+	BOMCostRollup().run()
 
 
 def create_bom_update_log(
@@ -4,7 +4,10 @@
 import frappe
 from frappe.tests.utils import FrappeTestCase
 
-from erpnext.manufacturing.doctype.bom_update_log.bom_update_log import replace_bom
+from erpnext.manufacturing.doctype.bom_update_log.bom_update_log import (
+	get_parent_boms,
+	replace_bom,
+)
 from erpnext.manufacturing.doctype.bom_update_tool.bom_update_tool import update_cost
 from erpnext.manufacturing.doctype.production_plan.test_production_plan import make_bom
 from erpnext.stock.doctype.item.test_item import create_item
@@ -33,6 +36,41 @@ class TestBOMUpdateTool(FrappeTestCase):
 		boms.new_bom = current_bom
 		replace_bom(boms)
 
+	def test_replace_bom_in_multi_level_boms(self):
+		for item in [
+			"BOM Replace RM Item",
+			"BOM Replace Sub Assembly",
+			"BOM Replace Assembly",
+			"BOM Replace FG",
+		]:
+			create_item(item, valuation_rate=100)
+
+		sub_assembly_bom = make_bom(
+			item="BOM Replace Sub Assembly", raw_materials=["BOM Replace RM Item"], currency="INR"
+		)
+		assembly_bom = make_bom(
+			item="BOM Replace Assembly", raw_materials=["BOM Replace Sub Assembly"], currency="INR"
+		)
+		fg_bom = make_bom(
+			item="BOM Replace FG",
+			raw_materials=["BOM Replace Assembly", "BOM Replace Sub Assembly"],
+			currency="INR",
+		)
+
+		# BOMs come after the BOMs they use
+		self.assertEqual(get_parent_boms(sub_assembly_bom.name), [assembly_bom.name, fg_bom.name])
+
+		new_sub_assembly_bom = make_bom(
+			item="BOM Replace Sub Assembly", raw_materials=["BOM Replace RM Item"], rm_qty=2, currency="INR"
+		)
+		replace_bom(frappe._dict(current_bom=sub_assembly_bom.name, new_bom=new_sub_assembly_bom.name))
+
+		fg_bom.load_from_db()
+		self.assertEqual(fg_bom.items[1].bom_no, new_sub_assembly_bom.name)
+		self.assertEqual(len(fg_bom.exploded_items), 1)
+		self.assertEqual(fg_bom.exploded_items[0].item_code, "BOM Replace RM Item")
+		self.assertEqual(fg_bom.exploded_items[0].stock_qty, 4)
+
 	def test_bom_cost(self):
 		for item in ["BOM Cost Test Item 1", "BOM Cost Test Item 2", "BOM Cost Test Item 3"]:
 			item_doc = create_item(item, valuation_rate=100)
@@ -62,3 +100,41 @@ class TestBOMUpdateTool(FrappeTestCase):
 
 		doc.load_from_db()
 		self.assertEqual(doc.total_cost, 200)
+
+	def test_bom_cost_rolled_up_to_parent_boms(self):
+		from erpnext.manufacturing.doctype.bom_update_tool.bom_cost_rollup import (
+			BOMCostRollup,
+			get_bom_levels,
+		)
+
+		items = ["BOM Rollup FG Item", "BOM Rollup Sub Assembly Item", "BOM Rollup RM Item"]
+		for item in items:
+			create_item(item, valuation_rate=100)
+		frappe.db.set_value("Item", "BOM Rollup RM Item", "valuation_rate", 100)
+
+		sub_assembly_bom = make_bom(
+			item="BOM Rollup Sub Assembly Item", raw_materials=["BOM Rollup RM Item"], currency="INR"
+		)
+		fg_bom = make_bom(
+			item="BOM Rollup FG Item",
+			raw_materials=["BOM Rollup Sub Assembly Item", "BOM Rollup RM Item"],
+			currency="INR",
+		)
+		self.assertEqual(fg_bom.items[0].bom_no, sub_assembly_bom.name)
+
+		rollup = BOMCostRollup()
+		levels = get_bom_levels(rollup.boms, rollup.items)
+		level = {bom: i for i, boms in enumerate(levels) for bom in boms}
+		self.assertLess(level[sub_assembly_bom.name], level[fg_bom.name])
+
+		frappe.db.set_value("Item", "BOM Rollup RM Item", "valuation_rate", 150)
+		update_cost()
+
+		sub_assembly_bom.load_from_db()
+		fg_bom.load_from_db()
+		self.assertEqual(sub_assembly_bom.total_cost, 150)
+		self.assertEqual(fg_bom.items[0].rate, 150)
+		self.assertEqual(fg_bom.total_cost, 300)
+		self.assertEqual(
+			{d.item_code: d.rate for d in fg_bom.exploded_items}, {"BOM Rollup RM Item": 150}
+		)
@@ -13,6 +13,7 @@ from frappe.utils import (
 	ceil,
 	cint,
 	comma_and,
+	create_batch,
 	flt,
 	get_link_to_form,
 	getdate,
@@ -26,6 +27,8 @@ from erpnext.manufacturing.doctype.bom.bom import validate_bom_no
 from erpnext.manufacturing.doctype.work_order.work_order import get_item_details
 from erpnext.setup.doctype.item_group.item_group import get_item_group_defaults
 
+BOM_BATCH_SIZE = 500
+
 
 class ProductionPlan(Document):
 	def validate(self):
@@ -789,30 +792,20 @@ def download_raw_materials(doc, warehouses=None):
 	build_csv_response(item_list, doc.name)
 
 
-def get_exploded_items(item_details, company, bom_no, include_non_stock_items, planned_qty=1):
-	for d in frappe.db.sql(
-		"""select bei.item_code, item.default_bom as bom,
-			ifnull(sum(bei.stock_qty/ifnull(bom.quantity, 1)), 0)*%s as qty, item.item_name,
-			bei.description, bei.stock_uom, item.min_order_qty, bei.source_warehouse,
-			item.default_material_request_type, item.min_order_qty, item_default.default_warehouse,
-			item.purchase_uom, item_uom.conversion_factor, item.safety_stock
-		from
-			`tabBOM Explosion Item` bei
-			JOIN `tabBOM` bom ON bom.name = bei.parent
-			JOIN `tabItem` item ON item.name = bei.item_code
-			LEFT JOIN `tabItem Default` item_default
-				ON item_default.parent = item.name and item_default.company=%s
-			LEFT JOIN `tabUOM Conversion Detail` item_uom
-				ON item.name = item_uom.parent and item_uom.uom = item.purchase_uom
-		where
-			bei.docstatus < 2
-			and bom.name=%s and item.is_stock_item in (1, {0})
-		group by bei.item_code, bei.stock_uom""".format(
-			0 if include_non_stock_items else 1
-		),
-		(planned_qty, company, bom_no),
-		as_dict=1,
-	):
+def get_exploded_items(
+	item_details, company, bom_no, include_non_stock_items, planned_qty=1, exploded_items=None
+):
+	"""Adds the items of the Flat BOM of `bom_no` for `planned_qty` to `item_details`.
+	`exploded_items` can be passed with the Flat BOMs already loaded by `get_bom_exploded_items`."""
+	if exploded_items is None or bom_no not in exploded_items:
+		exploded_items = get_bom_exploded_items([bom_no], company)
+
+	for row in exploded_items[bom_no]:
+		if not (row.is_stock_item or include_non_stock_items):
+			continue
+
+		d = frappe._dict(row)
+		d.qty = row.qty * flt(planned_qty)
 		if not d.conversion_factor and d.purchase_uom:
 			d.conversion_factor = get_uom_conversion_factor(d.item_code, d.purchase_uom)
 		item_details.setdefault(d.get("item_code"), d)
@@ -820,6 +813,36 @@ def get_exploded_items(item_details, company, bom_no, include_non_stock_items, p
 	return item_details
 
 
+def get_bom_exploded_items(bom_nos, company):
+	"""Returns the items of the Flat BOMs per unit of each BOM, as {bom_no: items}"""
+	exploded_items = {bom_no: [] for bom_no in bom_nos}
+	for batch in create_batch(list(bom_nos), BOM_BATCH_SIZE):
+		for d in frappe.db.sql(
+			"""select bei.parent as parent_bom, bei.item_code, item.default_bom as bom,
+				ifnull(sum(bei.stock_qty/ifnull(bom.quantity, 1)), 0) as qty, item.item_name,
+				bei.description, bei.stock_uom, item.min_order_qty, bei.source_warehouse,
+				item.default_material_request_type, item.min_order_qty, item_default.default_warehouse,
+				item.purchase_uom, item_uom.conversion_factor, item.safety_stock, item.is_stock_item
+			from
+				`tabBOM Explosion Item` bei
+				JOIN `tabBOM` bom ON bom.name = bei.parent
+				JOIN `tabItem` item ON item.name = bei.item_code
+				LEFT JOIN `tabItem Default` item_default
+					ON item_default.parent = item.name and item_default.company=%(company)s
+				LEFT JOIN `tabUOM Conversion Detail` item_uom
+					ON item.name = item_uom.parent and item_uom.uom = item.purchase_uom
+			where
+				bei.docstatus < 2
+				and bom.name in %(boms)s
+			group by bei.parent, bei.item_code, bei.stock_uom""",
+			{"company": company, "boms": tuple(batch)},
+			as_dict=1,
+		):
+			exploded_items[d.pop("parent_bom")].append(d)
+
+	return exploded_items
+
+
 def get_uom_conversion_factor(item_code, uom):
 	return frappe.db.get_value(
 		"UOM Conversion Detail", {"parent": item_code, "uom": uom}, "conversion_factor"
@@ -836,36 +859,24 @@ def get_subitems(
 	include_subcontracted_items,
 	parent_qty,
 	planned_qty=1,
+	bom_items=None,
 ):
-	items = frappe.db.sql(
-		"""
-		SELECT
-			bom_item.item_code, default_material_request_type, item.item_name,
-			ifnull(%(parent_qty)s * sum(bom_item.stock_qty/ifnull(bom.quantity, 1)) * %(planned_qty)s, 0) as qty,
-			item.is_sub_contracted_item as is_sub_contracted, bom_item.source_warehouse,
-			item.default_bom as default_bom, bom_item.description as description,
-			bom_item.stock_uom as stock_uom, item.min_order_qty as min_order_qty, item.safety_stock as safety_stock,
-			item_default.default_warehouse, item.purchase_uom, item_uom.conversion_factor
-		FROM
-			`tabBOM Item` bom_item
-			JOIN `tabBOM` bom ON bom.name = bom_item.parent
-			JOIN tabItem item ON bom_item.item_code = item.name
-			LEFT JOIN `tabItem Default` item_default
-				ON item.name = item_default.parent and item_default.company = %(company)s
-			LEFT JOIN `tabUOM Conversion Detail` item_uom
-				ON item.name = item_uom.parent and item_uom.uom = item.purchase_uom
-		where
-			bom.name = %(bom)s
-			and bom_item.docstatus < 2
-			and item.is_stock_item in (1, {0})
-		group by bom_item.item_code""".format(
-			0 if include_non_stock_items else 1
-		),
-		{"bom": bom_no, "parent_qty": parent_qty, "planned_qty": planned_qty, "company": company},
-		as_dict=1,
-	)
+	"""Adds the raw materials of `bom_no` for `planned_qty` to `item_details`, exploding the default
+	BOMs of sub-assemblies if the row includes exploded items. BOMs not found in `bom_items`
+	(as loaded by `get_bom_items`) are loaded and added to it."""
+	if bom_items is None:
+		bom_items = {}
+
+	if bom_no not in bom_items:
+		bom_items.update(get_bom_items([bom_no], company))
+
+	for row in bom_items[bom_no]:
+		if not (row.is_stock_item or include_non_stock_items):
+			continue
+
+		d = frappe._dict(row)
+		d.qty = flt(parent_qty) * row.qty * flt(planned_qty)
 
-	for d in items:
 		if not data.get("include_exploded_items") or not d.default_bom:
 			if d.item_code in item_details:
 				item_details[d.item_code].qty = item_details[d.item_code].qty + d.qty
@@ -889,10 +900,61 @@ def get_subitems(
 						include_non_stock_items,
 						include_subcontracted_items,
 						d.qty,
+						bom_items=bom_items,
 					)
 	return item_details
 
 
+def get_bom_items(bom_nos, company, include_sub_assembly_boms=False):
+	"""Returns the raw materials of the BOMs per unit of each BOM, as {bom_no: items}.
+	With `include_sub_assembly_boms`, also loads the default BOMs of the sub-assemblies down the
+	BOM tree, with a query per level of the tree."""
+	bom_items = {}
+	to_load = set(bom_nos)
+	while to_load:
+		for batch in create_batch(list(to_load), BOM_BATCH_SIZE):
+			bom_items.update({bom_no: [] for bom_no in batch})
+			for d in frappe.db.sql(
+				"""
+				SELECT
+					bom_item.parent as parent_bom,
+					bom_item.item_code, default_material_request_type, item.item_name,
+					ifnull(sum(bom_item.stock_qty/ifnull(bom.quantity, 1)), 0) as qty,
+					item.is_sub_contracted_item as is_sub_contracted, bom_item.source_warehouse,
+					item.default_bom as default_bom, bom_item.description as description,
+					bom_item.stock_uom as stock_uom, item.min_order_qty as min_order_qty,
+					item.safety_stock as safety_stock, item_default.default_warehouse,
+					item.purchase_uom, item_uom.conversion_factor, item.is_stock_item
+				FROM
+					`tabBOM Item` bom_item
+					JOIN `tabBOM` bom ON bom.name = bom_item.parent
+					JOIN tabItem item ON bom_item.item_code = item.name
+					LEFT JOIN `tabItem Default` item_default
+						ON item.name = item_default.parent and item_default.company = %(company)s
+					LEFT JOIN `tabUOM Conversion Detail` item_uom
+						ON item.name = item_uom.parent and item_uom.uom = item.purchase_uom
+				where
+					bom.name in %(boms)s
+					and bom_item.docstatus < 2
+				group by bom_item.parent, bom_item.item_code""",
+				{"boms": tuple(batch), "company": company},
+				as_dict=1,
+			):
+				bom_items[d.pop("parent_bom")].append(d)
+
+		if not include_sub_assembly_boms:
+			break
+
+		to_load = {
+			d.default_bom
+			for bom_no in to_load
+			for d in bom_items[bom_no]
+			if d.default_bom and d.default_bom not in bom_items
+		}
+
+	return bom_items
+
+
 def get_material_request_items(
 	row, sales_order, company, ignore_existing_ordered_qty, include_safety_stock, warehouse, bin_dict
 ):
@@ -920,7 +982,7 @@ def get_material_request_items(
 
 			required_qty = required_qty / row["conversion_factor"]
 
-	if frappe.db.get_value("UOM", row["purchase_uom"], "must_be_whole_number"):
+	if frappe.get_cached_value("UOM", row["purchase_uom"], "must_be_whole_number"):
 		required_qty = ceil(required_qty)
 
 	if include_safety_stock:
@@ -1033,6 +1095,101 @@ def get_bin_details(row, company, for_warehouse=None, all_warehouse=False):
 	)
 
 
+def get_bin_details_for_items(rows, company, for_warehouse=None):
+	"""Returns the Bin details of each row, as the first row `get_bin_details` returns for it,
+	reading the Bins of all the items together"""
+	warehouses = [
+		for_warehouse or row.get("source_warehouse") or row.get("default_warehouse") for row in rows
+	]
+
+	bin = frappe.qb.DocType("Bin")
+	wh = frappe.qb.DocType("Warehouse")
+	bins = {}
+	for batch in create_batch(list({row["item_code"] for row in rows}), BOM_BATCH_SIZE):
+		for d in (
+			frappe.qb.from_(bin)
+			.join(wh)
+			.on(bin.warehouse == wh.name)
+			.select(
+				bin.item_code,
+				bin.warehouse,
+				wh.lft,
+				wh.rgt,
+				bin.projected_qty,
+				bin.actual_qty,
+				bin.ordered_qty,
+				bin.reserved_qty_for_production,
+				bin.planned_qty,
+			)
+			.where((wh.company == company) & (bin.item_code.isin(batch)))
+			.orderby(bin.item_code)
+			.orderby(bin.warehouse)
+		).run(as_dict=True):
+			bins.setdefault(d.item_code, []).append(d)
+
+	bounds = {}
+	if any(warehouses):
+		bounds = {
+			d.name: d
+			for d in frappe.get_all(
+				"Warehouse",
+				filters={"name": ("in", list(set(filter(None, warehouses))))},
+				fields=["name", "lft", "rgt"],
+			)
+		}
+
+	bin_details = []
+	for row, warehouse in zip(rows, warehouses):
+		bin_dict = {}
+		for d in bins.get(row["item_code"], []):
+			if warehouse and not (
+				warehouse in bounds and d.lft >= bounds[warehouse].lft and d.rgt <= bounds[warehouse].rgt
+			):
+				continue
+
+			bin_dict = frappe._dict(
+				projected_qty=flt(d.projected_qty),
+				actual_qty=flt(d.actual_qty),
+				ordered_qty=flt(d.ordered_qty),
+				reserved_qty_for_production=flt(d.reserved_qty_for_production),
+				warehouse=d.warehouse,
+				planned_qty=flt(d.planned_qty),
+			)
+			break
+
+		bin_details.append(bin_dict)
+
+	return bin_details
+
+
+def get_bom_items_for_po_items(doc, po_items):
+	"""Returns the BOM items and Flat BOMs needed for the rows, as loaded by `get_bom_items` and
+	`get_bom_exploded_items`"""
+	exploded_boms, boms, multi_level_boms = set(), set(), set()
+	for data in po_items:
+		if data.get("required_qty"):
+			bom_no = data.get("bom")
+			include_subcontracted_items = 1 if data.get("include_exploded_items") else 0
+		else:
+			bom_no = data.get("bom_no")
+			include_subcontracted_items = doc.get("include_subcontracted_items")
+
+		if not bom_no:
+			continue
+		elif data.get("include_exploded_items") and include_subcontracted_items:
+			exploded_boms.add(bom_no)
+		elif data.get("include_exploded_items"):
+			multi_level_boms.add(bom_no)
+		else:
+			boms.add(bom_no)
+
+	company = doc.get("company")
+	bom_items = get_bom_items(boms - multi_level_boms, company)
+	bom_items.update(get_bom_items(multi_level_boms, company, include_sub_assembly_boms=True))
+
+	return bom_items, get_bom_exploded_items(exploded_boms, company)
+
+
 @frappe.whitelist()
 def get_so_details(sales_order):
 	return frappe.db.get_value(
@@ -1085,11 +1242,16 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 	ignore_existing_ordered_qty = doc.get("ignore_existing_ordered_qty")
 	include_safety_stock = doc.get("include_safety_stock")
 
-	so_item_details = frappe._dict()
 	for data in po_items:
 		if not data.get("include_exploded_items") and doc.get("sub_assembly_items"):
 			data["include_exploded_items"] = 1
 
+	# load the BOMs of all the rows upfront
+	bom_items, exploded_items = get_bom_items_for_po_items(doc, po_items)
+
+	so_item_details = frappe._dict()
+	for data in po_items:
+
 		planned_qty = data.get("required_qty") or data.get("planned_qty")
 		ignore_existing_ordered_qty = (
 			data.get("ignore_existing_ordered_qty") or ignore_existing_ordered_qty
@@ -1114,7 +1276,12 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 				if data.get("include_exploded_items") and include_subcontracted_items:
 					# fetch exploded items from BOM
 					item_details = get_exploded_items(
-						item_details, company, bom_no, include_non_stock_items, planned_qty=planned_qty
+						item_details,
+						company,
+						bom_no,
+						include_non_stock_items,
+						planned_qty=planned_qty,
+						exploded_items=exploded_items,
 					)
 				else:
 					item_details = get_subitems(
@@ -1127,6 +1294,7 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 						include_subcontracted_items,
 						1,
 						planned_qty=planned_qty,
+						bom_items=bom_items,
 					)
 		elif data.get("item_code"):
 			item_master = frappe.get_doc("Item", data["item_code"]).as_dict()
@@ -1164,25 +1332,29 @@ def get_items_for_material_requests(doc, warehouses=None, get_parent_warehouse_d
 			else:
 				so_item_details[sales_order][item_code] = details
 
+	rows = [
+		(sales_order, details)
+		for sales_order, item_dict in so_item_details.items()
+		for details in item_dict.values()
+	]
+	bin_details = get_bin_details_for_items(
+		[details for sales_order, details in rows], doc.company, warehouse
+	)
+
 	mr_items = []
-	for sales_order, item_code in so_item_details.items():
-		item_dict = so_item_details[sales_order]
-		for details in item_dict.values():
-			bin_dict = get_bin_details(details, doc.company, warehouse)
-			bin_dict = bin_dict[0] if bin_dict else {}
-
-			if details.qty > 0:
-				items = get_material_request_items(
-					details,
-					sales_order,
-					company,
-					ignore_existing_ordered_qty,
-					include_safety_stock,
-					warehouse,
-					bin_dict,
-				)
-				if items:
-					mr_items.append(items)
+	for (sales_order, details), bin_dict in zip(rows, bin_details):
+		if details.qty > 0:
+			items = get_material_request_items(
+				details,
+				sales_order,
+				company,
+				ignore_existing_ordered_qty,
+				include_safety_stock,
+				warehouse,
+				bin_dict,
+			)
+			if items:
+				mr_items.append(items)
 
 	if (not ignore_existing_ordered_qty or get_parent_warehouse_data) and warehouses:
 		new_mr_items = []
@@ -1,13 +1,17 @@
 # Copyright (c) 2017, Frappe Technologies Pvt. Ltd. and Contributors
 # See license.txt
+from unittest.mock import patch
+
 import frappe
 from frappe.tests.utils import FrappeTestCase
 from frappe.utils import add_to_date, flt, now_datetime, nowdate
 
 from erpnext.controllers.item_variant import create_variant
 from erpnext.manufacturing.doctype.production_plan.production_plan import (
+	get_bom_items,
 	get_items_for_material_requests,
 	get_sales_orders,
+	get_subitems,
 	get_warehouse_list,
 )
 from erpnext.manufacturing.doctype.work_order.work_order import OverProductionError
@@ -395,6 +399,130 @@ class TestProductionPlan(FrappeTestCase):
 		pln.cancel()
 		frappe.delete_doc("Production Plan", pln.name)
 
+	def test_material_requests_for_multi_level_boms(self):
+		"Test raw materials of a BOM tree with a sub-assembly used at different levels."
+		for item_code in [
+			"MRP FG Item",
+			"MRP Sub Assembly 1",
+			"MRP Sub Assembly 2",
+			"MRP Raw Material 1",
+			"MRP Raw Material 2",
+		]:
+			create_item(item_code, is_stock_item=1)
+
+		boms = {
+			"MRP Sub Assembly 2": ["MRP Raw Material 2"],
+			"MRP Sub Assembly 1": ["MRP Sub Assembly 2", "MRP Raw Material 1"],
+			"MRP FG Item": ["MRP Sub Assembly 1", "MRP Sub Assembly 2", "MRP Raw Material 1"],
+		}
+		for item_code, raw_materials in boms.items():
+			if not frappe.db.get_value("BOM", {"item": item_code}):
+				make_bom(item=item_code, raw_materials=raw_materials, rm_qty=2)
+
+		pln = create_production_plan(
+			item_code="MRP FG Item",
+			planned_qty=1,
+			ignore_existing_ordered_qty=1,
+			skip_getting_mr_items=1,
+			do_not_save=1,
+		)
+		pln.po_items[0].include_exploded_items = 1
+		pln.append("po_items", dict(pln.po_items[0].as_dict(), name=None, idx=None, planned_qty=2))
+
+		mr_items = get_items_for_material_requests(pln.as_dict())
+		required_qty = {d["item_code"]: d["quantity"] for d in mr_items}
+
+		# per FG: 2 * (2 * 2 + 2) of raw material 2 and 2 + 2 * 2 of raw material 1
+		self.assertEqual(required_qty, {"MRP Raw Material 1": 18, "MRP Raw Material 2": 36})
+
+		pln.po_items[0].include_exploded_items = 0
+		pln.po_items[1].include_exploded_items = 0
+		mr_items = get_items_for_material_requests(pln.as_dict())
+		required_qty = {d["item_code"]: d["quantity"] for d in mr_items}
+		self.assertEqual(
+			required_qty,
+			{"MRP Sub Assembly 1": 6, "MRP Sub Assembly 2": 6, "MRP Raw Material 1": 6},
+		)
+
+	def test_bom_tree_loaded_per_level(self):
+		"Test that a BOM tree is loaded with a query per level, with the same raw materials."
+		for item_code in [
+			"MRP Tree FG 1",
+			"MRP Tree FG 2",
+			"MRP Tree Sub Assembly 1",
+			"MRP Tree Sub Assembly 2",
+			"MRP Tree Sub Assembly 3",
+			"MRP Tree Raw Material 1",
+			"MRP Tree Raw Material 2",
+			"MRP Tree Raw Material 3",
+		]:
+			create_item(item_code, is_stock_item=1)
+
+		# three levels of sub-assemblies, sub assembly 3 being used by both the others
+		boms = {
+			"MRP Tree Sub Assembly 3": ["MRP Tree Raw Material 2", "MRP Tree Raw Material 3"],
+			"MRP Tree Sub Assembly 2": ["MRP Tree Sub Assembly 3", "MRP Tree Raw Material 2"],
+			"MRP Tree Sub Assembly 1": ["MRP Tree Sub Assembly 3", "MRP Tree Raw Material 1"],
+			"MRP Tree FG 1": ["MRP Tree Sub Assembly 1", "MRP Tree Sub Assembly 2"],
+			"MRP Tree FG 2": ["MRP Tree Sub Assembly 2", "MRP Tree Raw Material 1"],
+		}
+		for item_code, raw_materials in boms.items():
+			if not frappe.db.get_value("BOM", {"item": item_code}):
+				make_bom(item=item_code, raw_materials=raw_materials, rm_qty=2)
+
+		rows = [
+			(frappe.db.get_value("Item", "MRP Tree FG 1", "default_bom"), 1),
+			(frappe.db.get_value("Item", "MRP Tree FG 2", "default_bom"), 3),
+		]
+		data = frappe._dict(include_exploded_items=1)
+
+		def get_raw_materials(bom_items=None):
+			item_details = {}
+			for bom_no, planned_qty in rows:
+				get_subitems(
+					None,
+					data,
+					item_details,
+					bom_no,
+					"_Test Company",
+					0,
+					0,
+					1,
+					planned_qty=planned_qty,
+					bom_items=bom_items,
+				)
+
+			return {item_code: flt(d.qty) for item_code, d in item_details.items()}
+
+		def count_bom_item_queries(function, *args, **kwargs):
+			with patch.object(frappe.local.db, "sql", wraps=frappe.local.db.sql) as sql:
+				result = function(*args, **kwargs)
+
+			return result, len([c for c in sql.call_args_list if "`tabBOM Item`" in str(c.args[0])])
+
+		# a BOM at a time, as loaded for each production plan row
+		raw_materials, per_bom_queries = count_bom_item_queries(get_raw_materials)
+
+		bom_items, queries = count_bom_item_queries(
+			get_bom_items, [bom_no for bom_no, planned_qty in rows], "_Test Company", True
+		)
+		batched_raw_materials, batched_queries = count_bom_item_queries(get_raw_materials, bom_items)
+
+		self.assertEqual(queries, 3)
+		self.assertEqual(batched_queries, 0)
+		self.assertEqual(per_bom_queries, 7)
+		self.assertEqual(batched_raw_materials, raw_materials)
+
+		# per unit, FG 1 needs 4, 20 and 16 of the raw materials and FG 2 needs 2, 12 and 8
+		self.assertEqual(
+			raw_materials,
+			{
+				"MRP Tree Raw Material 1": 4 + 3 * 2,
+				"MRP Tree Raw Material 2": 20 + 3 * 12,
+				"MRP Tree Raw Material 3": 16 + 3 * 8,
+			},
+		)
+
 	def test_get_warehouse_list_group(self):
 		"Check if required child warehouses are returned."
 		warehouse_json = '[{"warehouse":"_Test Warehouse Group - _TC"}]'
@@ -29,6 +29,7 @@ from erpnext.manufacturing.doctype.bom.bom import (
 from erpnext.manufacturing.doctype.manufacturing_settings.manufacturing_settings import (
 	get_mins_between_operations,
 )
+from erpnext.manufacturing.doctype.workstation.capacity_planner import CapacityPlanner
 from erpnext.stock.doctype.batch.batch import make_batch
 from erpnext.stock.doctype.item.item import get_item_defaults, validate_end_of_life
 from erpnext.stock.doctype.serial_no.serial_no import (
@@ -475,19 +476,24 @@ class WorkOrder(Document):
 
 		enable_capacity_planning = not cint(manufacturing_settings_doc.disable_capacity_planning)
 		plan_days = cint(manufacturing_settings_doc.capacity_planning_for_days) or 30
+		capacity_planner = CapacityPlanner() if enable_capacity_planning else None
 
 		for index, row in enumerate(self.operations):
 			qty = self.qty
 			while qty > 0:
 				qty = split_qty_based_on_batch_size(self, row, qty)
 				if row.job_card_qty > 0:
-					self.prepare_data_for_job_card(row, index, plan_days, enable_capacity_planning)
+					self.prepare_data_for_job_card(
+						row, index, plan_days, enable_capacity_planning, capacity_planner
+					)
 
 		planned_end_date = self.operations and self.operations[-1].planned_end_time
 		if planned_end_date:
 			self.db_set("planned_end_date", planned_end_date)
 
-	def prepare_data_for_job_card(self, row, index, plan_days, enable_capacity_planning):
+	def prepare_data_for_job_card(
+		self, row, index, plan_days, enable_capacity_planning, capacity_planner=None
+	):
 		self.set_operation_start_end_time(index, row)
 
 		if not row.workstation:
@@ -497,7 +503,11 @@ class WorkOrder(Document):
 
 		original_start_time = row.planned_start_time
 		job_card_doc = create_job_card(
-			self, row, auto_create=True, enable_capacity_planning=enable_capacity_planning
+			self,
+			row,
+			auto_create=True,
+			enable_capacity_planning=enable_capacity_planning,
+			capacity_planner=capacity_planner,
 		)
 
 		if enable_capacity_planning and job_card_doc:
@@ -1352,7 +1362,9 @@ def validate_operation_data(row):
 		)
 
 
-def create_job_card(work_order, row, enable_capacity_planning=False, auto_create=False):
+def create_job_card(
+	work_order, row, enable_capacity_planning=False, auto_create=False, capacity_planner=None
+):
 	doc = frappe.new_doc("Job Card")
 	doc.update(
 		{
@@ -1378,7 +1390,7 @@ def create_job_card(work_order, row, enable_capacity_planning=False, auto_create
 	if auto_create:
 		doc.flags.ignore_mandatory = True
 		if enable_capacity_planning:
-			doc.schedule_time_logs(row)
+			doc.schedule_time_logs(row, capacity_planner)
 
 		doc.insert()
 		frappe.msgprint(
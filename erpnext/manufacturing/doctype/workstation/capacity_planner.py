@@ -0,0 +1,144 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import bisect
+import datetime
+
+import frappe
+from frappe.utils import cint, get_datetime, get_time
+
+from erpnext.hr.doctype.holiday_list.holiday_list import get_holiday_dates
+from erpnext.manufacturing.doctype.manufacturing_settings.manufacturing_settings import (
+	get_mins_between_operations,
+)
+
+
+class CapacityPlanner:
+	"""Schedules operations on workstations in memory. The calendar of each workstation is loaded
+	once, and the time of every scheduled operation is booked in it for the operations after it."""
+
+	def __init__(self):
+		settings = frappe.get_doc("Manufacturing Settings")
+		self.allow_overtime = cint(settings.allow_overtime)
+		self.allow_production_on_holidays = cint(settings.allow_production_on_holidays)
+		self.mins_between_operations = get_mins_between_operations()
+		self.calendars = {}
+
+	def schedule(self, workstation, from_time, time_in_mins):
+		"""Books `time_in_mins` of the workstation in its earliest free working time on or after
+		`from_time`. Returns the booked periods as (from_time, to_time), split by working hours."""
+		if workstation not in self.calendars:
+			self.calendars[workstation] = WorkstationCalendar(workstation, self)
+
+		return self.calendars[workstation].schedule(from_time, time_in_mins)
+
+
+class WorkstationCalendar:
+	"""Working hours, holidays and booked time of a workstation.
+
+	Bookings are kept sorted by start time along with the length of the longest one, so the
+	bookings overlapping a period are found with a binary search over a bounded range."""
+
+	def __init__(self, workstation, planner):
+		doc = frappe.get_cached_doc("Workstation", workstation)
+		self.capacity = cint(doc.production_capacity) or 1
+		self.mins_between_operations = planner.mins_between_operations
+
+		self.working_hours = []
+		if not planner.allow_overtime:
+			for d in doc.working_hours:
+				start_time, end_time = get_time(d.start_time), get_time(d.end_time)
+				if start_time < end_time:
+					self.working_hours.append((start_time, end_time))
+			self.working_hours.sort()
+
+		self.holidays = set()
+		if self.working_hours and doc.holiday_list and not planner.allow_production_on_holidays:
+			self.holidays = get_holiday_dates(doc.holiday_list)
+
+		self.starts = []
+		self.ends = []
+		self.longest_booking = datetime.timedelta(0)
+		for from_time, to_time in get_booked_time(workstation):
+			self.book(get_datetime(from_time), get_datetime(to_time))
+
+	def schedule(self, from_time, time_in_mins):
+		from_time = get_datetime(from_time)
+		remaining_time = datetime.timedelta(minutes=time_in_mins)
+
+		periods = []
+		while remaining_time > datetime.timedelta(0):
+			from_time, working_hours_end = self.get_working_time(from_time)
+			to_time = from_time + remaining_time
+			if working_hours_end and to_time > working_hours_end:
+				to_time = working_hours_end
+
+			# the time between operations is kept free before the next booking too
+			booked_to = to_time
+			if to_time == from_time + remaining_time:
+				booked_to = to_time + self.mins_between_operations
+
+			booked_till = self.get_overlapping_bookings(from_time, booked_to)
+			if len(booked_till) >= self.capacity:
+				# wait for the first booking to end
+				from_time = min(booked_till)
+				continue
+
+			periods.append((from_time, to_time))
+			remaining_time -= to_time - from_time
+			from_time = to_time
+
+		for i, (from_time, to_time) in enumerate(periods):
+			self.book(from_time, to_time, is_last=i == len(periods) - 1)
+
+		return periods
+
+	def get_working_time(self, from_time):
+		"""Returns the earliest working time on or after `from_time` and the end of its working
+		hours. The end is None if the workstation works round the clock."""
+		if not self.working_hours:
+			return from_time, None
+
+		while True:
+			date = from_time.date()
+			if date not in self.holidays:
+				for start_time, end_time in self.working_hours:
+					working_hours_end = datetime.datetime.combine(date, end_time)
+					if from_time < working_hours_end:
+						return max(from_time, datetime.datetime.combine(date, start_time)), working_hours_end
+
+			from_time = datetime.datetime.combine(date + datetime.timedelta(days=1), datetime.time())
+
+	def get_overlapping_bookings(self, from_time, to_time):
+		"""Returns the end times of the bookings overlapping the period"""
+		start = bisect.bisect_left(self.starts, from_time - self.longest_booking)
+		end = bisect.bisect_left(self.starts, to_time)
+		return [booked_till for booked_till in self.ends[start:end] if booked_till > from_time]
+
+	def book(self, from_time, to_time, is_last=True):
+		"""Books the period, followed by the time between operations if it ends an operation"""
+		if is_last:
+			to_time = to_time + self.mins_between_operations
+
+		i = bisect.bisect_right(self.starts, from_time)
+		self.starts.insert(i, from_time)
+		self.ends.insert(i, to_time)
+		self.longest_booking = max(self.longest_booking, to_time - from_time)
+
+
+def get_booked_time(workstation):
+	"""Returns the time logs of the open and submitted Job Cards of the workstation"""
+	job_card = frappe.qb.DocType("Job Card")
+	time_log = frappe.qb.DocType("Job Card Time Log")
+	return (
+		frappe.qb.from_(time_log)
+		.join(job_card)
+		.on(time_log.parent == job_card.name)
+		.select(time_log.from_time, time_log.to_time)
+		.where(
+			(job_card.workstation == workstation)
+			& (job_card.docstatus < 2)
+			& (time_log.from_time.isnotnull())
+			& (time_log.to_time.isnotnull())
+		)
+	).run()
@@ -3,9 +3,11 @@
 import frappe
 from frappe.test_runner import make_test_records
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime
 
 from erpnext.manufacturing.doctype.operation.test_operation import make_operation
 from erpnext.manufacturing.doctype.routing.test_routing import create_routing, setup_bom
+from erpnext.manufacturing.doctype.workstation.capacity_planner import CapacityPlanner
 from erpnext.manufacturing.doctype.workstation.workstation import (
 	NotInWorkingHoursError,
 	WorkstationHolidayError,
@@ -94,6 +96,42 @@ class TestWorkstation(FrappeTestCase):
 		self.assertEqual(bom_doc.operations[0].hour_rate, 250)
 		self.assertEqual(bom_doc.operations[1].hour_rate, 250)
 
+	def test_capacity_planner(self):
+		frappe.db.set_value(
+			"Manufacturing Settings",
+			None,
+			{"allow_overtime": 0, "allow_production_on_holidays": 1, "mins_between_operations": 10},
+		)
+		planner = CapacityPlanner()
+
+		# working hours are from 10:00 to 20:00
+		periods = planner.schedule("_Test Workstation 1", "2099-01-05 15:00:00", 600)
+		self.assertEqual(
+			periods,
+			[
+				(get_datetime("2099-01-05 15:00:00"), get_datetime("2099-01-05 20:00:00")),
+				(get_datetime("2099-01-06 10:00:00"), get_datetime("2099-01-06 15:00:00")),
+			],
+		)
+
+		# waits for the booked time and the time between operations
+		periods = planner.schedule("_Test Workstation 1", "2099-01-05 16:00:00", 60)
+		self.assertEqual(
+			periods, [(get_datetime("2099-01-06 15:10:00"), get_datetime("2099-01-06 16:10:00"))]
+		)
+
+		# fits before the booked time
+		periods = planner.schedule("_Test Workstation 1", "2099-01-05 11:00:00", 60)
+		self.assertEqual(
+			periods, [(get_datetime("2099-01-05 11:00:00"), get_datetime("2099-01-05 12:00:00"))]
+		)
+
+		# does not fit before the booked time along with the time between operations
+		periods = planner.schedule("_Test Workstation 1", "2099-01-05 13:55:00", 60)
+		self.assertEqual(
+			periods, [(get_datetime("2099-01-06 16:20:00"), get_datetime("2099-01-06 17:20:00"))]
+		)
+
 
 def make_workstation(*args, **kwargs):
 	args = args if args else kwargs
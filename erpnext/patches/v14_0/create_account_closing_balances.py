@@ -0,0 +1,21 @@
+import frappe
+
+from erpnext.accounts.doctype.account_closing_balance.account_closing_balance import (
+	make_closing_balances,
+)
+
+
+def execute():
+	frappe.reload_doc("accounts", "doctype", "account_closing_balance")
+
+	# balance lookups only start from the latest closing of each company
+	for company in frappe.get_all("Company", pluck="name"):
+		pcv = frappe.get_all(
+			"Period Closing Voucher",
+			filters={"company": company, "docstatus": 1},
+			fields=["name", "company", "posting_date"],
+			order_by="posting_date desc",
+			limit=1,
+		)
+		if pcv:
+			make_closing_balances(pcv[0])
@@ -0,0 +1,9 @@
+import frappe
+
+from erpnext.stock.doctype.batch_bin.batch_bin import rebuild_batch_bins
+
+
+def execute():
+	frappe.reload_doc("stock", "doctype", "batch_bin")
+
+	rebuild_batch_bins()
@@ -0,0 +1,11 @@
+import frappe
+
+from erpnext.setup.doctype.company.company import rebuild_company_sales_history
+
+
+def execute():
+	frappe.reload_doc("setup", "doctype", "company_sales_history")
+	frappe.reload_doc("setup", "doctype", "company")
+
+	for company in frappe.get_all("Company", pluck="name"):
+		rebuild_company_sales_history(company)
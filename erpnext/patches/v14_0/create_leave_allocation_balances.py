@@ -0,0 +1,10 @@
+import frappe
+
+from erpnext.hr.doctype.leave_allocation_balance.leave_allocation_balance import (
+	rebuild_leave_allocation_balances,
+)
+
+
+def execute():
+	frappe.reload_doc("hr", "doctype", "leave_allocation_balance")
+	rebuild_leave_allocation_balances()
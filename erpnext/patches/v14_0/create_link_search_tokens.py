@@ -0,0 +1,11 @@
+import frappe
+
+from erpnext.utilities.doctype.link_search_token.link_search_token import (
+	rebuild_link_search_tokens,
+)
+
+
+def execute():
+	frappe.reload_doc("utilities", "doctype", "link_search_token")
+
+	rebuild_link_search_tokens()
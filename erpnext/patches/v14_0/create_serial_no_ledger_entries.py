@@ -0,0 +1,11 @@
+import frappe
+
+from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+	rebuild_serial_no_ledger,
+)
+
+
+def execute():
+	frappe.reload_doc("stock", "doctype", "serial_no_ledger_entry")
+
+	rebuild_serial_no_ledger()
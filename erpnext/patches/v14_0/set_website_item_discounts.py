@@ -0,0 +1,9 @@
+import frappe
+
+from erpnext.e_commerce.shopping_cart.product_info import update_website_item_discounts
+
+
+def execute():
+	frappe.reload_doc("e_commerce", "doctype", "website_item")
+
+	update_website_item_discounts()
@@ -27,6 +27,7 @@ from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import (
 )
 from erpnext.accounts.utils import get_fiscal_year
 from erpnext.hr.doctype.employee.employee import get_holiday_list_for_employee
+from erpnext.payroll.doctype.salary_structure.formula import get_data_for_eval_for_employees
 
 
 class PayrollEntry(Document):
@@ -852,12 +853,17 @@ def create_salary_slips_for_employees(employees, args, publish_progress=True):
 	try:
 		payroll_entry = frappe.get_doc("Payroll Entry", args.payroll_entry)
 		salary_slips_exist_for = get_existing_salary_slips(employees, args)
+		shared_data_for_eval = get_data_for_eval_for_employees(
+			[emp for emp in employees if emp not in salary_slips_exist_for], args.end_date
+		)
 		count = 0
 
 		for emp in employees:
 			if emp not in salary_slips_exist_for:
 				args.update({"doctype": "Salary Slip", "employee": emp})
-				frappe.get_doc(args).insert()
+				salary_slip = frappe.get_doc(args)
+				salary_slip._shared_data_for_eval = shared_data_for_eval
+				salary_slip.insert()
 
 				count += 1
 				if publish_progress:
@@ -45,6 +45,14 @@ from erpnext.payroll.doctype.payroll_period.payroll_period import (
 	get_payroll_period,
 	get_period_factor,
 )
+from erpnext.payroll.doctype.salary_structure.formula import (
+	CompiledStructureRow,
+	compile_expression,
+	evaluate_structure_row,
+	get_compiled_salary_structure,
+	get_eval_globals,
+	get_salary_component_abbrs,
+)
 from erpnext.utilities.transaction_base import TransactionBase
 
 
@@ -622,33 +630,53 @@ class SalarySlip(TransactionBase):
 
 	def add_structure_components(self, component_type):
 		data = self.get_data_for_eval()
-		for struct_row in self._salary_structure_doc.get(component_type):
-			amount = self.eval_condition_and_formula(struct_row, data)
+		compiled_structure = get_compiled_salary_structure(self._salary_structure_doc)
+		eval_globals = get_eval_globals()
+		for compiled_row in compiled_structure.rows[component_type]:
+			struct_row = compiled_row.row
+			amount = evaluate_structure_row(compiled_row, data, eval_globals)
 			if amount and struct_row.statistical_component == 0:
 				self.update_component_row(struct_row, amount, component_type)
 
 	def get_data_for_eval(self):
 		"""Returns data for evaluating formula"""
 		data = frappe._dict()
-		employee = frappe.get_doc("Employee", self.employee).as_dict()
+		# set by `create_salary_slips_for_employees` when slips are created in bulk
+		shared_data = getattr(self, "_shared_data_for_eval", None)
+		prefetched = shared_data and shared_data.employees.get(self.employee)
+
+		if prefetched:
+			employee = prefetched.employee
+		else:
+			employee = frappe.get_doc("Employee", self.employee).as_dict()
 
 		start_date = getdate(self.start_date)
 		date_to_validate = (
 			employee.date_of_joining if employee.date_of_joining > start_date else start_date
 		)
 
-		salary_structure_assignment = frappe.get_value(
-			"Salary Structure Assignment",
-			{
-				"employee": self.employee,
-				"salary_structure": self.salary_structure,
-				"from_date": ("<=", date_to_validate),
-				"docstatus": 1,
-			},
-			"*",
-			order_by="from_date desc",
-			as_dict=True,
-		)
+		if prefetched:
+			salary_structure_assignment = next(
+				(
+					d
+					for d in prefetched.assignments
+					if d.salary_structure == self.salary_structure and getdate(d.from_date) <= date_to_validate
+				),
+				None,
+			)
+		else:
+			salary_structure_assignment = frappe.get_value(
+				"Salary Structure Assignment",
+				{
+					"employee": self.employee,
+					"salary_structure": self.salary_structure,
+					"from_date": ("<=", date_to_validate),
+					"docstatus": 1,
+				},
+				"*",
+				order_by="from_date desc",
+				as_dict=True,
+			)
 
 		if not salary_structure_assignment:
 			frappe.throw(
@@ -665,9 +693,11 @@ class SalarySlip(TransactionBase):
 		data.update(self.as_dict())
 
 		# set values for components
-		salary_components = frappe.get_all("Salary Component", fields=["salary_component_abbr"])
-		for sc in salary_components:
-			data.setdefault(sc.salary_component_abbr, 0)
+		component_abbrs = (
+			shared_data.component_abbrs if shared_data else get_salary_component_abbrs()
+		)
+		for abbr in component_abbrs:
+			data.setdefault(abbr, 0)
 
 		for key in ("earnings", "deductions"):
 			for d in self.get(key):
@@ -676,31 +706,12 @@ class SalarySlip(TransactionBase):
 		return data
 
 	def eval_condition_and_formula(self, d, data):
-		try:
-			condition = d.condition.strip().replace("\n", " ") if d.condition else None
-			if condition:
-				if not frappe.safe_eval(condition, self.whitelisted_globals, data):
-					return None
-			amount = d.amount
-			if d.amount_based_on_formula:
-				formula = d.formula.strip().replace("\n", " ") if d.formula else None
-				if formula:
-					amount = flt(frappe.safe_eval(formula, self.whitelisted_globals, data), d.precision("amount"))
-			if amount:
-				data[d.abbr] = amount
-
-			return amount
-
-		except NameError as err:
-			frappe.throw(
-				_("{0} <br> This error can be due to missing or deleted field.").format(err),
-				title=_("Name error"),
-			)
-		except SyntaxError as err:
-			frappe.throw(_("Syntax error in formula or condition: {0}").format(err))
-		except Exception as e:
-			frappe.throw(_("Error in formula or condition: {0}").format(e))
-			raise
+		compiled_row = CompiledStructureRow(
+			d,
+			compile_expression(d.condition, fieldname="condition"),
+			compile_expression(d.formula) if d.amount_based_on_formula else None,
+		)
+		return evaluate_structure_row(compiled_row, data)
 
 	def add_employee_benefits(self, payroll_period):
 		for struct_row in self._salary_structure_doc.get("earnings"):
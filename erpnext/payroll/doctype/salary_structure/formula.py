@@ -0,0 +1,199 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+import ast
+import datetime
+
+import frappe
+from frappe import _
+from frappe.utils import flt, getdate
+
+WHITELISTED_GLOBALS = {
+	"int": int,
+	"float": float,
+	"long": int,
+	"round": round,
+	"date": datetime.date,
+	"getdate": getdate,
+}
+
+# compiled structures are kept per worker process, keyed on (name, modified)
+_compiled_structures = {}
+
+
+class CompiledExpression:
+	"""A validated condition or formula compiled once into a code object"""
+
+	__slots__ = ("source", "code", "dependencies")
+
+	def __init__(self, source, code, dependencies):
+		self.source = source
+		self.code = code
+		self.dependencies = dependencies
+
+	def evaluate(self, data, eval_globals=None):
+		return eval(self.code, eval_globals or get_eval_globals(), data)  # nosec
+
+
+class CompiledStructureRow:
+	__slots__ = ("row", "condition", "formula")
+
+	def __init__(self, row, condition, formula):
+		self.row = row
+		self.condition = condition
+		self.formula = formula
+
+
+class CompiledSalaryStructure:
+	"""Conditions and formulas of a Salary Structure, compiled once and shared
+	across all the salary slips that use it"""
+
+	def __init__(self, salary_structure):
+		self.name = salary_structure.name
+		self.modified = salary_structure.modified
+		self.rows = {}
+
+		for component_type in ("earnings", "deductions"):
+			self.rows[component_type] = [
+				CompiledStructureRow(
+					row,
+					compile_expression(row.condition, row, "condition"),
+					compile_expression(row.formula, row, "formula") if row.amount_based_on_formula else None,
+				)
+				for row in salary_structure.get(component_type)
+			]
+
+	def get_dependencies(self):
+		"""Returns a map of component abbreviation -> names its condition and formula read"""
+		dependencies = {}
+		for rows in self.rows.values():
+			for compiled in rows:
+				names = set()
+				for expression in (compiled.condition, compiled.formula):
+					if expression:
+						names.update(expression.dependencies)
+				dependencies[compiled.row.abbr] = names
+
+		return dependencies
+
+
+def compile_expression(source, row=None, fieldname="formula"):
+	"""Validate and compile a salary component condition or formula.
+
+	Applies the same restrictions as `frappe.safe_eval` (no dunder access and no builtins
+	at evaluation time) so the compiled code can be evaluated directly."""
+	source = source.strip().replace("\n", " ") if source else None
+	if not source:
+		return None
+
+	if "__" in source:
+		throw_formula_error(
+			_("Illegal {0} {1}. Cannot use {2}").format(fieldname, frappe.bold(source), "__"), row
+		)
+
+	try:
+		tree = ast.parse(source, mode="eval")
+	except SyntaxError as err:
+		throw_formula_error(_("Syntax error in formula or condition: {0}").format(err), row)
+
+	dependencies = set()
+	for node in ast.walk(tree):
+		if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+			throw_formula_error(
+				_("Illegal {0} {1}. Cannot access private attributes").format(
+					fieldname, frappe.bold(source)
+				),
+				row,
+			)
+		elif isinstance(node, ast.Name) and node.id not in WHITELISTED_GLOBALS:
+			dependencies.add(node.id)
+
+	code = compile(tree, "<salary component {0}>".format(fieldname), "eval")
+	return CompiledExpression(source, code, frozenset(dependencies))
+
+
+def throw_formula_error(message, row=None):
+	if row and row.get("salary_component"):
+		message = _("Row #{0} ({1}): {2}").format(row.idx, row.salary_component, message)
+
+	frappe.throw(message, title=_("Invalid Formula"))
+
+
+def get_compiled_salary_structure(salary_structure):
+	"""Returns the compiled conditions and formulas for a Salary Structure doc, reusing the
+	compiled code for as long as the structure is not modified"""
+	key = (salary_structure.name, str(salary_structure.modified))
+	compiled = _compiled_structures.get(key)
+	if not compiled:
+		# drop code compiled for older versions of the structure
+		for stale_key in [k for k in _compiled_structures if k[0] == salary_structure.name]:
+			del _compiled_structures[stale_key]
+
+		compiled = CompiledSalaryStructure(salary_structure)
+		_compiled_structures[key] = compiled
+
+	return compiled
+
+
+def get_eval_globals():
+	eval_globals = WHITELISTED_GLOBALS.copy()
+	eval_globals["__builtins__"] = {}
+	return eval_globals
+
+
+def evaluate_structure_row(compiled_row, data, eval_globals=None):
+	"""Evaluate the condition and formula of one compiled structure row against `data`,
+	updating `data` with the component amount. Returns the amount, or None if the condition
+	is not met."""
+	row = compiled_row.row
+	if eval_globals is None:
+		eval_globals = get_eval_globals()
+
+	try:
+		if compiled_row.condition and not compiled_row.condition.evaluate(data, eval_globals):
+			return None
+
+		amount = row.amount
+		if compiled_row.formula:
+			amount = flt(compiled_row.formula.evaluate(data, eval_globals), row.precision("amount"))
+		if amount:
+			data[row.abbr] = amount
+
+		return amount
+
+	except NameError as err:
+		frappe.throw(
+			_("{0} <br> This error can be due to missing or deleted field.").format(err),
+			title=_("Name error"),
+		)
+	except Exception as e:
+		frappe.throw(_("Error in formula or condition: {0}").format(e))
+		raise
+
+
+def get_salary_component_abbrs():
+	return frappe.get_all("Salary Component", pluck="salary_component_abbr")
+
+
+def get_data_for_eval_for_employees(employees, end_date):
+	"""Prefetch the data shared by formula evaluation for a batch of employees: Salary
+	Component abbreviations, Employee records and submitted Salary Structure Assignments
+	(latest first), in three queries instead of three per salary slip."""
+	shared = frappe._dict(component_abbrs=get_salary_component_abbrs(), employees={})
+	if not employees:
+		return shared
+
+	for employee in frappe.get_all("Employee", filters={"name": ("in", employees)}, fields=["*"]):
+		shared.employees[employee.name] = frappe._dict(employee=employee, assignments=[])
+
+	assignments = frappe.get_all(
+		"Salary Structure Assignment",
+		filters={"employee": ("in", employees), "from_date": ("<=", end_date), "docstatus": 1},
+		fields=["*"],
+		order_by="from_date desc",
+	)
+	for assignment in assignments:
+		if assignment.employee in shared.employees:
+			shared.employees[assignment.employee].assignments.append(assignment)
+
+	return shared
@@ -9,6 +9,7 @@ from frappe.model.mapper import get_mapped_doc
 from frappe.utils import cint, cstr, flt
 
 import erpnext
+from erpnext.payroll.doctype.salary_structure.formula import compile_expression
 
 
 class SalaryStructure(Document):
@@ -16,6 +17,7 @@ class SalaryStructure(Document):
 		self.set_missing_values()
 		self.validate_amount()
 		self.strip_condition_and_formula_fields()
+		self.validate_conditions_and_formulas()
 		self.validate_max_benefits_with_flexi()
 		self.validate_component_based_on_tax_slab()
 
@@ -68,6 +70,14 @@ class SalaryStructure(Document):
 			row.condition = row.condition.strip() if row.condition else ""
 			row.formula = row.formula.strip() if row.formula else ""
 
+	def validate_conditions_and_formulas(self):
+		# compile once at save so that syntax errors surface here rather than in every slip
+		for table in ("earnings", "deductions"):
+			for row in self.get(table):
+				compile_expression(row.condition, row, "condition")
+				if row.amount_based_on_formula:
+					compile_expression(row.formula, row, "formula")
+
 	def validate_max_benefits_with_flexi(self):
 		have_a_flexi = False
 		if self.earnings:
@@ -19,6 +19,7 @@ from erpnext.payroll.doctype.salary_slip.test_salary_slip import (
 	make_earning_salary_component,
 	make_employee_salary_slip,
 )
+from erpnext.payroll.doctype.salary_structure.formula import compile_expression
 from erpnext.payroll.doctype.salary_structure.salary_structure import make_salary_slip
 
 test_dependencies = ["Fiscal Year"]
@@ -155,6 +156,19 @@ class TestSalaryStructure(FrappeTestCase):
 		sal_struct = make_salary_structure("Salary Structure Multi Currency", "Monthly", currency="USD")
 		self.assertEqual(sal_struct.currency, "USD")
 
+	def test_compiled_formula_dependencies(self):
+		compiled = compile_expression("base * .1 if BS > 0 else round(variable)")
+		self.assertEqual(compiled.dependencies, {"base", "BS", "variable"})
+		self.assertEqual(compiled.evaluate({"base": 1000, "BS": 1, "variable": 0}), 100)
+
+		self.assertRaises(frappe.ValidationError, compile_expression, "base *")
+		self.assertRaises(frappe.ValidationError, compile_expression, "base.__class__")
+		self.assertRaises(frappe.ValidationError, compile_expression, "base._fields")
+
+		# builtins other than the whitelisted ones are not available while evaluating
+		compiled = compile_expression("len(base)")
+		self.assertRaises(NameError, compiled.evaluate, {"base": "abc"})
+
 
 def make_salary_structure(
 	salary_structure,
@@ -458,6 +458,9 @@ def get_nested_links(link_doctype, link_name, ignore_permissions=False):
 @frappe.validate_and_sanitize_search_inputs
 def get_customer_list(doctype, txt, searchfield, start, page_len, filters=None):
 	from erpnext.controllers.queries import get_fields
+	from erpnext.utilities.doctype.link_search_token.link_search_token import (
+		get_link_search_condition,
+	)
 
 	fields = ["name", "customer_name", "customer_group", "territory"]
 
@@ -473,22 +476,30 @@ def get_customer_list(doctype, txt, searchfield, start, page_len, filters=None):
 		filter_conditions = get_filters_cond(doctype, filters, [])
 		match_conditions += "{}".format(filter_conditions)
 
+	search_values = {}
+	search_condition = get_link_search_condition("Customer", txt, "`tabCustomer`.name")
+	if search_condition:
+		search_condition, search_values = search_condition
+	else:
+		search_condition = "{0} like %(txt)s or customer_name like %(txt)s".format(searchfield)
+
 	return frappe.db.sql(
 		"""
-		select %s
+		select {fields}
 		from `tabCustomer`
 		where docstatus < 2
-			and (%s like %s or customer_name like %s)
+			and ({search_condition})
 			{match_conditions}
 		order by
-			case when name like %s then 0 else 1 end,
-			case when customer_name like %s then 0 else 1 end,
-			name, customer_name limit %s, %s
+			case when name like %(txt)s then 0 else 1 end,
+			case when customer_name like %(txt)s then 0 else 1 end,
+			name, customer_name limit %(start)s, %(page_len)s
 		""".format(
-			match_conditions=match_conditions
-		)
-		% (", ".join(fields), searchfield, "%s", "%s", "%s", "%s", "%s", "%s"),
-		("%%%s%%" % txt, "%%%s%%" % txt, "%%%s%%" % txt, "%%%s%%" % txt, start, page_len),
+			fields=", ".join(fields),
+			search_condition=search_condition,
+			match_conditions=match_conditions.replace("%", "%%"),
+		),
+		{"txt": "%%%s%%" % txt, "start": cint(start), "page_len": cint(page_len), **search_values},
 	)
 
 
@@ -10,7 +10,17 @@ from frappe import _
 from frappe.cache_manager import clear_defaults_cache
 from frappe.contacts.address_and_contact import load_address_and_contact
 from frappe.custom.doctype.property_setter.property_setter import make_property_setter
-from frappe.utils import cint, formatdate, get_timestamp, today
+from frappe.utils import (
+	add_years,
+	cint,
+	flt,
+	formatdate,
+	get_first_day,
+	get_timestamp,
+	getdate,
+	now_datetime,
+	today,
+)
 from frappe.utils.nestedset import NestedSet
 
 from erpnext.accounts.doctype.account.account import get_account_currency
@@ -536,53 +546,140 @@ def install_country_fixtures(company, country):
 		)
 
 
-def update_company_current_month_sales(company):
-	current_month_year = formatdate(today(), "MM-yyyy")
+def update_company_sales_history(company, posting_date, amount):
+	"""Adds `amount` to the sales of the company in the month of `posting_date`. Called as Sales
+	Invoices are submitted (and with the negated amount as they are cancelled)."""
+	# a single upsert against the unique (company, month_start) index, so that concurrent
+	# submissions in a new month do not both try to insert the month
+	values = {
+		"name": frappe.generate_hash(length=10),
+		"now": frappe.utils.now(),
+		"user": frappe.session.user,
+		"company": company,
+		"month_start": get_first_day(posting_date),
+		"total": flt(amount),
+	}
+	frappe.db.multisql(
+		{
+			"mariadb": """
+				insert into `tabCompany Sales History`
+					(name, creation, modified, owner, modified_by, company, month_start, total)
+				values
+					(%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, %(company)s, %(month_start)s,
+					%(total)s)
+				on duplicate key update total = total + values(total), modified = values(modified)
+			""",
+			"postgres": """
+				insert into "tabCompany Sales History"
+					(name, creation, modified, owner, modified_by, company, month_start, total)
+				values
+					(%(name)s, %(now)s, %(now)s, %(user)s, %(user)s, %(company)s, %(month_start)s,
+					%(total)s)
+				on conflict (company, month_start) do update
+				set total = "tabCompany Sales History".total + excluded.total,
+					modified = excluded.modified
+			""",
+		},
+		values,
+	)
+
+
+def rebuild_company_sales_history(company):
+	"""Recomputes the monthly sales of the company from all its submitted Sales Invoices"""
+	frappe.db.delete("Company Sales History", {"company": company})
 
-	results = frappe.db.sql(
+	monthly_sales = frappe.db.sql(
 		"""
-		SELECT
-			SUM(base_grand_total) AS total,
-			DATE_FORMAT(`posting_date`, '%m-%Y') AS month_year
-		FROM
-			`tabSales Invoice`
-		WHERE
-			DATE_FORMAT(`posting_date`, '%m-%Y') = '{current_month_year}'
-			AND docstatus = 1
-			AND company = {company}
-		GROUP BY
-			month_year
-	""".format(
-			current_month_year=current_month_year, company=frappe.db.escape(company)
-		),
+		select extract(year from posting_date) as year, extract(month from posting_date) as month,
+			sum(base_grand_total) as total
+		from `tabSales Invoice`
+		where company = %s and docstatus = 1
+		group by extract(year from posting_date), extract(month from posting_date)""",
+		company,
 		as_dict=True,
 	)
 
-	monthly_total = results[0]["total"] if len(results) > 0 else 0
+	for d in monthly_sales:
+		update_company_sales_history(
+			company, getdate("{0}-{1:02d}-01".format(cint(d.year), cint(d.month))), d.total
+		)
+
+
+def get_company_monthly_sales(company, from_date=None):
+	"""Returns {month start: total sales} of the company from the monthly sales history"""
+	filters = {"company": company}
+	if from_date:
+		filters["month_start"] = (">=", get_first_day(from_date))
+
+	return dict(
+		frappe.get_all(
+			"Company Sales History",
+			filters=filters,
+			fields=["month_start", "total"],
+			order_by="month_start",
+			as_list=True,
+		)
+	)
+
+
+def update_company_current_month_sales(company):
+	month_start = get_first_day(today())
+	monthly_total = get_company_monthly_sales(company, month_start).get(month_start, 0)
 
 	frappe.db.set_value("Company", company, "total_monthly_sales", monthly_total)
 
 
 def update_company_monthly_sales(company):
-	"""Cache past year monthly sales of every company based on sales invoices"""
-	import json
+	"""Cache monthly sales of every company based on the monthly sales history"""
+	month_to_value_dict = {
+		formatdate(month_start, "MM-yyyy"): total
+		for month_start, total in get_company_monthly_sales(company).items()
+	}
 
-	from frappe.utils.goal import get_monthly_results
+	frappe.db.set_value("Company", company, "sales_monthly_history", json.dumps(month_to_value_dict))
 
-	filter_str = "company = {0} and status != 'Draft' and docstatus=1".format(
-		frappe.db.escape(company)
-	)
-	month_to_value_dict = get_monthly_results(
-		"Sales Invoice", "base_grand_total", "posting_date", filter_str, "sum"
+
+def update_transactions_annual_history(company, commit=False):
+	"""Updates the daily count of transactions of the last year. Once built, only the days of
+	transactions created or modified since the last update are counted again."""
+	history, updated_on = frappe.db.get_value(
+		"Company", company, ["transactions_annual_history", "transactions_history_updated_on"]
 	)
 
-	frappe.db.set_value("Company", company, "sales_monthly_history", json.dumps(month_to_value_dict))
+	try:
+		transactions_history = json.loads(history) if history and "{" in history else None
+	except ValueError:
+		transactions_history = None
 
+	now = now_datetime()
+	if transactions_history is None or not updated_on:
+		transactions_history = get_all_transactions_annual_history(company)
+	else:
+		transaction_dates = get_transaction_dates_modified_since(company, updated_on)
+		if transaction_dates:
+			for date in transaction_dates:
+				transactions_history.pop(str(get_timestamp(date)), None)
+
+			for timestamp, count in get_all_transactions_annual_history(
+				company, transaction_dates
+			).items():
+				transactions_history[str(timestamp)] = count
+
+		# drop the days that are now older than a year
+		year_start = get_timestamp(add_years(getdate(now), -1))
+		transactions_history = {
+			timestamp: count
+			for timestamp, count in transactions_history.items()
+			if flt(timestamp) > year_start
+		}
 
-def update_transactions_annual_history(company, commit=False):
-	transactions_history = get_all_transactions_annual_history(company)
 	frappe.db.set_value(
-		"Company", company, "transactions_annual_history", json.dumps(transactions_history)
+		"Company",
+		company,
+		{
+			"transactions_annual_history": json.dumps(transactions_history),
+			"transactions_history_updated_on": now,
+		},
 	)
 
 	if commit:
@@ -631,52 +728,70 @@ def add_node():
 	frappe.get_doc(args).insert()
 
 
-def get_all_transactions_annual_history(company):
-	out = {}
-
-	items = frappe.db.sql(
-		"""
-		select transaction_date, count(*) as count
-
-		from (
-			select name, transaction_date, company
-			from `tabQuotation`
-
-			UNION ALL
+# (doctype, date field) of the transactions counted in the company's annual history
+ANNUAL_HISTORY_TRANSACTIONS = (
+	("Quotation", "transaction_date"),
+	("Sales Order", "transaction_date"),
+	("Delivery Note", "posting_date"),
+	("Sales Invoice", "posting_date"),
+	("Issue", "date(creation)"),
+	("Project", "date(creation)"),
+)
 
-			select name, transaction_date, company
-			from `tabSales Order`
 
-			UNION ALL
-
-			select name, posting_date as transaction_date, company
-			from `tabDelivery Note`
+def get_transactions_union(modified_since=False):
+	condition = "where modified >= %(modified_since)s" if modified_since else ""
+	return " UNION ALL ".join(
+		"select name, {0} as transaction_date, company from `tab{1}` {2}".format(
+			date_field, doctype, condition
+		)
+		for doctype, date_field in ANNUAL_HISTORY_TRANSACTIONS
+	)
 
-			UNION ALL
 
-			select name, posting_date as transaction_date, company
-			from `tabSales Invoice`
+def get_transaction_dates_modified_since(company, modified_since):
+	"""Returns the dates, within the last year, of the transactions created or modified since
+	`modified_since`"""
+	return [
+		d.transaction_date
+		for d in frappe.db.sql(
+			"""
+			select distinct transaction_date
+			from ({transactions}) t
+			where company=%(company)s
+				and transaction_date > date_sub(curdate(), interval 1 year)""".format(
+				transactions=get_transactions_union(modified_since=True)
+			),
+			{"company": company, "modified_since": modified_since},
+			as_dict=True,
+		)
+	]
 
-			UNION ALL
 
-			select name, creation as transaction_date, company
-			from `tabIssue`
+def get_all_transactions_annual_history(company, transaction_dates=None):
+	"""Returns {timestamp: count} of the transactions of each day of the last year, or only of
+	`transaction_dates` if given"""
+	out = {}
 
-			UNION ALL
+	items = frappe.db.sql(
+		"""
+		select transaction_date, count(*) as count
 
-			select name, creation as transaction_date, company
-			from `tabProject`
-		) t
+		from ({transactions}) t
 
 		where
-			company=%s
+			company=%(company)s
 			and
 			transaction_date > date_sub(curdate(), interval 1 year)
+			{date_condition}
 
 		group by
 			transaction_date
-			""",
-		(company),
+			""".format(
+			transactions=get_transactions_union(),
+			date_condition="and transaction_date in %(transaction_dates)s" if transaction_dates else "",
+		),
+		{"company": company, "transaction_dates": tuple(transaction_dates or ())},
 		as_dict=True,
 	)
 
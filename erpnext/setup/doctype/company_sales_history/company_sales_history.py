@@ -0,0 +1,13 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class CompanySalesHistory(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Company Sales History", ["company", "month_start"])
@@ -0,0 +1,34 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, get_first_day, nowdate
+
+from erpnext.accounts.doctype.sales_invoice.test_sales_invoice import create_sales_invoice
+from erpnext.setup.doctype.company.company import (
+	get_company_monthly_sales,
+	rebuild_company_sales_history,
+)
+
+
+class TestCompanySalesHistory(FrappeTestCase):
+	def test_sales_history_matches_rebuild(self):
+		company = "_Test Company"
+		last_month = add_months(nowdate(), -1)
+		existing_sales = get_company_monthly_sales(company)
+
+		si = create_sales_invoice(posting_date=last_month)
+		create_sales_invoice().cancel()
+
+		monthly_sales = get_company_monthly_sales(company)
+		month_start = get_first_day(last_month)
+		self.assertEqual(
+			monthly_sales[month_start], existing_sales.get(month_start, 0) + si.base_grand_total
+		)
+
+		rebuild_company_sales_history(company)
+		self.assertEqual(get_company_monthly_sales(company)[month_start], monthly_sales[month_start])
+
+	def tearDown(self):
+		frappe.db.rollback()
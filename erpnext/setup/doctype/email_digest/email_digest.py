@@ -11,6 +11,7 @@ from frappe import _
 from frappe.core.doctype.user.user import STANDARD_USERS
 from frappe.utils import (
 	add_to_date,
+	cint,
 	flt,
 	fmt_money,
 	format_time,
@@ -22,7 +23,7 @@ from frappe.utils import (
 	today,
 )
 
-from erpnext.accounts.utils import get_balance_on, get_count_on, get_fiscal_year
+from erpnext.accounts.utils import get_balances_on, get_count_on, get_fiscal_year
 
 user_specific_content = ["calendar_events", "todo_list"]
 
@@ -73,12 +74,16 @@ class EmailDigest(Document):
 			)
 		]
 
-		if self.recipients:
-			for row in self.recipients:
-				msg_for_this_recipient = self.get_msg_html()
-				if msg_for_this_recipient and row.recipient in valid_users:
+		recipients = [row.recipient for row in self.recipients if row.recipient in valid_users]
+		if recipients:
+			# fetch the user specific sections of all recipients at once
+			self._todo_lists = get_todo_lists(recipients)
+
+			for recipient in recipients:
+				msg_for_this_recipient = self.get_msg_html(recipient)
+				if msg_for_this_recipient:
 					frappe.sendmail(
-						recipients=row.recipient,
+						recipients=recipient,
 						subject=_("{0} Digest").format(self.frequency),
 						message=msg_for_this_recipient,
 						reference_doctype=self.doctype,
@@ -86,8 +91,8 @@ class EmailDigest(Document):
 						unsubscribe_message=_("Unsubscribe from this Email Digest"),
 					)
 
-	def get_msg_html(self):
-		"""Build email digest content"""
+	def get_msg_html(self, user=None):
+		"""Build email digest content for `user` (the session user by default)"""
 		frappe.flags.ignore_account_permission = True
 		from erpnext.setup.doctype.email_digest.quotes import get_random_quote
 
@@ -101,12 +106,12 @@ class EmailDigest(Document):
 		if self.get("calendar_events"):
 			context.events, context.event_count = self.get_calendar_events()
 		if self.get("todo_list"):
-			context.todo_list = self.get_todo_list()
-			context.todo_count = self.get_todo_count()
+			context.todo_list = self.get_todo_list(user)
+			context.todo_count = self.get_todo_count(user)
 		if self.get("notifications"):
 			context.notifications = self.get_notifications()
 		if self.get("issue"):
-			context.issue_list = self.get_issue_list()
+			context.issue_list = self.get_issue_list(user)
 			context.issue_count = self.get_issue_count()
 		if self.get("project"):
 			context.project_list = self.get_project_list()
@@ -196,29 +201,20 @@ class EmailDigest(Document):
 		if not user_id:
 			user_id = frappe.session.user
 
-		todo_list = frappe.db.sql(
-			"""select *
-			from `tabToDo` where (owner=%s or assigned_by=%s) and status="Open"
-			order by field(priority, 'High', 'Medium', 'Low') asc, date asc limit 20""",
-			(user_id, user_id),
-			as_dict=True,
-		)
-
-		for t in todo_list:
-			t.link = get_url_to_form("ToDo", t.name)
+		if self.get("_todo_lists") is None or user_id not in self._todo_lists:
+			self._todo_lists = get_todo_lists([user_id])
 
-		return todo_list
+		return self._todo_lists[user_id].todo_list
 
 	def get_todo_count(self, user_id=None):
 		"""Get count of Todo"""
 		if not user_id:
 			user_id = frappe.session.user
 
-		return frappe.db.sql(
-			"""select count(*) from `tabToDo`
-			where status='Open' and (owner=%s or assigned_by=%s)""",
-			(user_id, user_id),
-		)[0][0]
+		if self.get("_todo_lists") is None or user_id not in self._todo_lists:
+			self._todo_lists = get_todo_lists([user_id])
+
+		return self._todo_lists[user_id].todo_count
 
 	def get_issue_list(self, user_id=None):
 		"""Get issue list"""
@@ -230,52 +226,62 @@ class EmailDigest(Document):
 		if not role_permissions.get("read"):
 			return None
 
-		issue_list = frappe.db.sql(
-			"""select *
-			from `tabIssue` where status in ("Replied","Open")
-			order by modified asc limit 10""",
-			as_dict=True,
-		)
+		# open issues are the same for all recipients, only the permission is checked per user
+		if self.get("_issue_list") is None:
+			self._issue_list = frappe.db.sql(
+				"""select *
+				from `tabIssue` where status in ("Replied","Open")
+				order by modified asc limit 10""",
+				as_dict=True,
+			)
 
-		for t in issue_list:
-			t.link = get_url_to_form("Issue", t.name)
+			for t in self._issue_list:
+				t.link = get_url_to_form("Issue", t.name)
 
-		return issue_list
+		return self._issue_list
 
 	def get_issue_count(self):
 		"""Get count of Issue"""
-		return frappe.db.sql(
-			"""select count(*) from `tabIssue`
-			where status in ('Open','Replied') """
-		)[0][0]
+		if self.get("_issue_count") is None:
+			self._issue_count = frappe.db.sql(
+				"""select count(*) from `tabIssue`
+				where status in ('Open','Replied') """
+			)[0][0]
+
+		return self._issue_count
 
 	def get_project_list(self, user_id=None):
 		"""Get project list"""
-		if not user_id:
-			user_id = frappe.session.user
-
-		project_list = frappe.db.sql(
-			"""select *
-			from `tabProject` where status='Open' and project_type='External'
-			order by modified asc limit 10""",
-			as_dict=True,
-		)
+		if self.get("_project_list") is None:
+			self._project_list = frappe.db.sql(
+				"""select *
+				from `tabProject` where status='Open' and project_type='External'
+				order by modified asc limit 10""",
+				as_dict=True,
+			)
 
-		for t in project_list:
-			t.link = get_url_to_form("Issue", t.name)
+			for t in self._project_list:
+				t.link = get_url_to_form("Issue", t.name)
 
-		return project_list
+		return self._project_list
 
 	def get_project_count(self):
 		"""Get count of Project"""
-		return frappe.db.sql(
-			"""select count(*) from `tabProject`
-			where status='Open' and project_type='External'"""
-		)[0][0]
+		if self.get("_project_count") is None:
+			self._project_count = frappe.db.sql(
+				"""select count(*) from `tabProject`
+				where status='Open' and project_type='External'"""
+			)[0][0]
+
+		return self._project_count
 
 	def set_accounting_cards(self, context):
 		"""Create accounting cards if checked"""
 
+		if self.get("_cards") is not None:
+			context.cards = self._cards
+			return
+
 		cache = frappe.cache()
 		context.cards = []
 		for key in (
@@ -303,12 +309,9 @@ class EmailDigest(Document):
 				cache_key = "email_digest:card:{0}:{1}:{2}:{3}".format(
 					self.company, self.frequency, key, self.from_date
 				)
-				card = cache.get(cache_key)
-
-				if card:
-					card = frappe.safe_eval(card)
+				card = cache.get_value(cache_key)
 
-				else:
+				if not card:
 					card = frappe._dict(getattr(self, "get_" + key)())
 
 					# format values
@@ -348,9 +351,17 @@ class EmailDigest(Document):
 
 				context.cards.append(card)
 
+		# cards are the same for every recipient of the digest
+		self._cards = context.cards
+
 	def get_income(self):
 		"""Get income for given period"""
-		income, past_income, count = self.get_period_amounts(self.get_roots("income"), "income")
+		metrics = get_cached_metrics(self, get_profit_and_loss_metrics).get("Income", {})
+		income, past_income, count = (
+			flt(metrics.get("value")),
+			flt(metrics.get("last_value")),
+			cint(metrics.get("count")),
+		)
 
 		income_account = frappe.db.get_all(
 			"Account",
@@ -380,12 +391,9 @@ class EmailDigest(Document):
 
 	def get_year_to_date_balance(self, root_type, fieldname):
 		"""Get income to date"""
-		balance = 0.0
-		count = 0
-
-		for account in self.get_root_type_accounts(root_type):
-			balance += get_balance_on(account, date=self.future_to_date)
-			count += get_count_on(account, fieldname, date=self.future_to_date)
+		metrics = get_cached_metrics(self, get_profit_and_loss_metrics).get(root_type.title(), {})
+		balance = flt(metrics.get("year_to_date"))
+		count = cint(metrics.get("year_to_date_count"))
 
 		if fieldname == "income":
 			filters = {"currency": self.currency}
@@ -420,8 +428,11 @@ class EmailDigest(Document):
 		return self.get_type_balance("invoiced_amount", "Receivable")
 
 	def get_expenses_booked(self):
-		expenses, past_expenses, count = self.get_period_amounts(
-			self.get_roots("expense"), "expenses_booked"
+		metrics = get_cached_metrics(self, get_profit_and_loss_metrics).get("Expense", {})
+		expenses, past_expenses, count = (
+			flt(metrics.get("value")),
+			flt(metrics.get("last_value")),
+			cint(metrics.get("count")),
 		)
 
 		expense_account = frappe.db.get_all(
@@ -442,27 +453,11 @@ class EmailDigest(Document):
 		)
 		return {"label": label, "value": expenses, "last_value": past_expenses, "count": count}
 
-	def get_period_amounts(self, accounts, fieldname):
-		"""Get amounts for current and past periods"""
-		balance = past_balance = 0.0
-		count = 0
-		for account in accounts:
-			balance += get_incomes_expenses_for_period(account, self.future_from_date, self.future_to_date)
-			past_balance += get_incomes_expenses_for_period(account, self.past_from_date, self.past_to_date)
-			count += get_count_for_period(account, fieldname, self.future_from_date, self.future_to_date)
-
-		return balance, past_balance, count
-
 	def get_sales_orders_to_bill(self):
 		"""Get value not billed"""
 
-		value, count = frappe.db.sql(
-			"""select ifnull((sum(grand_total)) - (sum(grand_total*per_billed/100)),0),
-                    count(*) from `tabSales Order`
-					where (transaction_date <= %(to_date)s) and billing_status != "Fully Billed" and company = %(company)s
-					and status not in ('Closed','Cancelled', 'Completed') """,
-			{"to_date": self.future_to_date, "company": self.company},
-		)[0]
+		totals = get_cached_metrics(self, get_open_order_totals, "Sales Order")
+		value, count = totals.value_to_bill, totals.count_to_bill
 
 		label = get_link_to_report(
 			"Sales Order",
@@ -482,13 +477,8 @@ class EmailDigest(Document):
 	def get_sales_orders_to_deliver(self):
 		"""Get value not delivered"""
 
-		value, count = frappe.db.sql(
-			"""select ifnull((sum(grand_total)) - (sum(grand_total*per_delivered/100)),0),
-					count(*) from `tabSales Order`
-					where (transaction_date <= %(to_date)s) and delivery_status != "Fully Delivered" and company = %(company)s
-					and status not in ('Closed','Cancelled', 'Completed') """,
-			{"to_date": self.future_to_date, "company": self.company},
-		)[0]
+		totals = get_cached_metrics(self, get_open_order_totals, "Sales Order")
+		value, count = totals.value_to_deliver, totals.count_to_deliver
 
 		label = get_link_to_report(
 			"Sales Order",
@@ -508,13 +498,8 @@ class EmailDigest(Document):
 	def get_purchase_orders_to_receive(self):
 		"""Get value not received"""
 
-		value, count = frappe.db.sql(
-			"""select ifnull((sum(grand_total))-(sum(grand_total*per_received/100)),0),
-                    count(*) from `tabPurchase Order`
-					where (transaction_date <= %(to_date)s) and per_received < 100 and company = %(company)s
-					and status not in ('Closed','Cancelled', 'Completed') """,
-			{"to_date": self.future_to_date, "company": self.company},
-		)[0]
+		totals = get_cached_metrics(self, get_open_order_totals, "Purchase Order")
+		value, count = totals.value_to_deliver, totals.count_to_deliver
 
 		label = get_link_to_report(
 			"Purchase Order",
@@ -534,13 +519,8 @@ class EmailDigest(Document):
 	def get_purchase_orders_to_bill(self):
 		"""Get purchase not billed"""
 
-		value, count = frappe.db.sql(
-			"""select ifnull((sum(grand_total)) - (sum(grand_total*per_billed/100)),0),
-                    count(*) from `tabPurchase Order`
-					where (transaction_date <= %(to_date)s) and per_billed < 100 and company = %(company)s
-					and status not in ('Closed','Cancelled', 'Completed') """,
-			{"to_date": self.future_to_date, "company": self.company},
-		)[0]
+		totals = get_cached_metrics(self, get_open_order_totals, "Purchase Order")
+		value, count = totals.value_to_bill, totals.count_to_bill
 
 		label = get_link_to_report(
 			"Purchase Order",
@@ -558,34 +538,12 @@ class EmailDigest(Document):
 		return {"label": label, "value": value, "count": count}
 
 	def get_type_balance(self, fieldname, account_type, root_type=None):
+		balances = get_cached_metrics(self, get_account_type_balances).get(fieldname, {})
+		balance, prev_balance = balances.get("value", 0.0), balances.get("last_value", 0.0)
 
-		if root_type:
-			accounts = [
-				d.name
-				for d in frappe.db.get_all(
-					"Account",
-					filters={
-						"account_type": account_type,
-						"company": self.company,
-						"is_group": 0,
-						"root_type": root_type,
-					},
-				)
-			]
-		else:
-			accounts = [
-				d.name
-				for d in frappe.db.get_all(
-					"Account", filters={"account_type": account_type, "company": self.company, "is_group": 0}
-				)
-			]
-
-		balance = prev_balance = 0.0
 		count = 0
-		for account in accounts:
-			balance += get_balance_on(account, date=self.future_to_date, in_account_currency=False)
-			count += get_count_on(account, fieldname, date=self.future_to_date)
-			prev_balance += get_balance_on(account, date=self.past_to_date, in_account_currency=False)
+		if fieldname in ("payables", "invoiced_amount"):
+			count = get_cached_metrics(self, get_outstanding_entry_count, fieldname)
 
 		if fieldname in ("bank_balance", "credit_balance"):
 			label = ""
@@ -708,22 +666,20 @@ class EmailDigest(Document):
 
 	def get_summary_of_pending_quotations(self, fieldname):
 
-		value, count = frappe.db.sql(
-			"""select ifnull(sum(grand_total),0), count(*) from `tabQuotation`
+		value, count, last_value = frappe.db.sql(
+			"""select ifnull(sum(grand_total),0), count(*),
+			ifnull(sum(case when transaction_date <= %(past_to_date)s then grand_total end),0)
+			from `tabQuotation`
 			where (transaction_date <= %(to_date)s)
 			and company = %(company)s
 			and status not in ('Ordered','Cancelled', 'Lost') """,
-			{"to_date": self.future_to_date, "company": self.company},
+			{
+				"to_date": self.future_to_date,
+				"past_to_date": self.past_to_date,
+				"company": self.company,
+			},
 		)[0]
 
-		last_value = frappe.db.sql(
-			"""select ifnull(sum(grand_total),0) from `tabQuotation`
-			where (transaction_date <= %(to_date)s)
-			and company = %(company)s
-			and status not in ('Ordered','Cancelled', 'Lost') """,
-			{"to_date": self.past_to_date, "company": self.company},
-		)[0][0]
-
 		label = get_link_to_report(
 			"Quotation",
 			label=self.meta.get_label(fieldname),
@@ -745,14 +701,8 @@ class EmailDigest(Document):
 			"posting_date" if doc_type in ["Sales Invoice", "Purchase Invoice"] else "transaction_date"
 		)
 
-		value = flt(
-			self.get_total_on(doc_type, self.future_from_date, self.future_to_date)[0].grand_total
-		)
-		count = self.get_total_on(doc_type, self.future_from_date, self.future_to_date)[0].count
-
-		last_value = flt(
-			self.get_total_on(doc_type, self.past_from_date, self.past_to_date)[0].grand_total
-		)
+		totals = get_cached_metrics(self, get_document_totals, doc_type)
+		value, count, last_value = flt(totals.value), totals.count, flt(totals.last_value)
 
 		filters = {
 			date_field: [[">=", self.future_from_date], ["<=", self.future_to_date]],
@@ -894,41 +844,186 @@ def get_digest_msg(name):
 	return frappe.get_doc("Email Digest", name).get_msg_html()
 
 
-def get_incomes_expenses_for_period(account, from_date, to_date):
-	"""Get amounts for current and past periods"""
-
-	val = 0.0
-	balance_on_to_date = get_balance_on(account, date=to_date)
-	balance_before_from_date = get_balance_on(account, date=from_date - timedelta(days=1))
+def get_cached_metrics(digest, method, *args):
+	"""Returns `method(digest, *args)`, the company-level figures behind one or more cards. These
+	are computed once per company, frequency and period and shared by all digests and recipients"""
+	cache_key = "email_digest:metrics:{0}:{1}:{2}:{3}".format(
+		digest.company, digest.frequency, digest.from_date, ":".join((method.__name__,) + args)
+	)
+
+	metrics = frappe.cache().get_value(cache_key)
+	if metrics is None:
+		metrics = method(digest, *args)
+		frappe.cache().set_value(cache_key, metrics, expires_in_sec=24 * 60 * 60)
+
+	return metrics
+
+
+def get_profit_and_loss_metrics(digest):
+	"""Income and expense of the period, of the previous period and of the fiscal year to date,
+	by root type, in one pass over the GL Entries. Period Closing Vouchers are excluded as in
+	`get_balance_on` for profit and loss accounts."""
+	fy_start_date = get_fiscal_year(digest.future_to_date, company=digest.company)[1]
+
+	metrics = frappe.db.sql(
+		"""
+		select acc.root_type,
+			sum(case when gle.posting_date >= %(from_date)s
+				then gle.debit - gle.credit else 0 end) as value,
+			sum(case when gle.posting_date between %(past_from_date)s and %(past_to_date)s
+				then gle.debit - gle.credit else 0 end) as last_value,
+			sum(case when gle.posting_date >= %(from_date)s then 1 else 0 end) as count,
+			sum(case when gle.posting_date >= %(fy_start_date)s
+				then gle.debit_in_account_currency - gle.credit_in_account_currency
+				else 0 end) as year_to_date,
+			sum(case when gle.posting_date >= %(fy_start_date)s then 1 else 0 end) as year_to_date_count
+		from `tabGL Entry` gle, `tabAccount` acc
+		where gle.account = acc.name and acc.company = %(company)s
+			and acc.root_type in ('Income', 'Expense')
+			and gle.is_cancelled = 0 and gle.voucher_type != 'Period Closing Voucher'
+			and gle.posting_date between %(start_date)s and %(to_date)s
+		group by acc.root_type""",
+		{
+			"company": digest.company,
+			"from_date": digest.future_from_date,
+			"to_date": digest.future_to_date,
+			"past_from_date": digest.past_from_date,
+			"past_to_date": digest.past_to_date,
+			"fy_start_date": fy_start_date,
+			"start_date": min(digest.past_from_date, fy_start_date),
+		},
+		as_dict=True,
+	)
+
+	return {d.root_type: d for d in metrics}
+
+
+def get_account_type_balances(digest):
+	"""Balances of bank, credit, payable and receivable accounts at the end of the period and
+	of the previous period"""
+	accounts = frappe.get_all(
+		"Account",
+		filters={
+			"account_type": ("in", ("Bank", "Payable", "Receivable")),
+			"company": digest.company,
+			"is_group": 0,
+		},
+		fields=["name", "account_type", "root_type"],
+	)
+
+	account_names = [d.name for d in accounts]
+	balances = get_balances_on(
+		account_names, date=digest.future_to_date, company=digest.company, in_account_currency=False
+	)
+	past_balances = get_balances_on(
+		account_names, date=digest.past_to_date, company=digest.company, in_account_currency=False
+	)
+
+	metrics = {}
+	for d in accounts:
+		if d.account_type == "Bank":
+			fieldname = {"Asset": "bank_balance", "Liability": "credit_balance"}.get(d.root_type)
+		else:
+			fieldname = "payables" if d.account_type == "Payable" else "invoiced_amount"
 
-	fy_start_date = get_fiscal_year(to_date)[1]
+		if fieldname:
+			metric = metrics.setdefault(
+				fieldname, frappe._dict(value=0.0, last_value=0.0, accounts=[])
+			)
+			metric.value += flt(balances.get(d.name))
+			metric.last_value += flt(past_balances.get(d.name))
+			metric.accounts.append(d.name)
 
-	if from_date == fy_start_date:
-		val = balance_on_to_date
-	elif from_date > fy_start_date:
-		val = balance_on_to_date - balance_before_from_date
-	else:
-		last_year_closing_balance = get_balance_on(account, date=fy_start_date - timedelta(days=1))
-		val = balance_on_to_date + (last_year_closing_balance - balance_before_from_date)
+	return metrics
 
-	return val
 
+def get_outstanding_entry_count(digest, fieldname):
+	accounts = get_cached_metrics(digest, get_account_type_balances).get(fieldname, {})
+	return sum(
+		get_count_on(account, fieldname, date=digest.future_to_date)
+		for account in accounts.get("accounts", [])
+	)
 
-def get_count_for_period(account, fieldname, from_date, to_date):
-	count = 0.0
-	count_on_to_date = get_count_on(account, fieldname, to_date)
-	count_before_from_date = get_count_on(account, fieldname, from_date - timedelta(days=1))
 
-	fy_start_date = get_fiscal_year(to_date)[1]
-	if from_date == fy_start_date:
-		count = count_on_to_date
-	elif from_date > fy_start_date:
-		count = count_on_to_date - count_before_from_date
+def get_open_order_totals(digest, doctype):
+	"""Value and count of open orders yet to be billed, and yet to be delivered (or received)"""
+	if doctype == "Sales Order":
+		to_bill = "billing_status != 'Fully Billed'"
+		to_deliver = "delivery_status != 'Fully Delivered'"
+		per_delivered = "per_delivered"
 	else:
-		last_year_closing_count = get_count_on(account, fieldname, fy_start_date - timedelta(days=1))
-		count = count_on_to_date + (last_year_closing_count - count_before_from_date)
-
-	return count
+		to_bill = "per_billed < 100"
+		to_deliver = "per_received < 100"
+		per_delivered = "per_received"
+
+	return frappe.db.sql(
+		"""
+		select
+			ifnull(sum(case when {to_bill}
+				then grand_total - grand_total*per_billed/100 end), 0) as value_to_bill,
+			count(case when {to_bill} then name end) as count_to_bill,
+			ifnull(sum(case when {to_deliver}
+				then grand_total - grand_total*{per_delivered}/100 end), 0) as value_to_deliver,
+			count(case when {to_deliver} then name end) as count_to_deliver
+		from `tab{doctype}`
+		where (transaction_date <= %(to_date)s) and company = %(company)s
+			and status not in ('Closed','Cancelled', 'Completed')""".format(
+			to_bill=to_bill, to_deliver=to_deliver, per_delivered=per_delivered, doctype=doctype
+		),
+		{"to_date": digest.future_to_date, "company": digest.company},
+		as_dict=True,
+	)[0]
+
+
+def get_document_totals(digest, doctype):
+	"""Total and count of the documents of the period, and total of the previous period"""
+	date_field = (
+		"posting_date" if doctype in ["Sales Invoice", "Purchase Invoice"] else "transaction_date"
+	)
+
+	return frappe.db.sql(
+		"""
+		select
+			sum(case when {date_field} >= %(from_date)s then grand_total end) as value,
+			count(case when {date_field} >= %(from_date)s then name end) as count,
+			sum(case when {date_field} <= %(past_to_date)s then grand_total end) as last_value
+		from `tab{doctype}`
+		where {date_field} between %(past_from_date)s and %(to_date)s
+			and status != 'Cancelled' and company = %(company)s""".format(
+			date_field=date_field, doctype=doctype
+		),
+		{
+			"company": digest.company,
+			"from_date": digest.future_from_date,
+			"to_date": digest.future_to_date,
+			"past_from_date": digest.past_from_date,
+			"past_to_date": digest.past_to_date,
+		},
+		as_dict=True,
+	)[0]
+
+
+def get_todo_lists(users):
+	"""Returns {user: open ToDo list and count} for many users in one query"""
+	todo_lists = {user: frappe._dict(todo_list=[], todo_count=0) for user in users}
+
+	todos = frappe.db.sql(
+		"""select *
+		from `tabToDo` where (owner in %(users)s or assigned_by in %(users)s) and status="Open"
+		order by field(priority, 'High', 'Medium', 'Low') asc, date asc""",
+		{"users": tuple(users)},
+		as_dict=True,
+	)
+
+	for t in todos:
+		t.link = get_url_to_form("ToDo", t.name)
+		for user in {t.owner, t.assigned_by}:
+			if user in todo_lists:
+				todo_lists[user].todo_count += 1
+				if len(todo_lists[user].todo_list) < 20:
+					todo_lists[user].todo_list.append(t)
+
+	return todo_lists
 
 
 def get_future_date_for_calendaer_event(frequency):
@@ -38,6 +38,25 @@ class TestTransactionDeletionRecord(unittest.TestCase):
 		tasks_containing_company = frappe.get_all("Task", filters={"company": "Dunder Mifflin Paper Co"})
 		self.assertEqual(tasks_containing_company, [])
 
+	def test_batch_bins_are_deleted(self):
+		warehouse = frappe.db.get_value(
+			"Warehouse", {"company": "Dunder Mifflin Paper Co", "is_group": 0}
+		)
+		batch_bin = frappe.get_doc(
+			{
+				"doctype": "Batch Bin",
+				"item_code": "_Test Item",
+				"warehouse": warehouse,
+				"batch_no": "_Test Deleted Batch",
+				"actual_qty": 10,
+			}
+		)
+		batch_bin.flags.ignore_links = True
+		batch_bin.insert()
+
+		create_transaction_deletion_request("Dunder Mifflin Paper Co")
+		self.assertFalse(frappe.db.exists("Batch Bin", {"warehouse": warehouse}))
+
 
 def create_company(company_name):
 	company = frappe.get_doc(
@@ -30,6 +30,7 @@ class TransactionDeletionRecord(Document):
 			self.populate_doctypes_to_be_ignored_table()
 
 		self.delete_bins()
+		self.delete_batch_bins()
 		self.delete_lead_addresses()
 		self.reset_company_values()
 		clear_notifications()
@@ -47,6 +48,13 @@ class TransactionDeletionRecord(Document):
 			self.company,
 		)
 
+	def delete_batch_bins(self):
+		frappe.db.sql(
+			"""delete from `tabBatch Bin` where warehouse in
+				(select name from tabWarehouse where company=%s)""",
+			self.company,
+		)
+
 	def delete_lead_addresses(self):
 		"""Delete addresses to which leads are linked"""
 		leads = frappe.get_all("Lead", filters={"company": self.company})
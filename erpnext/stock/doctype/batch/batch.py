@@ -178,42 +178,40 @@ def get_batch_qty(
 
 	out = 0
 	if batch_no and warehouse:
-		cond = ""
 		if posting_date and posting_time:
-			cond = " and timestamp(posting_date, posting_time) <= timestamp('{0}', '{1}')".format(
-				posting_date, posting_time
+			out = float(
+				frappe.db.sql(
+					"""select sum(actual_qty)
+				from `tabStock Ledger Entry`
+				where is_cancelled = 0 and warehouse=%s and batch_no=%s
+					and timestamp(posting_date, posting_time) <= timestamp(%s, %s)""",
+					(warehouse, batch_no, posting_date, posting_time),
+				)[0][0]
+				or 0
+			)
+		else:
+			# current balances are maintained in Batch Bin
+			out = float(
+				frappe.db.get_value(
+					"Batch Bin", {"batch_no": batch_no, "warehouse": warehouse}, "sum(actual_qty)"
+				)
+				or 0
 			)
-
-		out = float(
-			frappe.db.sql(
-				"""select sum(actual_qty)
-			from `tabStock Ledger Entry`
-			where is_cancelled = 0 and warehouse=%s and batch_no=%s {0}""".format(
-					cond
-				),
-				(warehouse, batch_no),
-			)[0][0]
-			or 0
-		)
 
 	if batch_no and not warehouse:
-		out = frappe.db.sql(
-			"""select warehouse, sum(actual_qty) as qty
-			from `tabStock Ledger Entry`
-			where is_cancelled = 0 and batch_no=%s
-			group by warehouse""",
-			batch_no,
-			as_dict=1,
+		out = frappe.get_all(
+			"Batch Bin",
+			filters={"batch_no": batch_no},
+			fields=["warehouse", "sum(actual_qty) as qty"],
+			group_by="warehouse",
 		)
 
 	if not batch_no and item_code and warehouse:
-		out = frappe.db.sql(
-			"""select batch_no, sum(actual_qty) as qty
-			from `tabStock Ledger Entry`
-			where is_cancelled = 0 and item_code = %s and warehouse=%s
-			group by batch_no""",
-			(item_code, warehouse),
-			as_dict=1,
+		out = frappe.get_all(
+			"Batch Bin",
+			filters={"item_code": item_code, "warehouse": warehouse},
+			fields=["batch_no", "sum(actual_qty) as qty"],
+			group_by="batch_no",
 		)
 
 	return out
@@ -329,12 +327,10 @@ def get_batches(item_code, warehouse, qty=1, throw=False, serial_no=None):
 
 	return frappe.db.sql(
 		"""
-		select batch_id, sum(`tabStock Ledger Entry`.actual_qty) as qty
+		select batch_id, sum(`tabBatch Bin`.actual_qty) as qty
 		from `tabBatch`
-			join `tabStock Ledger Entry` ignore index (item_code, warehouse)
-				on (`tabBatch`.batch_id = `tabStock Ledger Entry`.batch_no )
-		where `tabStock Ledger Entry`.item_code = %s and `tabStock Ledger Entry`.warehouse = %s
-			and `tabStock Ledger Entry`.is_cancelled = 0
+			join `tabBatch Bin` on (`tabBatch`.batch_id = `tabBatch Bin`.batch_no)
+		where `tabBatch Bin`.item_code = %s and `tabBatch Bin`.warehouse = %s
 			and (`tabBatch`.expiry_date >= CURDATE() or `tabBatch`.expiry_date IS NULL) {0}
 		group by batch_id
 		order by `tabBatch`.expiry_date ASC, `tabBatch`.creation ASC
@@ -0,0 +1,110 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import cint, flt
+
+
+class BatchBin(Document):
+	pass
+
+
+def update_batch_bin_qty(item_code, warehouse, batch_no, qty):
+	"""Adds `qty` to the quantity of the batch of the item in the warehouse"""
+	batch_bin_name = get_or_make_batch_bin(item_code, warehouse, batch_no)
+
+	batch_bin = frappe.qb.DocType("Batch Bin")
+	(
+		frappe.qb.update(batch_bin)
+		.set(batch_bin.actual_qty, batch_bin.actual_qty + flt(qty))
+		.where(batch_bin.name == batch_bin_name)
+	).run()
+
+
+def get_or_make_batch_bin(item_code, warehouse, batch_no):
+	filters = {"item_code": item_code, "warehouse": warehouse, "batch_no": batch_no}
+	batch_bin_name = frappe.db.get_value("Batch Bin", filters)
+	if batch_bin_name:
+		return batch_bin_name
+
+	# take care of concurrent inserts, like Bin
+	savepoint = "create_batch_bin"
+	try:
+		frappe.db.savepoint(savepoint)
+		batch_bin = frappe.get_doc(dict(doctype="Batch Bin", **filters))
+		batch_bin.flags.ignore_permissions = 1
+		batch_bin.insert()
+	except frappe.UniqueValidationError:
+		frappe.db.rollback(save_point=savepoint)
+		batch_bin = frappe.get_last_doc("Batch Bin", filters)
+
+	return batch_bin.name
+
+
+def get_batch_qty_from_sle():
+	"""Returns {(item_code, warehouse, batch_no): qty} summed from the Stock Ledger Entries"""
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	entries = (
+		frappe.qb.from_(sle)
+		.select(sle.item_code, sle.warehouse, sle.batch_no, Sum(sle.actual_qty))
+		.where((sle.is_cancelled == 0) & (sle.batch_no.isnotnull()) & (sle.batch_no != ""))
+		.groupby(sle.item_code, sle.warehouse, sle.batch_no)
+	).run()
+
+	return {
+		(item_code, warehouse, batch_no): flt(qty) for item_code, warehouse, batch_no, qty in entries
+	}
+
+
+def verify_batch_bins():
+	"""Returns the batches whose Batch Bin quantity does not match the Stock Ledger Entries,
+	as (item_code, warehouse, batch_no, batch bin qty, stock ledger qty)"""
+	precision = cint(frappe.db.get_default("float_precision")) or 3
+	ledger_qty = get_batch_qty_from_sle()
+	batch_bin_qty = {
+		(d.item_code, d.warehouse, d.batch_no): flt(d.actual_qty)
+		for d in frappe.get_all("Batch Bin", fields=["item_code", "warehouse", "batch_no", "actual_qty"])
+	}
+
+	mismatches = []
+	for key in sorted(set(ledger_qty) | set(batch_bin_qty)):
+		if flt(batch_bin_qty.get(key), precision) != flt(ledger_qty.get(key), precision):
+			mismatches.append((*key, batch_bin_qty.get(key), ledger_qty.get(key)))
+
+	return mismatches
+
+
+def rebuild_batch_bins():
+	"""Rebuilds the Batch Bins from the Stock Ledger Entries"""
+	frappe.db.delete("Batch Bin")
+
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		"Batch Bin",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"item_code",
+			"warehouse",
+			"batch_no",
+			"actual_qty",
+		],
+		values=[
+			(frappe.generate_hash(length=10), now, now, "Administrator", "Administrator", *key, qty)
+			for key, qty in get_batch_qty_from_sle().items()
+		],
+	)
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Batch Bin",
+		["item_code", "warehouse", "batch_no"],
+		constraint_name="unique_item_warehouse_batch",
+	)
+	frappe.db.add_index("Batch Bin", ["batch_no", "warehouse"])
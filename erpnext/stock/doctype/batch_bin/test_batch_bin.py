@@ -0,0 +1,37 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.stock.doctype.batch.batch import get_batch_qty
+from erpnext.stock.doctype.batch_bin.batch_bin import verify_batch_bins
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.stock.doctype.stock_entry.stock_entry_utils import make_stock_entry
+
+
+class TestBatchBin(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_batch_bin_qty(self):
+		item_code = make_item(
+			"_Test Batch Bin Item", {"has_batch_no": 1, "create_new_batch": 1, "is_stock_item": 1}
+		).name
+		source, target = "_Test Warehouse - _TC", "Stores - _TC"
+
+		receipt = make_stock_entry(item_code=item_code, to_warehouse=source, qty=10, rate=10)
+		batch_no = receipt.items[0].batch_no
+
+		transfer = make_stock_entry(
+			item_code=item_code, from_warehouse=source, to_warehouse=target, qty=4, batch_no=batch_no
+		)
+		self.assertEqual(get_batch_qty(batch_no, source), 6)
+		self.assertEqual(get_batch_qty(batch_no, target), 4)
+		self.assertEqual(frappe.db.get_value("Batch", batch_no, "batch_qty"), 10)
+
+		transfer.cancel()
+		self.assertEqual(
+			{d.warehouse: d.qty for d in get_batch_qty(batch_no)}, {source: 10, target: 0}
+		)
+		self.assertFalse([d for d in verify_batch_bins() if d[0] == item_code])
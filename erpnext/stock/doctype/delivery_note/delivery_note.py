@@ -14,6 +14,7 @@ from erpnext.controllers.accounts_controller import get_taxes_and_charges
 from erpnext.controllers.selling_controller import SellingController
 from erpnext.stock.doctype.batch.batch import set_batch_nos
 from erpnext.stock.doctype.serial_no.serial_no import get_delivery_note_serial_no
+from erpnext.utilities.instrumentation import instrument
 
 form_grid_templates = {"items": "templates/form_grid/item_grid.html"}
 
@@ -123,6 +124,7 @@ class DeliveryNote(SellingController):
 				if not d.against_sales_order:
 					frappe.throw(_("Sales Order required for Item {0}").format(d.item_code))
 
+	@instrument
 	def validate(self):
 		self.validate_posting_time()
 		super(DeliveryNote, self).validate()
@@ -225,6 +227,7 @@ class DeliveryNote(SellingController):
 					d.actual_qty = flt(bin_qty.actual_qty)
 					d.projected_qty = flt(bin_qty.projected_qty)
 
+	@instrument
 	def on_submit(self):
 		self.validate_packed_qty()
 
@@ -247,6 +250,7 @@ class DeliveryNote(SellingController):
 		self.make_gl_entries()
 		self.repost_future_sle_and_gle()
 
+	@instrument
 	def on_cancel(self):
 		super(DeliveryNote, self).on_cancel()
 
@@ -440,6 +440,11 @@ class Item(Document):
 		)
 
 	def on_trash(self):
+		from erpnext.e_commerce.variant_selector.item_attribute_index import (
+			invalidate_attribute_index_for_item,
+		)
+
+		invalidate_attribute_index_for_item(self)
 		frappe.db.sql("""delete from tabBin where item_code=%s""", self.name)
 		frappe.db.sql("delete from `tabItem Price` where item_code=%s", self.name)
 		for variant_of in frappe.get_all("Item", filters={"variant_of": self.name}):
@@ -1115,12 +1120,17 @@ def get_last_purchase_details(item_code, doc_name=None, conversion_rate=1.0):
 
 def invalidate_cache_for_item(doc):
 	"""Invalidate Item Group cache and rebuild ItemVariantsCacheManager."""
+	from erpnext.e_commerce.variant_selector.item_attribute_index import (
+		invalidate_attribute_index_for_item,
+	)
+
 	invalidate_cache_for(doc, doc.item_group)
 
 	if doc.get("old_item_group") and doc.get("old_item_group") != doc.item_group:
 		invalidate_cache_for(doc, doc.old_item_group)
 
 	invalidate_item_variants_cache_for_website(doc)
+	invalidate_attribute_index_for_item(doc)
 
 
 def invalidate_item_variants_cache_for_website(doc):
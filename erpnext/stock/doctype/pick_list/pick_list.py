@@ -10,8 +10,11 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.model.mapper import map_child_doc
-from frappe.utils import cint, floor, flt, today
+from frappe.query_builder.functions import Coalesce
+from frappe.utils import ceil, cint, floor, flt, get_datetime, getdate, today
 from frappe.utils.nestedset import get_descendants_of
+from pypika.analytics import RowNumber
+from pypika.terms import Case
 
 from erpnext.selling.doctype.sales_order.sales_order import (
 	make_delivery_note as create_delivery_note_from_sales_order,
@@ -20,6 +23,9 @@ from erpnext.stock.get_item_details import get_conversion_factor
 
 # TODO: Prioritize SO or WO group warehouse
 
+MAX_EXPIRY_DATE = getdate("2200-01-01")
+MAX_PUTAWAY_PRIORITY = float("inf")
+
 
 class PickList(Document):
 	def validate(self):
@@ -122,7 +128,6 @@ class PickList(Document):
 	def set_item_locations(self, save=False):
 		self.validate_for_qty()
 		items = self.aggregate_item_qty()
-		self.item_location_map = frappe._dict()
 
 		from_warehouses = None
 		if self.parent_warehouse:
@@ -133,16 +138,12 @@ class PickList(Document):
 
 		# reset
 		self.delete_key("locations")
-		for item_doc in items:
-			item_code = item_doc.item_code
-
-			self.item_location_map.setdefault(
-				item_code,
-				get_available_item_locations(
-					item_code, from_warehouses, self.item_count_map.get(item_code), self.company
-				),
+		self.item_location_map = frappe._dict(
+			get_available_locations_for_items(
+				self.item_count_map, from_warehouses, self.company, pick_strategy=self.pick_strategy
 			)
-
+		)
+		for item_doc in items:
 			locations = get_items_with_location_and_quantity(
 				item_doc, self.item_location_map, self.docstatus
 			)
@@ -298,6 +299,7 @@ def get_items_with_location_and_quantity(item_doc, item_location_map, docstatus)
 	remaining_stock_qty = (
 		item_doc.qty if (docstatus == 1 and item_doc.stock_qty == 0) else item_doc.stock_qty
 	)
+	uom_must_be_whole_number = frappe.get_cached_value("UOM", item_doc.uom, "must_be_whole_number")
 
 	while remaining_stock_qty > 0 and available_locations:
 		item_location = available_locations.pop(0)
@@ -308,7 +310,6 @@ def get_items_with_location_and_quantity(item_doc, item_location_map, docstatus)
 		)
 		qty = stock_qty / (item_doc.conversion_factor or 1)
 
-		uom_must_be_whole_number = frappe.db.get_value("UOM", item_doc.uom, "must_be_whole_number")
 		if uom_must_be_whole_number:
 			qty = floor(qty)
 			stock_qty = qty * item_doc.conversion_factor
@@ -348,164 +349,253 @@ def get_items_with_location_and_quantity(item_doc, item_location_map, docstatus)
 
 
 def get_available_item_locations(
-	item_code, from_warehouses, required_qty, company, ignore_validation=False
+	item_code, from_warehouses, required_qty, company, ignore_validation=False, pick_strategy=None
 ):
-	locations = []
-	has_serial_no = frappe.get_cached_value("Item", item_code, "has_serial_no")
-	has_batch_no = frappe.get_cached_value("Item", item_code, "has_batch_no")
+	return get_available_locations_for_items(
+		{item_code: required_qty}, from_warehouses, company, ignore_validation, pick_strategy
+	).get(item_code, [])
 
-	if has_batch_no and has_serial_no:
-		locations = get_available_item_locations_for_serial_and_batched_item(
-			item_code, from_warehouses, required_qty, company
-		)
-	elif has_serial_no:
-		locations = get_available_item_locations_for_serialized_item(
-			item_code, from_warehouses, required_qty, company
-		)
-	elif has_batch_no:
-		locations = get_available_item_locations_for_batched_item(
-			item_code, from_warehouses, required_qty, company
-		)
-	else:
-		locations = get_available_item_locations_for_other_item(
-			item_code, from_warehouses, required_qty, company
-		)
 
-	total_qty_available = sum(location.get("qty") for location in locations)
+def get_available_locations_for_items(
+	required_qty_map, from_warehouses, company, ignore_validation=False, pick_strategy=None
+):
+	"""Returns {item_code: locations} with the stock available to pick for each item of
+	`required_qty_map` ({item_code: required stock qty}), ordered by `pick_strategy`.
+
+	The stock of all the items is fetched in one query per kind of item (serialized, batched,
+	both or neither), instead of one query per item."""
+	item_codes = list(required_qty_map)
+	if not item_codes:
+		return {}
+
+	items = frappe.get_all(
+		"Item",
+		filters={"name": ("in", item_codes)},
+		fields=["name", "has_serial_no", "has_batch_no"],
+	)
+	items_by_kind = defaultdict(list)
+	for item in items:
+		items_by_kind[(cint(item.has_serial_no), cint(item.has_batch_no))].append(item.name)
+
+	warehouses = from_warehouses or [
+		x.get("name") for x in frappe.get_list("Warehouse", {"company": company}, "name")
+	]
+	if not warehouses:
+		items_by_kind = {}
+
+	item_locations = defaultdict(list)
+	for (has_serial_no, has_batch_no), kind_item_codes in items_by_kind.items():
+		kind_required_qty = {item_code: required_qty_map[item_code] for item_code in kind_item_codes}
+		if has_serial_no and has_batch_no:
+			locations = get_available_locations_for_serial_and_batched_items(
+				kind_required_qty, warehouses, company
+			)
+		elif has_serial_no:
+			locations = get_available_locations_for_serialized_items(
+				kind_required_qty, warehouses, company
+			)
+		elif has_batch_no:
+			locations = get_available_locations_for_batched_items(kind_item_codes, warehouses)
+		else:
+			locations = get_available_locations_for_other_items(kind_item_codes, warehouses)
 
-	remaining_qty = required_qty - total_qty_available
+		for location in locations:
+			item_locations[location.item_code].append(location)
 
-	if remaining_qty > 0 and not ignore_validation:
-		frappe.msgprint(
-			_("{0} units of Item {1} is not available.").format(
-				remaining_qty, frappe.get_desk_link("Item", item_code)
-			),
-			title=_("Insufficient Stock"),
+	putaway_priority = {}
+	if pick_strategy == "Putaway Rule Priority":
+		putaway_priority = get_putaway_rule_priority(item_codes, company)
+
+	locations_map = {}
+	for item_code, required_qty in required_qty_map.items():
+		locations = sort_locations(
+			item_locations.get(item_code, []), required_qty, pick_strategy, putaway_priority
 		)
+		locations_map[item_code] = locations
 
-	return locations
+		remaining_qty = required_qty - sum(location.get("qty") for location in locations)
+		if remaining_qty > 0 and not ignore_validation:
+			frappe.msgprint(
+				_("{0} units of Item {1} is not available.").format(
+					remaining_qty, frappe.get_desk_link("Item", item_code)
+				),
+				title=_("Insufficient Stock"),
+			)
 
+	return locations_map
 
-def get_available_item_locations_for_serialized_item(
-	item_code, from_warehouses, required_qty, company
-):
-	filters = frappe._dict({"item_code": item_code, "company": company, "warehouse": ["!=", ""]})
-
-	if from_warehouses:
-		filters.warehouse = ["in", from_warehouses]
-
-	serial_nos = frappe.get_all(
-		"Serial No",
-		fields=["name", "warehouse"],
-		filters=filters,
-		limit=required_qty,
-		order_by="purchase_date",
-		as_list=1,
-	)
 
-	warehouse_serial_nos_map = frappe._dict()
-	for serial_no, warehouse in serial_nos:
-		warehouse_serial_nos_map.setdefault(warehouse, []).append(serial_no)
+def sort_locations(locations, required_qty, pick_strategy=None, putaway_priority=None):
+	"""Orders the locations of an item in the order they should be picked from.
 
-	locations = []
-	for warehouse, serial_nos in warehouse_serial_nos_map.items():
-		locations.append({"qty": len(serial_nos), "warehouse": warehouse, "serial_no": serial_nos})
+	First Expiry First Out picks the batches expiring first, and otherwise the oldest stock.
+	Fewest Locations picks the smallest location that has all of `required_qty` if there is one,
+	and otherwise the largest locations first. Putaway Rule Priority picks from the warehouses in
+	the priority of the Putaway Rules of the item, with First Expiry First Out within them."""
 
-	return locations
+	def fefo_key(location):
+		return (location.expiry_date or MAX_EXPIRY_DATE, get_datetime(location.received_on))
 
+	locations = sorted(locations, key=fefo_key)
 
-def get_available_item_locations_for_batched_item(
-	item_code, from_warehouses, required_qty, company
-):
-	warehouse_condition = "and warehouse in %(warehouses)s" if from_warehouses else ""
-	batch_locations = frappe.db.sql(
-		"""
-		SELECT
-			sle.`warehouse`,
-			sle.`batch_no`,
-			SUM(sle.`actual_qty`) AS `qty`
-		FROM
-			`tabStock Ledger Entry` sle, `tabBatch` batch
-		WHERE
-			sle.batch_no = batch.name
-			and sle.`item_code`=%(item_code)s
-			and sle.`company` = %(company)s
-			and batch.disabled = 0
-			and sle.is_cancelled=0
-			and IFNULL(batch.`expiry_date`, '2200-01-01') > %(today)s
-			{warehouse_condition}
-		GROUP BY
-			sle.`warehouse`,
-			sle.`batch_no`,
-			sle.`item_code`
-		HAVING `qty` > 0
-		ORDER BY IFNULL(batch.`expiry_date`, '2200-01-01'), batch.`creation`
-	""".format(
-			warehouse_condition=warehouse_condition
-		),
-		{  # nosec
-			"item_code": item_code,
-			"company": company,
-			"today": today(),
-			"warehouses": from_warehouses,
-		},
-		as_dict=1,
-	)
+	if pick_strategy == "Fewest Locations":
+		locations.sort(key=lambda location: -flt(location.qty))
+		sufficient_locations = [location for location in locations if location.qty >= required_qty]
+		if sufficient_locations:
+			location = sufficient_locations[-1]
+			locations.remove(location)
+			locations.insert(0, location)
 
-	return batch_locations
+	elif pick_strategy == "Putaway Rule Priority" and putaway_priority:
+		# warehouses without a rule are picked from last
+		locations.sort(
+			key=lambda location: putaway_priority.get(
+				(location.item_code, location.warehouse), MAX_PUTAWAY_PRIORITY
+			)
+		)
+
+	return locations
 
 
-def get_available_item_locations_for_serial_and_batched_item(
-	item_code, from_warehouses, required_qty, company
-):
-	# Get batch nos by FIFO
-	locations = get_available_item_locations_for_batched_item(
-		item_code, from_warehouses, required_qty, company
+def get_putaway_rule_priority(item_codes, company):
+	"""Returns {(item_code, warehouse): priority} of the enabled Putaway Rules of the items"""
+	rules = frappe.get_all(
+		"Putaway Rule",
+		filters={"item_code": ("in", item_codes), "company": company, "disable": 0},
+		fields=["item_code", "warehouse", "priority"],
+	)
+	return {(rule.item_code, rule.warehouse): cint(rule.priority) for rule in rules}
+
+
+def get_available_locations_for_serialized_items(required_qty_map, warehouses, company):
+	serial_no = frappe.qb.DocType("Serial No")
+	query = (
+		frappe.qb.from_(serial_no)
+		.select(serial_no.name, serial_no.item_code, serial_no.warehouse, serial_no.purchase_date)
+		.where(
+			(serial_no.item_code.isin(list(required_qty_map)))
+			& (serial_no.company == company)
+			& (serial_no.warehouse.isin(warehouses))
+		)
 	)
 
-	filters = frappe._dict(
-		{"item_code": item_code, "company": company, "warehouse": ["!=", ""], "batch_no": ""}
+	return get_locations_from_serial_nos(
+		get_serial_nos_to_pick(query, serial_no.item_code, [serial_no.purchase_date], required_qty_map)
 	)
 
-	# Get Serial Nos by FIFO for Batch No
-	for location in locations:
-		filters.batch_no = location.batch_no
-		filters.warehouse = location.warehouse
-		location.qty = (
-			required_qty if location.qty > required_qty else location.qty
-		)  # if extra qty in batch
 
-		serial_nos = frappe.get_list(
-			"Serial No", fields=["name"], filters=filters, limit=location.qty, order_by="purchase_date"
+def get_available_locations_for_batched_items(item_codes, warehouses):
+	batch_bin = frappe.qb.DocType("Batch Bin")
+	batch = frappe.qb.DocType("Batch")
+	return (
+		frappe.qb.from_(batch_bin)
+		.join(batch)
+		.on(batch_bin.batch_no == batch.name)
+		.select(
+			batch_bin.item_code,
+			batch_bin.warehouse,
+			batch_bin.batch_no,
+			batch_bin.actual_qty.as_("qty"),
+			batch.expiry_date,
+			batch.creation.as_("received_on"),
+		)
+		.where(
+			(batch_bin.item_code.isin(item_codes))
+			& (batch_bin.warehouse.isin(warehouses))
+			& (batch_bin.actual_qty > 0)
+			& (batch.disabled == 0)
+			& ((batch.expiry_date.isnull()) | (batch.expiry_date > today()))
+		)
+	).run(as_dict=True)
+
+
+def get_available_locations_for_serial_and_batched_items(required_qty_map, warehouses, company):
+	serial_no = frappe.qb.DocType("Serial No")
+	batch = frappe.qb.DocType("Batch")
+	query = (
+		frappe.qb.from_(serial_no)
+		.join(batch)
+		.on(serial_no.batch_no == batch.name)
+		.select(
+			serial_no.name,
+			serial_no.item_code,
+			serial_no.warehouse,
+			serial_no.batch_no,
+			serial_no.purchase_date,
+			batch.expiry_date,
+		)
+		.where(
+			(serial_no.item_code.isin(list(required_qty_map)))
+			& (serial_no.company == company)
+			& (serial_no.warehouse.isin(warehouses))
+			& (batch.disabled == 0)
+			& ((batch.expiry_date.isnull()) | (batch.expiry_date > today()))
 		)
+	)
 
-		serial_nos = [sn.name for sn in serial_nos]
-		location.serial_no = serial_nos
+	# serial nos of the batches expiring first are kept
+	order_by = [Coalesce(batch.expiry_date, MAX_EXPIRY_DATE), serial_no.purchase_date]
+	return get_locations_from_serial_nos(
+		get_serial_nos_to_pick(query, serial_no.item_code, order_by, required_qty_map)
+	)
 
-	return locations
 
+def get_serial_nos_to_pick(query, item_code_field, order_by, required_qty_map):
+	"""Runs `query` on serial nos, keeping only as many serial nos of each item, first as per
+	`order_by`, as its qty in `required_qty_map`. Returns them ordered by purchase date."""
+	row_number = RowNumber().over(item_code_field)
+	for field in order_by:
+		row_number = row_number.orderby(field)
+
+	required_qty = Case()
+	for item_code, qty in required_qty_map.items():
+		required_qty = required_qty.when(item_code_field == item_code, ceil(flt(qty)))
+
+	serial_nos = query.select(row_number.as_("row_no"), required_qty.as_("required_qty"))
+	return (
+		frappe.qb.from_(serial_nos)
+		.select(serial_nos.star)
+		.where(serial_nos.row_no <= serial_nos.required_qty)
+		.orderby(serial_nos.purchase_date)
+	).run(as_dict=True)
+
+
+def get_locations_from_serial_nos(serial_nos):
+	"""Groups the serial nos, ordered by purchase date, by item, warehouse and batch"""
+	locations = OrderedDict()
+	for d in serial_nos:
+		key = (d.item_code, d.warehouse, d.get("batch_no"))
+		if key not in locations:
+			locations[key] = frappe._dict(
+				{
+					"item_code": d.item_code,
+					"warehouse": d.warehouse,
+					"batch_no": d.get("batch_no"),
+					"expiry_date": d.get("expiry_date"),
+					"received_on": d.purchase_date,
+					"qty": 0,
+					"serial_no": [],
+				}
+			)
 
-def get_available_item_locations_for_other_item(item_code, from_warehouses, required_qty, company):
-	# gets all items available in different warehouses
-	warehouses = [x.get("name") for x in frappe.get_list("Warehouse", {"company": company}, "name")]
+		locations[key].qty += 1
+		locations[key].serial_no.append(d.name)
 
-	filters = frappe._dict(
-		{"item_code": item_code, "warehouse": ["in", warehouses], "actual_qty": [">", 0]}
-	)
+	return list(locations.values())
 
-	if from_warehouses:
-		filters.warehouse = ["in", from_warehouses]
 
-	item_locations = frappe.get_all(
+def get_available_locations_for_other_items(item_codes, warehouses):
+	return frappe.get_all(
 		"Bin",
-		fields=["warehouse", "actual_qty as qty"],
-		filters=filters,
-		limit=required_qty,
+		fields=["item_code", "warehouse", "actual_qty as qty", "creation as received_on"],
+		filters={
+			"item_code": ("in", item_codes),
+			"warehouse": ("in", warehouses),
+			"actual_qty": (">", 0),
+		},
 		order_by="creation",
 	)
 
-	return item_locations
-
 
 @frappe.whitelist()
 def create_delivery_note(source_name, target_doc=None):
@@ -658,3 +658,28 @@ class TestPickList(FrappeTestCase):
 		self.assertEqual(dn.items[0].rate, 42)
 		so.reload()
 		self.assertEqual(so.per_delivered, 100)
+
+	def test_pick_list_strategies(self):
+		item_code = make_item().name
+		make_stock_entry(item=item_code, to_warehouse="_Test Warehouse - _TC", qty=5, basic_rate=100)
+		make_stock_entry(item=item_code, to_warehouse="_Test Warehouse 1 - _TC", qty=20, basic_rate=100)
+
+		def get_picked_locations(pick_strategy):
+			pick_list = frappe.get_doc(
+				{
+					"doctype": "Pick List",
+					"company": "_Test Company",
+					"purpose": "Material Transfer",
+					"pick_strategy": pick_strategy,
+					"locations": [{"item_code": item_code, "qty": 10, "stock_qty": 10, "conversion_factor": 1}],
+				}
+			)
+			pick_list.set_item_locations()
+			return [(d.warehouse, d.stock_qty) for d in pick_list.locations]
+
+		# oldest stock first
+		self.assertEqual(
+			get_picked_locations("First Expiry First Out"),
+			[("_Test Warehouse - _TC", 5), ("_Test Warehouse 1 - _TC", 5)],
+		)
+		self.assertEqual(get_picked_locations("Fewest Locations"), [("_Test Warehouse 1 - _TC", 10)])
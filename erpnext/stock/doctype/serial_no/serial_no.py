@@ -21,6 +21,9 @@ from frappe.utils import (
 )
 
 from erpnext.controllers.stock_controller import StockController
+from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+	make_serial_no_ledger_entries,
+)
 from erpnext.stock.get_item_details import get_reserved_qty_for_so
 
 
@@ -206,55 +209,45 @@ class SerialNo(StockController):
 		if not serial_no:
 			serial_no = self.name
 
-		for sle in frappe.db.sql(
-			"""
-			SELECT voucher_type, voucher_no,
-				posting_date, posting_time, incoming_rate, actual_qty, serial_no
-			FROM
-				`tabStock Ledger Entry`
-			WHERE
-				item_code=%s AND company = %s
-				AND is_cancelled = 0
-				AND (serial_no = %s
-					OR serial_no like %s
-					OR serial_no like %s
-					OR serial_no like %s
-				)
-			ORDER BY
-				posting_date desc, posting_time desc, creation desc""",
-			(
-				self.item_code,
-				self.company,
-				serial_no,
-				serial_no + "\n%",
-				"%\n" + serial_no,
-				"%\n" + serial_no + "\n%",
-			),
-			as_dict=1,
-		):
-			if serial_no.upper() in get_serial_nos(sle.serial_no):
-				if cint(sle.actual_qty) > 0:
-					sle_dict.setdefault("incoming", []).append(sle)
-				else:
-					sle_dict.setdefault("outgoing", []).append(sle)
+		sne = frappe.qb.DocType("Serial No Ledger Entry")
+		sl_entry = frappe.qb.DocType("Stock Ledger Entry")
+		for sle in (
+			frappe.qb.from_(sne)
+			.join(sl_entry)
+			.on(sl_entry.name == sne.stock_ledger_entry)
+			.select(
+				sl_entry.voucher_type,
+				sl_entry.voucher_no,
+				sl_entry.posting_date,
+				sl_entry.posting_time,
+				sl_entry.incoming_rate,
+				sl_entry.actual_qty,
+				sl_entry.serial_no,
+			)
+			.where(
+				(sne.serial_no == serial_no)
+				& (sne.item_code == self.item_code)
+				& (sne.company == self.company)
+				& (sne.is_cancelled == 0)
+				& (sl_entry.is_cancelled == 0)
+			)
+			.orderby(sl_entry.posting_date, order=frappe.qb.desc)
+			.orderby(sl_entry.posting_time, order=frappe.qb.desc)
+			.orderby(sl_entry.creation, order=frappe.qb.desc)
+		).run(as_dict=True):
+			if cint(sle.actual_qty) > 0:
+				sle_dict.setdefault("incoming", []).append(sle)
+			else:
+				sle_dict.setdefault("outgoing", []).append(sle)
 
 		return sle_dict
 
 	def on_trash(self):
-		sl_entries = frappe.db.sql(
-			"""select serial_no from `tabStock Ledger Entry`
-			where serial_no like %s and item_code=%s and is_cancelled=0""",
-			("%%%s%%" % self.name, self.item_code),
-			as_dict=True,
+		sle_exists = frappe.db.exists(
+			"Serial No Ledger Entry",
+			{"serial_no": self.name, "item_code": self.item_code, "is_cancelled": 0},
 		)
 
-		# Find the exact match
-		sle_exists = False
-		for d in sl_entries:
-			if self.name.upper() in get_serial_nos(d.serial_no):
-				sle_exists = True
-				break
-
 		if sle_exists:
 			frappe.throw(
 				_("Cannot delete Serial No {0}, as it is used in stock transactions").format(self.name)
@@ -304,27 +297,10 @@ def validate_serial_no(sle, item_det):
 					_("Duplicate Serial No entered for Item {0}").format(sle.item_code), SerialNoDuplicateError
 				)
 
+			serial_no_details = get_serial_no_details(serial_nos)
 			for serial_no in serial_nos:
-				if frappe.db.exists("Serial No", serial_no):
-					sr = frappe.db.get_value(
-						"Serial No",
-						serial_no,
-						[
-							"name",
-							"item_code",
-							"batch_no",
-							"sales_order",
-							"delivery_document_no",
-							"delivery_document_type",
-							"warehouse",
-							"purchase_document_type",
-							"purchase_document_no",
-							"company",
-							"status",
-						],
-						as_dict=1,
-					)
-
+				sr = serial_no_details.get(serial_no)
+				if sr:
 					if sr.item_code != sle.item_code:
 						if not allow_serial_nos_with_different_item(serial_no, sle):
 							frappe.throw(
@@ -453,6 +429,29 @@ def validate_serial_no(sle, item_det):
 			check_serial_no_validity_on_cancel(serial_no, sle)
 
 
+def get_serial_no_details(serial_nos):
+	"""Returns the Serial No records of `serial_nos`, keyed by the serial no in upper case"""
+	serial_no_details = frappe.get_all(
+		"Serial No",
+		filters={"name": ("in", serial_nos)},
+		fields=[
+			"name",
+			"item_code",
+			"batch_no",
+			"sales_order",
+			"delivery_document_no",
+			"delivery_document_type",
+			"warehouse",
+			"purchase_document_type",
+			"purchase_document_no",
+			"company",
+			"status",
+		],
+	)
+
+	return {d.name.upper(): d for d in serial_no_details}
+
+
 def check_serial_no_validity_on_cancel(serial_no, sle):
 	sr = frappe.db.get_value(
 		"Serial No", serial_no, ["name", "warehouse", "company", "status"], as_dict=1
@@ -548,6 +547,7 @@ def update_serial_nos(sle, item_det):
 	):
 		serial_nos = get_auto_serial_nos(item_det.serial_no_series, sle.actual_qty)
 		sle.db_set("serial_no", serial_nos)
+		make_serial_no_ledger_entries(sle)
 		validate_serial_no(sle, item_det)
 	if sle.serial_no:
 		auto_make_serial_nos(sle)
@@ -570,12 +570,13 @@ def get_new_serial_number(series):
 
 def auto_make_serial_nos(args):
 	serial_nos = get_serial_nos(args.get("serial_no"))
+	existing_serial_nos = get_serial_no_details(serial_nos)
 	created_numbers = []
 	voucher_type = args.get("voucher_type")
 	item_code = args.get("item_code")
 	for serial_no in serial_nos:
 		is_new = False
-		if frappe.db.exists("Serial No", serial_no):
+		if serial_no in existing_serial_nos:
 			sr = frappe.get_cached_doc("Serial No", serial_no)
 		elif args.get("actual_qty", 0) > 0:
 			sr = frappe.new_doc("Serial No")
@@ -0,0 +1,176 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import CombineDatetime, Sum
+from frappe.utils import cint, create_batch, flt
+
+
+class SerialNoLedgerEntry(Document):
+	pass
+
+
+def make_serial_no_ledger_entries(sle):
+	"""Records the movement of each serial no of the Stock Ledger Entry"""
+	from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
+
+	serial_nos = get_serial_nos(sle.get("serial_no"))
+	if not serial_nos:
+		return
+
+	now = frappe.utils.now()
+	actual_qty = 1 if flt(sle.actual_qty) > 0 else -1
+	frappe.db.bulk_insert(
+		"Serial No Ledger Entry",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"modified_by",
+			"serial_no",
+			"item_code",
+			"warehouse",
+			"batch_no",
+			"actual_qty",
+			"stock_ledger_entry",
+			"voucher_type",
+			"voucher_no",
+			"voucher_detail_no",
+			"posting_date",
+			"posting_time",
+			"company",
+			"is_cancelled",
+		],
+		values=[
+			(
+				frappe.generate_hash(length=10),
+				now,
+				now,
+				frappe.session.user,
+				frappe.session.user,
+				serial_no,
+				sle.item_code,
+				sle.warehouse,
+				sle.get("batch_no"),
+				actual_qty,
+				sle.name,
+				sle.voucher_type,
+				sle.voucher_no,
+				sle.get("voucher_detail_no"),
+				sle.posting_date,
+				sle.posting_time,
+				sle.company,
+				cint(sle.get("is_cancelled")),
+			)
+			for serial_no in serial_nos
+		],
+	)
+
+
+def cancel_serial_no_ledger_entries(voucher_type, voucher_no):
+	sne = frappe.qb.DocType("Serial No Ledger Entry")
+	(
+		frappe.qb.update(sne)
+		.set(sne.is_cancelled, 1)
+		.where(
+			(sne.voucher_type == voucher_type) & (sne.voucher_no == voucher_no) & (sne.is_cancelled == 0)
+		)
+	).run()
+
+
+def delete_serial_no_ledger_entries(voucher_type, voucher_no):
+	frappe.db.delete(
+		"Serial No Ledger Entry", {"voucher_type": voucher_type, "voucher_no": voucher_no}
+	)
+
+
+def get_serial_nos_in_stock(item_code, warehouse, posting_date, posting_time):
+	"""Returns the serial nos of the item in the warehouse before the posting time"""
+	sne = frappe.qb.DocType("Serial No Ledger Entry")
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	return (
+		frappe.qb.from_(sne)
+		.join(sle)
+		.on(sle.name == sne.stock_ledger_entry)
+		.select(sne.serial_no)
+		.where(
+			(sne.item_code == item_code)
+			& (sne.warehouse == warehouse)
+			& (sne.is_cancelled == 0)
+			& (sle.is_cancelled == 0)
+			& (
+				CombineDatetime(sne.posting_date, sne.posting_time)
+				< CombineDatetime(posting_date, posting_time)
+			)
+		)
+		.groupby(sne.serial_no)
+		.having(Sum(sne.actual_qty) > 0)
+	).run(pluck=True)
+
+
+def get_incoming_rates(serial_nos, company):
+	"""Returns the rate at which each of `serial_nos` was last received in the company,
+	keyed by the serial no in upper case"""
+	incoming_rates = {}
+	if not serial_nos:
+		return incoming_rates
+
+	sne = frappe.qb.DocType("Serial No Ledger Entry")
+	sle = frappe.qb.DocType("Stock Ledger Entry")
+	entries = (
+		frappe.qb.from_(sne)
+		.join(sle)
+		.on(sle.name == sne.stock_ledger_entry)
+		.select(sne.serial_no, sle.incoming_rate)
+		.where(
+			(sne.serial_no.isin(serial_nos))
+			& (sne.company == company)
+			& (sne.actual_qty > 0)
+			& (sne.is_cancelled == 0)
+			& (sle.is_cancelled == 0)
+		)
+		.orderby(sne.posting_date, order=frappe.qb.desc)
+	).run()
+
+	for serial_no, incoming_rate in entries:
+		incoming_rates.setdefault(serial_no.upper(), incoming_rate)
+
+	return incoming_rates
+
+
+def rebuild_serial_no_ledger():
+	"""Rebuilds the movements of all the serial nos from the Stock Ledger Entries"""
+	frappe.db.delete("Serial No Ledger Entry")
+
+	sle_names = frappe.get_all(
+		"Stock Ledger Entry", filters={"serial_no": ("is", "set")}, pluck="name", order_by="creation"
+	)
+	for batch in create_batch(sle_names, 1000):
+		for sle in frappe.get_all(
+			"Stock Ledger Entry",
+			filters={"name": ("in", batch)},
+			fields=[
+				"name",
+				"serial_no",
+				"item_code",
+				"warehouse",
+				"batch_no",
+				"actual_qty",
+				"voucher_type",
+				"voucher_no",
+				"voucher_detail_no",
+				"posting_date",
+				"posting_time",
+				"company",
+				"is_cancelled",
+			],
+		):
+			make_serial_no_ledger_entries(sle)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Serial No Ledger Entry", ["serial_no", "item_code"])
+	frappe.db.add_index("Serial No Ledger Entry", ["item_code", "warehouse"])
+	frappe.db.add_index("Serial No Ledger Entry", ["voucher_type", "voucher_no"])
@@ -0,0 +1,51 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from erpnext.stock.doctype.delivery_note.test_delivery_note import create_delivery_note
+from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
+from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+	get_serial_nos_in_stock,
+)
+from erpnext.stock.doctype.stock_entry.test_stock_entry import make_serialized_item
+
+
+class TestSerialNoLedgerEntry(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_serial_no_movements(self):
+		item_code = "_Test Serialized Item With Series"
+		warehouse = "_Test Warehouse - _TC"
+
+		se = make_serialized_item(target_warehouse=warehouse)
+		serial_nos = get_serial_nos(se.get("items")[0].serial_no)
+		self.assertEqual(get_movements(se), {serial_no: 1 for serial_no in serial_nos})
+
+		dn = create_delivery_note(item_code=item_code, qty=1, serial_no=serial_nos[0])
+		self.assertEqual(get_movements(dn), {serial_nos[0]: -1})
+
+		tomorrow = add_days(nowdate(), 1)
+		in_stock = get_serial_nos_in_stock(item_code, warehouse, tomorrow, "00:00:00")
+		self.assertNotIn(serial_nos[0], in_stock)
+		self.assertIn(serial_nos[1], in_stock)
+
+		dn.cancel()
+		self.assertEqual(get_movements(dn), {})
+		self.assertIn(
+			serial_nos[0], get_serial_nos_in_stock(item_code, warehouse, tomorrow, "00:00:00")
+		)
+
+
+def get_movements(voucher):
+	return dict(
+		frappe.get_all(
+			"Serial No Ledger Entry",
+			filters={"voucher_type": voucher.doctype, "voucher_no": voucher.name, "is_cancelled": 0},
+			fields=["serial_no", "actual_qty"],
+			as_list=True,
+		)
+	)
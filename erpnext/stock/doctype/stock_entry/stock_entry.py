@@ -34,6 +34,7 @@ from erpnext.stock.get_item_details import (
 )
 from erpnext.stock.stock_ledger import NegativeStockError, get_previous_sle, get_valuation_rate
 from erpnext.stock.utils import get_bin, get_incoming_rate
+from erpnext.utilities.instrumentation import instrument
 
 
 class FinishedGoodError(frappe.ValidationError):
@@ -79,7 +80,9 @@ class StockEntry(StockController):
 		if self.get("items") and apply_rule:
 			apply_putaway_rule(self.doctype, self.get("items"), self.company, purpose=self.purpose)
 
+	@instrument
 	def validate(self):
+		self._previous_sles = {}
 		self.pro_doc = frappe._dict()
 		if self.work_order:
 			self.pro_doc = frappe.get_doc("Work Order", self.work_order)
@@ -129,6 +132,7 @@ class StockEntry(StockController):
 			self.reset_default_field_value("from_warehouse", "items", "s_warehouse")
 			self.reset_default_field_value("to_warehouse", "items", "t_warehouse")
 
+	@instrument
 	def on_submit(self):
 		self.update_stock_ledger()
 
@@ -153,6 +157,7 @@ class StockEntry(StockController):
 		if self.purpose == "Material Transfer" and self.outgoing_stock_entry:
 			self.set_material_request_transfer_status("Completed")
 
+	@instrument
 	def on_cancel(self):
 		self.update_purchase_order_supplied_items()
 
@@ -558,14 +563,7 @@ class StockEntry(StockController):
 
 		for d in self.get("items"):
 			allow_negative_stock = is_negative_stock_allowed(item_code=d.item_code)
-			previous_sle = get_previous_sle(
-				{
-					"item_code": d.item_code,
-					"warehouse": d.s_warehouse or d.t_warehouse,
-					"posting_date": self.posting_date,
-					"posting_time": self.posting_time,
-				}
-			)
+			previous_sle = self.get_previous_sle(d.item_code, d.s_warehouse or d.t_warehouse)
 
 			# get actual stock at source warehouse
 			d.actual_qty = previous_sle.get("qty_after_transaction") or 0
@@ -706,6 +704,7 @@ class StockEntry(StockController):
 				"voucher_no": self.name,
 				"company": self.company,
 				"allow_zero_valuation": item.allow_zero_valuation_rate,
+				"previous_sle": self.get_previous_sle(item.item_code, item.s_warehouse or item.t_warehouse),
 			}
 		)
 
@@ -994,6 +993,7 @@ class StockEntry(StockController):
 					)
 				)
 
+	@instrument
 	def update_stock_ledger(self):
 		sl_entries = []
 		finished_item_row = self.get_finished_item_row()
@@ -2421,12 +2421,12 @@ def get_uom_details(item_code, uom, qty):
 @frappe.whitelist()
 def get_expired_batch_items():
 	return frappe.db.sql(
-		"""select b.item, sum(sle.actual_qty) as qty, sle.batch_no, sle.warehouse, sle.stock_uom\
-	from `tabBatch` b, `tabStock Ledger Entry` sle
+		"""select b.item, sum(bb.actual_qty) as qty, bb.batch_no, bb.warehouse, b.stock_uom\
+	from `tabBatch` b, `tabBatch Bin` bb
 	where b.expiry_date <= %s
 	and b.expiry_date is not NULL
-	and b.batch_id = sle.batch_no and sle.is_cancelled = 0
-	group by sle.warehouse, sle.item_code, sle.batch_no""",
+	and b.batch_id = bb.batch_no
+	group by bb.warehouse, bb.item_code, bb.batch_no""",
 		(nowdate()),
 		as_dict=1,
 	)
@@ -12,6 +12,10 @@ from frappe.utils import add_days, cint, formatdate, get_datetime, getdate
 
 from erpnext.accounts.utils import get_fiscal_year
 from erpnext.controllers.item_variant import ItemTemplateCannotHaveStock
+from erpnext.stock.doctype.batch_bin.batch_bin import update_batch_bin_qty
+from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+	make_serial_no_ledger_entries,
+)
 
 
 class StockFreezeError(frappe.ValidationError):
@@ -52,6 +56,7 @@ class StockLedgerEntry(Document):
 	def on_submit(self):
 		self.check_stock_frozen_date()
 		self.calculate_batch_qty()
+		make_serial_no_ledger_entries(self)
 
 		if not self.get("via_landed_cost_voucher"):
 			from erpnext.stock.doctype.serial_no.serial_no import process_serial_no
@@ -60,13 +65,9 @@ class StockLedgerEntry(Document):
 
 	def calculate_batch_qty(self):
 		if self.batch_no:
+			update_batch_bin_qty(self.item_code, self.warehouse, self.batch_no, self.actual_qty)
 			batch_qty = (
-				frappe.db.get_value(
-					"Stock Ledger Entry",
-					{"docstatus": 1, "batch_no": self.batch_no, "is_cancelled": 0},
-					"sum(actual_qty)",
-				)
-				or 0
+				frappe.db.get_value("Batch Bin", {"batch_no": self.batch_no}, "sum(actual_qty)") or 0
 			)
 			frappe.db.set_value("Batch", self.batch_no, "batch_qty", batch_qty)
 
@@ -23,7 +23,7 @@ from erpnext.stock.doctype.stock_ledger_entry.stock_ledger_entry import BackDate
 from erpnext.stock.doctype.stock_reconciliation.test_stock_reconciliation import (
 	create_stock_reconciliation,
 )
-from erpnext.stock.stock_ledger import get_previous_sle
+from erpnext.stock.stock_ledger import get_previous_sle, get_previous_sles
 from erpnext.stock.tests.test_utils import StockTestMixin
 
 
@@ -1159,6 +1159,46 @@ class TestStockLedgerEntry(FrappeTestCase, StockTestMixin):
 		backdated.cancel()
 		self.assertEqual([1], ordered_qty_after_transaction())
 
+	def test_previous_sles(self):
+		item = make_item().name
+		warehouses = ["_Test Warehouse - _TC", "Stores - _TC", "Finished Goods - _TC"]
+
+		make_stock_entry(
+			item_code=item, to_warehouse=warehouses[0], qty=10, rate=10, posting_date="2021-01-01"
+		)
+		make_stock_entry(
+			item_code=item, to_warehouse=warehouses[0], qty=5, rate=20, posting_date="2021-01-03"
+		)
+		make_stock_entry(
+			item_code=item,
+			from_warehouse=warehouses[0],
+			to_warehouse=warehouses[1],
+			qty=3,
+			posting_date="2021-01-02",
+		)
+
+		for posting_date in ["2020-12-31", "2021-01-02", "2021-01-05"]:
+			keys = [(item, warehouse) for warehouse in warehouses]
+			previous_sles = get_previous_sles(keys, posting_date, "00:00:00")
+
+			for key in keys:
+				previous_sle = get_previous_sle(
+					{
+						"item_code": item,
+						"warehouse": key[1],
+						"posting_date": posting_date,
+						"posting_time": "00:00:00",
+					}
+				)
+				self.assertEqual(previous_sles[key].get("name"), previous_sle.get("name"))
+
+		self.assertEqual(
+			get_previous_sles([(item, warehouses[0])], "2021-01-05")[(item, warehouses[0])].get(
+				"qty_after_transaction"
+			),
+			12,
+		)
+
 	def test_timestamp_clash(self):
 
 		item = make_item().name
@@ -29,6 +29,7 @@ class StockReconciliation(StockController):
 		self.head_row = ["Item Code", "Warehouse", "Quantity", "Valuation Rate"]
 
 	def validate(self):
+		self._previous_sles = {}
 		if not self.expense_account:
 			self.expense_account = frappe.get_cached_value(
 				"Company", self.company, "stock_adjustment_account"
@@ -157,9 +158,9 @@ class StockReconciliation(StockController):
 				self.validation_messages.append(_get_msg(row_num, _("Negative Valuation Rate is not allowed")))
 
 			if row.qty and row.valuation_rate in ["", None]:
-				row.valuation_rate = get_stock_balance(
-					row.item_code, row.warehouse, self.posting_date, self.posting_time, with_valuation_rate=True
-				)[1]
+				row.valuation_rate = self.get_previous_sle(row.item_code, row.warehouse).get(
+					"valuation_rate"
+				)
 				if not row.valuation_rate:
 					# try if there is a buying price list in default currency
 					buying_rate = frappe.db.get_value(
@@ -216,8 +217,6 @@ class StockReconciliation(StockController):
 	def update_stock_ledger(self):
 		"""find difference between current and expected entries
 		and create stock ledger entries based on the difference"""
-		from erpnext.stock.stock_ledger import get_previous_sle
-
 		sl_entries = []
 		has_serial_no = False
 		has_batch_no = False
@@ -237,14 +236,7 @@ class StockReconciliation(StockController):
 						).format(row.idx, frappe.bold(row.item_code))
 					)
 
-				previous_sle = get_previous_sle(
-					{
-						"item_code": row.item_code,
-						"warehouse": row.warehouse,
-						"posting_date": self.posting_date,
-						"posting_time": self.posting_time,
-					}
-				)
+				previous_sle = self.get_previous_sle(row.item_code, row.warehouse)
 
 				if previous_sle:
 					if row.qty in ("", None):
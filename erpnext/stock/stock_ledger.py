@@ -1,7 +1,6 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
-import copy
 import json
 from typing import Optional, Set, Tuple
 
@@ -9,10 +8,14 @@ import frappe
 from frappe import _
 from frappe.model.meta import get_field_precision
 from frappe.query_builder.functions import CombineDatetime, Sum
-from frappe.utils import cint, cstr, flt, get_link_to_form, getdate, now, nowdate
+from frappe.utils import cint, create_batch, cstr, flt, get_link_to_form, getdate, now, nowdate
 
 import erpnext
 from erpnext.stock.doctype.bin.bin import update_qty as update_bin_qty
+from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+	cancel_serial_no_ledger_entries,
+	get_incoming_rates,
+)
 from erpnext.stock.utils import (
 	get_incoming_outgoing_rate_for_cancel,
 	get_or_make_bin,
@@ -133,13 +136,12 @@ def get_args_for_future_sle(row):
 def validate_serial_no(sle):
 	from erpnext.stock.doctype.serial_no.serial_no import get_serial_nos
 
-	for sn in get_serial_nos(sle.serial_no):
-		args = copy.deepcopy(sle)
-		args.serial_no = sn
-		args.warehouse = ""
+	serial_nos = get_serial_nos(sle.serial_no)
+	future_vouchers = get_future_vouchers_of_serial_nos(sle, serial_nos)
 
+	for sn in serial_nos:
 		vouchers = []
-		for row in get_stock_ledger_entries(args, ">"):
+		for row in future_vouchers.get(sn, []):
 			voucher_type = frappe.bold(row.voucher_type)
 			voucher_no = frappe.bold(get_link_to_form(row.voucher_type, row.voucher_no))
 			vouchers.append(f"{voucher_type} {voucher_no}")
@@ -159,6 +161,34 @@ def validate_serial_no(sle):
 			frappe.throw(_(msg), title=_(title), exc=SerialNoExistsInFutureTransaction)
 
 
+def get_future_vouchers_of_serial_nos(sle, serial_nos):
+	"""Returns {serial_no: entries of the item posted after the SLE with the serial no}"""
+	sne = frappe.qb.DocType("Serial No Ledger Entry")
+	sl_entry = frappe.qb.DocType("Stock Ledger Entry")
+	posting_datetime = CombineDatetime(sne.posting_date, sne.posting_time)
+	entries = (
+		frappe.qb.from_(sne)
+		.join(sl_entry)
+		.on(sl_entry.name == sne.stock_ledger_entry)
+		.select(sne.serial_no, sne.voucher_type, sne.voucher_no)
+		.where(
+			(sne.serial_no.isin(serial_nos))
+			& (sne.item_code == sle.item_code)
+			& (sne.is_cancelled == 0)
+			& (sl_entry.is_cancelled == 0)
+			& (posting_datetime > CombineDatetime(sle.posting_date, sle.posting_time))
+		)
+		.orderby(posting_datetime, order=frappe.qb.desc)
+		.orderby(sne.creation, order=frappe.qb.desc)
+	).run(as_dict=True)
+
+	future_vouchers = {}
+	for d in entries:
+		future_vouchers.setdefault(d.serial_no.upper(), []).append(d)
+
+	return future_vouchers
+
+
 def validate_cancellation(args):
 	if args[0].get("is_cancelled"):
 		repost_entry = frappe.db.get_value(
@@ -189,6 +219,7 @@ def set_as_cancel(voucher_type, voucher_no):
 		where voucher_type=%s and voucher_no=%s and is_cancelled = 0""",
 		(now(), frappe.session.user, voucher_type, voucher_no),
 	)
+	cancel_serial_no_ledger_entries(voucher_type, voucher_no)
 
 
 def make_entry(args, allow_negative_stock=False, via_landed_cost_voucher=False):
@@ -787,27 +818,9 @@ class update_entries_after(object):
 
 		# Get rate for serial nos which has been transferred to other company
 		invalid_serial_nos = [d.name for d in all_serial_nos if d.company != sle.company]
+		incoming_rates = get_incoming_rates(invalid_serial_nos, sle.company)
 		for serial_no in invalid_serial_nos:
-			incoming_rate = frappe.db.sql(
-				"""
-				select incoming_rate
-				from `tabStock Ledger Entry`
-				where
-					company = %s
-					and actual_qty > 0
-					and is_cancelled = 0
-					and (serial_no = %s
-						or serial_no like %s
-						or serial_no like %s
-						or serial_no like %s
-					)
-				order by posting_date desc
-				limit 1
-			""",
-				(sle.company, serial_no, serial_no + "\n%", "%\n" + serial_no, "%\n" + serial_no + "\n%"),
-			)
-
-			incoming_values += flt(incoming_rate[0][0]) if incoming_rate else 0
+			incoming_values += flt(incoming_rates.get(serial_no.upper()))
 
 		return incoming_values
 
@@ -1072,6 +1085,50 @@ def get_previous_sle(args, for_update=False):
 	return sle and sle[0] or {}
 
 
+def get_previous_sles(keys, posting_date=None, posting_time=None):
+	"""
+	get the last sle on or before the posting time for each (item_code, warehouse) in `keys`,
+	same as `get_previous_sle` but for all the keys with one query per batch
+
+	returns {(item_code, warehouse): sle}, with an empty dict for keys without any sle
+	"""
+	previous_sles = {key: {} for key in keys}
+
+	for batch in create_batch(list(previous_sles), 500):
+		entries = frappe.db.sql(
+			"""
+			select * from (
+				select *, timestamp(posting_date, posting_time) as "timestamp",
+					row_number() over (
+						partition by item_code, warehouse
+						order by timestamp(posting_date, posting_time) desc, creation desc
+					) as row_no
+				from `tabStock Ledger Entry`
+				where item_code in %(item_codes)s
+					and warehouse in %(warehouses)s
+					and is_cancelled = 0
+					and timestamp(posting_date, posting_time) <= timestamp(%(posting_date)s, %(posting_time)s)
+			) sle
+			where row_no = 1""",
+			{
+				"item_codes": tuple({item_code for item_code, warehouse in batch}),
+				"warehouses": tuple({warehouse for item_code, warehouse in batch}),
+				"posting_date": posting_date or "1900-01-01",
+				"posting_time": posting_time or "00:00",
+			},
+			as_dict=1,
+		)
+
+		for sle in entries:
+			# the query returns every item and warehouse combination of the batch
+			key = (sle.item_code, sle.warehouse)
+			if key in previous_sles:
+				del sle["row_no"]
+				previous_sles[key] = sle
+
+	return previous_sles
+
+
 def get_stock_ledger_entries(
 	previous_sle,
 	operator=None,
@@ -1091,22 +1148,9 @@ def get_stock_ledger_entries(
 		conditions += " and " + previous_sle.get("warehouse_condition")
 
 	if check_serial_no and previous_sle.get("serial_no"):
-		# conditions += " and serial_no like {}".format(frappe.db.escape('%{0}%'.format(previous_sle.get("serial_no"))))
-		serial_no = previous_sle.get("serial_no")
-		conditions += (
-			""" and
-			(
-				serial_no = {0}
-				or serial_no like {1}
-				or serial_no like {2}
-				or serial_no like {3}
-			)
-		"""
-		).format(
-			frappe.db.escape(serial_no),
-			frappe.db.escape("{}\n%".format(serial_no)),
-			frappe.db.escape("%\n{}".format(serial_no)),
-			frappe.db.escape("%\n{}\n%".format(serial_no)),
+		conditions += """ and name in (select stock_ledger_entry from `tabSerial No Ledger Entry`
+			where serial_no = {0})""".format(
+			frappe.db.escape(previous_sle.get("serial_no"))
 		)
 
 	if not previous_sle.get("posting_date"):
@@ -7,7 +7,6 @@ from typing import Dict, Optional
 
 import frappe
 from frappe import _
-from frappe.query_builder.functions import CombineDatetime
 from frappe.utils import cstr, flt, get_link_to_form, nowdate, nowtime
 
 import erpnext
@@ -144,34 +143,15 @@ def get_stock_balance(
 
 
 def get_serial_nos_data_after_transactions(args):
+	from erpnext.stock.doctype.serial_no_ledger_entry.serial_no_ledger_entry import (
+		get_serial_nos_in_stock,
+	)
 
-	serial_nos = set()
 	args = frappe._dict(args)
-	sle = frappe.qb.DocType("Stock Ledger Entry")
-
-	stock_ledger_entries = (
-		frappe.qb.from_(sle)
-		.select("serial_no", "actual_qty")
-		.where(
-			(sle.item_code == args.item_code)
-			& (sle.warehouse == args.warehouse)
-			& (
-				CombineDatetime(sle.posting_date, sle.posting_time)
-				< CombineDatetime(args.posting_date, args.posting_time)
-			)
-			& (sle.is_cancelled == 0)
-		)
-		.orderby(sle.posting_date, sle.posting_time, sle.creation)
-		.run(as_dict=1)
+	serial_nos = get_serial_nos_in_stock(
+		args.item_code, args.warehouse, args.posting_date, args.posting_time
 	)
 
-	for stock_ledger_entry in stock_ledger_entries:
-		changed_serial_no = get_serial_nos_data(stock_ledger_entry.serial_no)
-		if stock_ledger_entry.actual_qty > 0:
-			serial_nos.update(changed_serial_no)
-		else:
-			serial_nos.difference_update(changed_serial_no)
-
 	return "\n".join(serial_nos)
 
 
@@ -284,7 +264,10 @@ def get_incoming_rate(args, raise_error_if_no_rate=True):
 		)
 	else:
 		valuation_method = get_valuation_method(args.get("item_code"))
-		previous_sle = get_previous_sle(args)
+		# controllers pass the entry fetched along with the other rows of the voucher
+		previous_sle = args.get("previous_sle")
+		if previous_sle is None:
+			previous_sle = get_previous_sle(args)
 		if valuation_method in ("FIFO", "LIFO"):
 			if previous_sle:
 				previous_stock_queue = json.loads(previous_sle.get("stock_queue", "[]") or "[]")
@@ -0,0 +1,49 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.utilities.instrumentation import (
+	clear_histograms,
+	get_histograms,
+	get_percentile,
+	record,
+)
+
+
+class TestInstrumentation(FrappeTestCase):
+	def setUp(self):
+		frappe.local.conf.controller_instrumentation = ["_Test Instrumented"]
+		clear_histograms()
+
+	def tearDown(self):
+		frappe.local.conf.pop("controller_instrumentation", None)
+		clear_histograms()
+
+	def test_nested_records(self):
+		with record("_Test Instrumented", "on_submit"):
+			frappe.db.sql("select 1")
+			with record("_Test Instrumented", "make_gl_entries"):
+				frappe.db.sql("select 1")
+				frappe.db.sql("select 1")
+
+		# not enabled for other doctypes
+		with record("_Test Not Instrumented", "on_submit"):
+			frappe.db.sql("select 1")
+
+		histograms = get_histograms(hours=1)
+		self.assertEqual(
+			set(histograms),
+			{("_Test Instrumented", "on_submit"), ("_Test Instrumented", "make_gl_entries")},
+		)
+
+		event = histograms[("_Test Instrumented", "on_submit")]
+		method = histograms[("_Test Instrumented", "make_gl_entries")]
+		self.assertEqual(event["count"], 1)
+		self.assertEqual(event["queries"], 3)
+		self.assertEqual(event["self_queries"], 1)
+		self.assertEqual(method["queries"], 2)
+		self.assertEqual(method["self_queries"], 2)
+		self.assertAlmostEqual(event["time"] - event["self_time"], method["time"], places=3)
+		self.assertTrue(get_percentile(event, 95))
+
+		# queries are no longer counted once the outermost record is done
+		self.assertFalse(getattr(frappe.local, "controller_recorder", None))
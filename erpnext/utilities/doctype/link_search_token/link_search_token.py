@@ -0,0 +1,184 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import re
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cstr, strip_html_tags
+
+# fields indexed for each doctype, along with the search fields set in its meta
+LINK_SEARCH_FIELDS = {
+	"Item": ["name", "item_code", "item_name", "item_group", "description"],
+	"Customer": ["name", "customer_name"],
+	"Supplier": ["name", "supplier_name"],
+}
+
+# long texts like descriptions are indexed by their first few words only
+MAX_TOKENS_PER_FIELD = 100
+
+# harakat, superscript alef and tatweel
+ARABIC_DIACRITICS = re.compile("[\u064b-\u0652\u0670\u0640]")
+# hamza forms of alef, alef maksura and teh marbuta
+ARABIC_LETTER_VARIANTS = str.maketrans(
+	{
+		"\u0623": "\u0627",
+		"\u0625": "\u0627",
+		"\u0622": "\u0627",
+		"\u0649": "\u064a",
+		"\u0629": "\u0647",
+	}
+)
+WORD = re.compile(r"\w+")
+
+
+class LinkSearchToken(Document):
+	pass
+
+
+def tokenize(text, limit=None):
+	"""Returns the distinct normalised words of `text`, in order"""
+	text = cstr(text).casefold()
+	if not text:
+		return []
+
+	# match Arabic words irrespective of diacritics and letter variants
+	text = ARABIC_DIACRITICS.sub("", text).translate(ARABIC_LETTER_VARIANTS)
+
+	tokens = []
+	for token in WORD.findall(text):
+		token = token[:140]
+		if token not in tokens:
+			tokens.append(token)
+			if limit and len(tokens) >= limit:
+				break
+
+	return tokens
+
+
+def get_search_fields(doctype):
+	fields = LINK_SEARCH_FIELDS[doctype] + frappe.get_meta(doctype).get_search_fields()
+	return list(dict.fromkeys(fields))
+
+
+def get_document_tokens(doc):
+	tokens = set()
+	for fieldname in get_search_fields(doc.doctype):
+		value = doc.get(fieldname)
+		if fieldname == "description":
+			value = strip_html_tags(cstr(value))
+
+		tokens.update(tokenize(value, MAX_TOKENS_PER_FIELD))
+
+	if doc.doctype == "Item":
+		for d in doc.get("barcodes") or []:
+			tokens.update(tokenize(d.barcode))
+
+	return tokens
+
+
+def update_link_search_tokens(doc, method=None):
+	"""Syncs the search tokens of the document with its current search field values"""
+	if doc.doctype not in LINK_SEARCH_FIELDS:
+		return
+
+	tokens = get_document_tokens(doc)
+	existing = frappe.get_all(
+		"Link Search Token",
+		filters={"reference_doctype": doc.doctype, "reference_name": doc.name},
+		fields=["name", "token"],
+	)
+
+	stale = [d.name for d in existing if d.token not in tokens]
+	if stale:
+		frappe.db.delete("Link Search Token", {"name": ("in", stale)})
+
+	insert_tokens(doc.doctype, doc.name, tokens - {d.token for d in existing})
+
+
+def insert_tokens(doctype, name, tokens):
+	if not tokens:
+		return
+
+	now = frappe.utils.now()
+	frappe.db.bulk_insert(
+		"Link Search Token",
+		fields=[
+			"name",
+			"creation",
+			"modified",
+			"owner",
+			"reference_doctype",
+			"reference_name",
+			"token",
+		],
+		values=[
+			(frappe.generate_hash(length=10), now, now, "Administrator", doctype, name, token)
+			for token in tokens
+		],
+	)
+
+
+def delete_link_search_tokens(doc, method=None):
+	if doc.doctype in LINK_SEARCH_FIELDS:
+		frappe.db.delete(
+			"Link Search Token", {"reference_doctype": doc.doctype, "reference_name": doc.name}
+		)
+
+
+def on_rename(doc, method=None, old_name=None, new_name=None, merge=False):
+	if doc.doctype not in LINK_SEARCH_FIELDS:
+		return
+
+	frappe.db.delete(
+		"Link Search Token", {"reference_doctype": doc.doctype, "reference_name": old_name}
+	)
+	update_link_search_tokens(doc)
+
+
+def rebuild_link_search_tokens(doctype=None):
+	"""Rebuilds the search tokens of all documents of `doctype`, or of all indexed doctypes"""
+	for dt in [doctype] if doctype else LINK_SEARCH_FIELDS:
+		frappe.db.delete("Link Search Token", {"reference_doctype": dt})
+
+		for name in frappe.get_all(dt, pluck="name"):
+			insert_tokens(dt, name, get_document_tokens(frappe.get_doc(dt, name)))
+
+
+def get_search_condition(doctype, txt, name_column):
+	"""Returns a condition on `name_column` matching documents that have all the words of `txt`
+	as word prefixes, with its query values. Returns None if `doctype` is not indexed or `txt`
+	has no words, so that the caller can fall back to its own condition."""
+	if doctype not in LINK_SEARCH_FIELDS:
+		return None
+
+	tokens = tokenize(txt)
+	if not tokens:
+		return None
+
+	conditions = []
+	values = {"link_search_doctype": doctype}
+	for i, token in enumerate(tokens):
+		key = f"link_search_token_{i}"
+		# words have no wildcards other than the underscore
+		values[key] = token.replace("_", "\\_") + "%"
+		conditions.append(
+			f"""{name_column} in (select reference_name from `tabLink Search Token`
+				where reference_doctype = %(link_search_doctype)s and token like %({key})s)"""
+		)
+
+	return " and ".join(conditions), values
+
+
+def get_link_search_condition(doctype, txt, name_column):
+	"""Returns the search condition of the link search backend set in hooks, if any"""
+	backends = frappe.get_hooks("link_search_backend")
+	if not backends:
+		return None
+
+	return frappe.get_attr(backends[-1])(doctype, txt, name_column)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Link Search Token", ["reference_doctype", "token"])
+	frappe.db.add_index("Link Search Token", ["reference_doctype", "reference_name"])
@@ -0,0 +1,43 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from erpnext.controllers.queries import item_query
+from erpnext.stock.doctype.item.test_item import make_item
+from erpnext.utilities.doctype.link_search_token.link_search_token import tokenize
+
+
+class TestLinkSearchToken(FrappeTestCase):
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_tokenize(self):
+		self.assertEqual(tokenize("ITM-00123 Blue Pen, blue"), ["itm", "00123", "blue", "pen"])
+		# diacritics and letter variants are ignored
+		self.assertEqual(tokenize("أَحْمَد"), tokenize("احمد"))
+
+	def test_item_search_by_word_prefix(self):
+		item = make_item(
+			"_Test Link Search Item",
+			{
+				"item_name": "Stainless Kettle",
+				"description": "Electric kettle with auto shut off",
+				"barcodes": [{"barcode": "8901234567894"}],
+			},
+		)
+
+		def search(txt):
+			result = item_query("Item", txt, "name", 0, 20, {}, as_dict=True)
+			return [d.name for d in result]
+
+		self.assertIn(item.name, search("stain kett"))
+		self.assertIn(item.name, search("auto shut"))
+		self.assertIn(item.name, search("89012345"))
+		self.assertNotIn(item.name, search("stain toaster"))
+
+		item.item_name = "Copper Kettle"
+		item.save()
+		self.assertNotIn(item.name, search("stain"))
+		self.assertIn(item.name, search("copper"))
@@ -0,0 +1,185 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and Contributors
+# License: GNU General Public License v3. See license.txt
+
+"""
+Opt-in timings and SQL query counts of document controller methods.
+
+Enable for all doctypes with `bench --site <site> set-config -p controller_instrumentation 1`,
+or for some of them by setting it to a list of doctypes. Each document event run through
+`run_method` (validate, on_submit, ...) and each method decorated with `instrument` is recorded
+with its time and query count, both in total and excluding the instrumented calls made from it.
+The self time of an event is the time spent in its `doc_events` hooks, notifications and
+server scripts, outside the controller methods.
+
+The records are aggregated per doctype and method into hourly histograms in Redis, kept for
+`RETENTION_HOURS`, and shown in the Controller Performance report.
+"""
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import frappe
+
+# upper bounds of the histogram buckets, in milliseconds
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+WINDOW_SECONDS = 60 * 60
+RETENTION_HOURS = 7 * 24
+CACHE_KEY = "controller_instrumentation"
+
+
+def is_enabled(doctype):
+	enabled_for = frappe.conf.get("controller_instrumentation")
+	if isinstance(enabled_for, (list, tuple)):
+		return doctype in enabled_for
+
+	return bool(enabled_for)
+
+
+def instrument(method):
+	"""Records the time and query count of a controller method"""
+
+	@wraps(method)
+	def wrapper(doc, *args, **kwargs):
+		with record(doc.doctype, method.__qualname__):
+			return method(doc, *args, **kwargs)
+
+	return wrapper
+
+
+@contextmanager
+def record(doctype, method):
+	if not is_enabled(doctype):
+		yield
+		return
+
+	recorder = getattr(frappe.local, "controller_recorder", None)
+	is_root = recorder is None
+	if is_root:
+		recorder = frappe.local.controller_recorder = Recorder()
+
+	frame = frappe._dict(
+		start=time.perf_counter(), queries=recorder.queries, child_time=0.0, child_queries=0
+	)
+	recorder.stack.append(frame)
+	try:
+		yield
+	finally:
+		recorder.stack.pop()
+		elapsed = (time.perf_counter() - frame.start) * 1000
+		queries = recorder.queries - frame.queries
+		if recorder.stack:
+			recorder.stack[-1].child_time += elapsed
+			recorder.stack[-1].child_queries += queries
+
+		recorder.records.append(
+			(doctype, method, elapsed, elapsed - frame.child_time, queries, queries - frame.child_queries)
+		)
+
+		if is_root:
+			frappe.local.controller_recorder = None
+			recorder.stop()
+			save_records(recorder.records)
+
+
+class Recorder:
+	"""Counts the queries run through `frappe.db.sql` while a document is being recorded"""
+
+	def __init__(self):
+		self.stack = []
+		self.records = []
+		self.queries = 0
+
+		self.db = frappe.db
+		self.sql = self.db.sql
+		self.db.sql = self.counted_sql
+
+	def counted_sql(self, *args, **kwargs):
+		self.queries += 1
+		return self.sql(*args, **kwargs)
+
+	def stop(self):
+		self.db.sql = self.sql
+
+
+def save_records(records):
+	"""Adds the records to the histograms of the current window"""
+	window = int(time.time() // WINDOW_SECONDS)
+	cache = frappe.cache()
+	pipeline = cache.pipeline()
+
+	for doctype in {r[0] for r in records}:
+		pipeline.sadd(cache.make_key(CACHE_KEY + ":doctypes"), doctype)
+
+	for doctype, method, elapsed, self_time, queries, self_queries in records:
+		key = cache.make_key(get_window_key(doctype, window))
+		for field, value in (
+			("count", 1),
+			("time", elapsed),
+			("self_time", self_time),
+			("queries", queries),
+			("self_queries", self_queries),
+			("bucket_{}".format(get_bucket(elapsed)), 1),
+		):
+			pipeline.hincrbyfloat(key, "{}|{}".format(method, field), value)
+		pipeline.expire(key, RETENTION_HOURS * WINDOW_SECONDS)
+
+	pipeline.execute()
+
+
+def get_bucket(elapsed):
+	for bucket in BUCKETS:
+		if elapsed <= bucket:
+			return bucket
+
+	return "inf"
+
+
+def get_window_key(doctype, window):
+	return "{}:{}:{}".format(CACHE_KEY, doctype, window)
+
+
+def get_histograms(hours=24, doctype=None):
+	"""Returns {(doctype, method): {field: value}} summed over the windows of the last `hours`"""
+	# the values are plain counters, so they are read with raw commands instead of the
+	# unpickling getters of the cache
+	cache = frappe.cache()
+	if doctype:
+		doctypes = [doctype]
+	else:
+		pipeline = cache.pipeline()
+		pipeline.smembers(cache.make_key(CACHE_KEY + ":doctypes"))
+		doctypes = sorted(frappe.safe_decode(d) for d in pipeline.execute()[0])
+
+	current_window = int(time.time() // WINDOW_SECONDS)
+	windows = range(current_window - min(int(hours), RETENTION_HOURS) + 1, current_window + 1)
+
+	keys = [(doctype, window) for doctype in doctypes for window in windows]
+	pipeline = cache.pipeline()
+	for doctype, window in keys:
+		pipeline.hgetall(cache.make_key(get_window_key(doctype, window)))
+
+	histograms = {}
+	for (doctype, window), fields in zip(keys, pipeline.execute()):
+		for field, value in fields.items():
+			method, field = frappe.safe_decode(field).rsplit("|", 1)
+			histogram = histograms.setdefault((doctype, method), {})
+			histogram[field] = histogram.get(field, 0) + float(value)
+
+	return histograms
+
+
+def get_percentile(histogram, percentile):
+	"""Returns the upper bound of the bucket of the `percentile` of the recorded times"""
+	target = histogram.get("count", 0) * percentile / 100
+	seen = 0
+	for bucket in BUCKETS:
+		seen += histogram.get("bucket_{}".format(bucket), 0)
+		if seen >= target:
+			return bucket
+
+	return None
+
+
+def clear_histograms():
+	frappe.cache().delete_keys(CACHE_KEY + ":")
@@ -97,84 +97,143 @@ def get_price(item_code, price_list, customer_group, company, qty=1):
 			)
 
 		if price:
-			party = get_party()
-			pricing_rule_dict = frappe._dict(
-				{
-					"item_code": item_code,
-					"qty": qty,
-					"stock_qty": qty,
-					"transaction_type": "selling",
-					"price_list": price_list,
-					"customer_group": customer_group,
-					"company": company,
-					"conversion_rate": 1,
-					"for_shopping_cart": True,
-					"currency": frappe.db.get_value("Price List", price_list, "currency"),
-				}
+			pricing_rule = get_pricing_rule_for_item(
+				get_pricing_rule_args(item_code, price_list, customer_group, company, get_party(), qty)
 			)
 
-			if party and party.doctype == "Customer":
-				pricing_rule_dict.update({"customer": party.name})
-
-			pricing_rule = get_pricing_rule_for_item(pricing_rule_dict)
-			price_obj = price[0]
-
-			if pricing_rule:
-				# price without any rules applied
-				mrp = price_obj.price_list_rate or 0
-
-				if pricing_rule.pricing_rule_for == "Discount Percentage":
-					price_obj.discount_percent = pricing_rule.discount_percentage
-					price_obj.formatted_discount_percent = str(flt(pricing_rule.discount_percentage, 0)) + "%"
-					price_obj.price_list_rate = flt(
-						price_obj.price_list_rate * (1.0 - (flt(pricing_rule.discount_percentage) / 100.0))
-					)
-
-				if pricing_rule.pricing_rule_for == "Rate":
-					rate_discount = flt(mrp) - flt(pricing_rule.price_list_rate)
-					if rate_discount > 0:
-						price_obj.formatted_discount_rate = fmt_money(rate_discount, currency=price_obj["currency"])
-					price_obj.price_list_rate = pricing_rule.price_list_rate or 0
-
-			if price_obj:
-				price_obj["formatted_price"] = fmt_money(
-					price_obj["price_list_rate"], currency=price_obj["currency"]
-				)
-				if mrp != price_obj["price_list_rate"]:
-					price_obj["formatted_mrp"] = fmt_money(mrp, currency=price_obj["currency"])
-
-				price_obj["currency_symbol"] = (
-					not cint(frappe.db.get_default("hide_currency_symbol"))
-					and (
-						frappe.db.get_value("Currency", price_obj.currency, "symbol", cache=True)
-						or price_obj.currency
-					)
-					or ""
-				)
-
-				uom_conversion_factor = frappe.db.sql(
-					"""select	C.conversion_factor
-					from `tabUOM Conversion Detail` C
-					inner join `tabItem` I on C.parent = I.name and C.uom = I.sales_uom
-					where I.name = %s""",
-					item_code,
-				)
-
-				uom_conversion_factor = uom_conversion_factor[0][0] if uom_conversion_factor else 1
-				price_obj["formatted_price_sales_uom"] = fmt_money(
-					price_obj["price_list_rate"] * uom_conversion_factor, currency=price_obj["currency"]
-				)
-
-				if not price_obj["price_list_rate"]:
-					price_obj["price_list_rate"] = 0
-
-				if not price_obj["currency"]:
-					price_obj["currency"] = ""
-
-				if not price_obj["formatted_price"]:
-					price_obj["formatted_price"], price_obj["formatted_mrp"] = "", ""
-
-			return price_obj
+			uom_conversion_factor = frappe.db.sql(
+				"""select	C.conversion_factor
+				from `tabUOM Conversion Detail` C
+				inner join `tabItem` I on C.parent = I.name and C.uom = I.sales_uom
+				where I.name = %s""",
+				item_code,
+			)
+			uom_conversion_factor = uom_conversion_factor[0][0] if uom_conversion_factor else 1
+
+			return apply_pricing_rule_to_price(price[0], pricing_rule, uom_conversion_factor)
+
+
+def get_prices(item_codes, price_list, customer_group, company, party=None, qty=1):
+	"""Returns {item_code: price} for many items, each price as `get_price` returns it.
+
+	Item Prices (falling back to the template's price for variants) and sales UOM conversion
+	factors are fetched for all the items at once. Pricing rules are applied per priced item."""
+	if not (price_list and item_codes):
+		return {}
+
+	variant_of = dict(
+		frappe.get_all(
+			"Item", filters={"name": ("in", item_codes)}, fields=["name", "variant_of"], as_list=True
+		)
+	)
+
+	item_prices = {}
+	for d in frappe.get_all(
+		"Item Price",
+		fields=["item_code", "price_list_rate", "currency"],
+		filters={
+			"price_list": price_list,
+			"item_code": ("in", list(set(item_codes) | {v for v in variant_of.values() if v})),
+		},
+	):
+		item_prices.setdefault(d.pop("item_code"), d)
+
+	uom_conversion_factors = dict(
+		frappe.db.sql(
+			"""select I.name, C.conversion_factor
+			from `tabUOM Conversion Detail` C
+			inner join `tabItem` I on C.parent = I.name and C.uom = I.sales_uom
+			where I.name in %s""",
+			(tuple(item_codes),),
+		)
+	)
+
+	prices = {}
+	for item_code in item_codes:
+		price = item_prices.get(item_code) or item_prices.get(variant_of.get(item_code))
+		if not price:
+			continue
+
+		pricing_rule = get_pricing_rule_for_item(
+			get_pricing_rule_args(item_code, price_list, customer_group, company, party, qty)
+		)
+		prices[item_code] = apply_pricing_rule_to_price(
+			frappe._dict(price), pricing_rule, uom_conversion_factors.get(item_code) or 1
+		)
+
+	return prices
+
+
+def get_pricing_rule_args(item_code, price_list, customer_group, company, party=None, qty=1):
+	pricing_rule_dict = frappe._dict(
+		{
+			"item_code": item_code,
+			"qty": qty,
+			"stock_qty": qty,
+			"transaction_type": "selling",
+			"price_list": price_list,
+			"customer_group": customer_group,
+			"company": company,
+			"conversion_rate": 1,
+			"for_shopping_cart": True,
+			"currency": frappe.get_cached_value("Price List", price_list, "currency"),
+		}
+	)
+
+	if party and party.doctype == "Customer":
+		pricing_rule_dict.update({"customer": party.name})
+
+	return pricing_rule_dict
+
+
+def apply_pricing_rule_to_price(price_obj, pricing_rule, uom_conversion_factor=1):
+	"""Applies the pricing rule to an Item Price and sets the formatted price details"""
+	# price without any rules applied
+	mrp = price_obj.price_list_rate or 0
+
+	if pricing_rule:
+		if pricing_rule.pricing_rule_for == "Discount Percentage":
+			price_obj.discount_percent = pricing_rule.discount_percentage
+			price_obj.formatted_discount_percent = str(flt(pricing_rule.discount_percentage, 0)) + "%"
+			price_obj.price_list_rate = flt(
+				price_obj.price_list_rate * (1.0 - (flt(pricing_rule.discount_percentage) / 100.0))
+			)
+
+		if pricing_rule.pricing_rule_for == "Rate":
+			rate_discount = flt(mrp) - flt(pricing_rule.price_list_rate)
+			if rate_discount > 0:
+				price_obj.formatted_discount_rate = fmt_money(rate_discount, currency=price_obj["currency"])
+			price_obj.price_list_rate = pricing_rule.price_list_rate or 0
+
+	price_obj["formatted_price"] = fmt_money(
+		price_obj["price_list_rate"], currency=price_obj["currency"]
+	)
+	if mrp != price_obj["price_list_rate"]:
+		price_obj["formatted_mrp"] = fmt_money(mrp, currency=price_obj["currency"])
+
+	price_obj["currency_symbol"] = (
+		not cint(frappe.db.get_default("hide_currency_symbol"))
+		and (
+			frappe.db.get_value("Currency", price_obj.currency, "symbol", cache=True)
+			or price_obj.currency
+		)
+		or ""
+	)
+
+	price_obj["formatted_price_sales_uom"] = fmt_money(
+		price_obj["price_list_rate"] * uom_conversion_factor, currency=price_obj["currency"]
+	)
+
+	if not price_obj["price_list_rate"]:
+		price_obj["price_list_rate"] = 0
+
+	if not price_obj["currency"]:
+		price_obj["currency"] = ""
+
+	if not price_obj["formatted_price"]:
+		price_obj["formatted_price"], price_obj["formatted_mrp"] = "", ""
+
+	return price_obj
 
 
 def get_non_stock_item_status(item_code, item_warehouse_field):
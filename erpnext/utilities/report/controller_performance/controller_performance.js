@@ -0,0 +1,21 @@
+// Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+// For license information, please see license.txt
+/* eslint-disable */
+
+frappe.query_reports["Controller Performance"] = {
+	"filters": [
+		{
+			fieldname: "hours",
+			label: __("Last Hours"),
+			fieldtype: "Int",
+			default: 24,
+			reqd: 1,
+		},
+		{
+			fieldname: "doctype",
+			label: __("Document Type"),
+			fieldtype: "Link",
+			options: "DocType",
+		}
+	]
+};
@@ -0,0 +1,81 @@
+# Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from erpnext.utilities.instrumentation import get_histograms, get_percentile, is_enabled
+
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	if not is_enabled(filters.doctype):
+		frappe.msgprint(
+			_(
+				"Controller instrumentation is not enabled. Set {0} in the site config to record timings."
+			).format(frappe.bold("controller_instrumentation")),
+			alert=True,
+		)
+
+	columns = get_columns()
+	data = get_data(filters)
+	return columns, data
+
+
+def get_columns():
+	return [
+		{"label": _("Document Type"), "fieldname": "doctype", "fieldtype": "Data", "width": 160},
+		{"label": _("Method"), "fieldname": "method", "fieldtype": "Data", "width": 260},
+		{"label": _("Calls"), "fieldname": "count", "fieldtype": "Int", "width": 80},
+		{"label": _("Total Time (s)"), "fieldname": "total_time", "fieldtype": "Float", "width": 120},
+		{"label": _("Avg Time (ms)"), "fieldname": "avg_time", "fieldtype": "Float", "width": 120},
+		{"label": _("P50 (ms)"), "fieldname": "p50", "fieldtype": "Data", "width": 90},
+		{"label": _("P95 (ms)"), "fieldname": "p95", "fieldtype": "Data", "width": 90},
+		{
+			"label": _("Avg Self Time (ms)"),
+			"fieldname": "avg_self_time",
+			"fieldtype": "Float",
+			"width": 140,
+		},
+		{"label": _("Avg Queries"), "fieldname": "avg_queries", "fieldtype": "Float", "width": 110},
+		{
+			"label": _("Avg Self Queries"),
+			"fieldname": "avg_self_queries",
+			"fieldtype": "Float",
+			"width": 130,
+		},
+	]
+
+
+def get_data(filters):
+	data = []
+	for (doctype, method), histogram in get_histograms(
+		cint(filters.hours) or 24, filters.doctype
+	).items():
+		count = histogram.get("count")
+		if not count:
+			continue
+
+		data.append(
+			{
+				"doctype": doctype,
+				"method": method,
+				"count": count,
+				"total_time": flt(histogram.get("time") / 1000, 3),
+				"avg_time": flt(histogram.get("time") / count, 2),
+				"p50": format_percentile(histogram, 50),
+				"p95": format_percentile(histogram, 95),
+				"avg_self_time": flt(histogram.get("self_time") / count, 2),
+				"avg_queries": flt(histogram.get("queries") / count, 1),
+				"avg_self_queries": flt(histogram.get("self_queries") / count, 1),
+			}
+		)
+
+	return sorted(data, key=lambda d: d["total_time"], reverse=True)
+
+
+def format_percentile(histogram, percentile):
+	bucket = get_percentile(histogram, percentile)
+	return "≤ {0}".format(bucket) if bucket else "> 10000"
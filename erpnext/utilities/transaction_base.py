@@ -8,6 +8,7 @@ from frappe import _
 from frappe.utils import cint, cstr, flt, get_time, now_datetime
 
 from erpnext.controllers.status_updater import StatusUpdater
+from erpnext.utilities.instrumentation import record
 
 
 class UOMMustBeIntegerError(frappe.ValidationError):
@@ -15,6 +16,10 @@ class UOMMustBeIntegerError(frappe.ValidationError):
 
 
 class TransactionBase(StatusUpdater):
+	def run_method(self, method, *args, **kwargs):
+		with record(self.doctype, method):
+			return super().run_method(method, *args, **kwargs)
+
 	def validate_posting_time(self):
 		# set Edit Posting Date and Time to 1 while data import
 		if frappe.flags.in_import and self.posting_date: